@@ -3,21 +3,33 @@
 
 import sys
 import os
-import importlib.util
 
 # 添加源代码目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
+
+def _print_traceback() -> None:
+    """打印异常堆栈（仅在失败时导入 traceback）."""
+    import traceback
+
+    traceback.print_exc()
+
+
 try:
+    from importlib.util import find_spec
+
     # 检查模块是否可以导入
-    spec = importlib.util.find_spec("elasticflow")
+    # 已导入的模块直接从 sys.modules 命中，未命中时才搜索 sys.path
+    spec = sys.modules.get("elasticflow") or find_spec("elasticflow")
     if spec is not None:
         print("✓ elasticflow package can be imported")
     else:
         raise ImportError("elasticflow package not found")
 
     # 检查query_analyzer子模块
-    spec = importlib.util.find_spec("elasticflow.query_analyzer")
+    spec = sys.modules.get("elasticflow.query_analyzer") or find_spec(
+        "elasticflow.query_analyzer"
+    )
     if spec is not None:
         print("✓ elasticflow.query_analyzer can be imported")
     else:
@@ -38,38 +50,30 @@ try:
         "exceptions",
     ]
 
-    from elasticflow.query_analyzer import query_analyzer
+    import elasticflow.query_analyzer as qa
 
-    for component in components:
-        try:
-            spec = importlib.util.find_spec(f"elasticflow.query_analyzer.{component}")
-            if spec is not None:
-                print(f"✓ {component} can be imported")
-            else:
-                # Try to import as attribute
-                try:
-                    getattr(query_analyzer, component)
-                    print(f"✓ {component} found in query_analyzer module")
-                except AttributeError:
-                    print(f"? {component} not found")
-        except (ImportError, ValueError):
-            try:
-                from elasticflow.query_analyzer import component  # type: ignore
+    # 一次性收集模块属性与已加载的子模块，避免逐个组件调用 find_spec
+    known_attrs = frozenset(vars(qa))
+    known_submods = frozenset(
+        name.rsplit(".", 1)[1]
+        for name in sys.modules
+        if name.startswith("elasticflow.query_analyzer.")
+    )
 
-                print(f"✓ {component} imported successfully")
-            except ImportError:
-                print(f"? {component} import failed")
+    for component in components:
+        if component in known_submods:
+            print(f"✓ {component} can be imported")
+        elif component in known_attrs:
+            print(f"✓ {component} found in query_analyzer module")
+        else:
+            print(f"? {component} not found")
 
     print("\n✓ All components checked!")
     print("✓ QueryAnalyzer module has been implemented successfully!")
 
 except ImportError as e:
     print(f"✗ Import error: {e}")
-    import traceback
-
-    traceback.print_exc()
+    _print_traceback()
 except Exception as e:
     print(f"✗ Error: {e}")
-    import traceback
-
-    traceback.print_exc()
+    _print_traceback()
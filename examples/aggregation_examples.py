@@ -13,25 +13,45 @@
 - 原始聚合 DSL (add_aggregation_raw)
 """
 
+from __future__ import annotations
+
 import json
+from typing import TYPE_CHECKING
 
-from elasticsearch.dsl import Search
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库 json
+    orjson = None
 
 from elasticflow import DslQueryBuilder, FieldMapper, QueryField, SubAggregation
 
+if TYPE_CHECKING:
+    from elasticsearch import Elasticsearch
+    from elasticsearch.dsl import Search
+
+
+# 字段配置在模块加载时构建一次，所有示例共享
+_FIELDS = (
+    QueryField(field="status", es_field="status.keyword", display="状态"),
+    QueryField(field="user_id", es_field="user_id", display="用户ID"),
+    QueryField(field="price", es_field="price", display="价格"),
+    QueryField(field="response_time", es_field="response_time", display="响应时间"),
+    QueryField(field="create_time", es_field="create_time", display="创建时间"),
+)
+_MAPPER = FieldMapper(list(_FIELDS))
+
+# 多个示例共用的排序与返回字段（构建器只读取，不会修改）
+_SORT_CREATE_TIME_DESC = [{"create_time": "desc"}]
+_SOURCE_LATEST = ["id", "title", "status", "create_time"]
+
 
 def create_builder() -> DslQueryBuilder:
     """创建测试用的 DslQueryBuilder."""
-    fields = [
-        QueryField(field="status", es_field="status.keyword", display="状态"),
-        QueryField(field="user_id", es_field="user_id", display="用户ID"),
-        QueryField(field="price", es_field="price", display="价格"),
-        QueryField(field="response_time", es_field="response_time", display="响应时间"),
-        QueryField(field="create_time", es_field="create_time", display="创建时间"),
-    ]
+    from elasticsearch.dsl import Search
+
     return DslQueryBuilder(
         search_factory=lambda: Search(index="test_index"),
-        field_mapper=FieldMapper(fields),
+        field_mapper=_MAPPER,
     )
 
 
@@ -40,7 +60,10 @@ def print_dsl(title: str, dsl: dict) -> None:
     print(f"\n{'=' * 60}")
     print(f"📊 {title}")
     print("=" * 60)
-    print(json.dumps(dsl, indent=2, ensure_ascii=False))
+    if orjson is not None:
+        print(orjson.dumps(dsl, option=orjson.OPT_INDENT_2).decode())
+    else:
+        print(json.dumps(dsl, indent=2, ensure_ascii=False))
 
 
 # ============================================================
@@ -48,9 +71,10 @@ def print_dsl(title: str, dsl: dict) -> None:
 # ============================================================
 
 
-def example_terms_aggregation():
+def example_terms_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """Terms 聚合示例 - 按字段分组统计."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation(
         "status_count", "terms", field="status", size=10
@@ -58,21 +82,25 @@ def example_terms_aggregation():
 
     dsl = search.to_dict()
     print_dsl("Terms 聚合 - 按状态分组统计", dsl)
+    return search
 
 
-def example_avg_aggregation():
+def example_avg_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """平均值聚合示例."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation("avg_price", "avg", field="price").build()
 
     dsl = search.to_dict()
     print_dsl("平均值聚合 - 计算平均价格", dsl)
+    return search
 
 
-def example_multiple_metric_aggregations():
+def example_multiple_metric_aggregations(builder: DslQueryBuilder | None = None) -> Search:
     """多个指标聚合示例."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = (
         builder.add_aggregation("avg_price", "avg", field="price")
@@ -85,6 +113,7 @@ def example_multiple_metric_aggregations():
 
     dsl = search.to_dict()
     print_dsl("多个指标聚合 - avg/max/min/sum/count", dsl)
+    return search
 
 
 # ============================================================
@@ -92,19 +121,22 @@ def example_multiple_metric_aggregations():
 # ============================================================
 
 
-def example_stats_aggregation():
+def example_stats_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """统计聚合示例 - 一次返回 count, min, max, avg, sum."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_stats_aggregation("price_stats", "price").build()
 
     dsl = search.to_dict()
     print_dsl("统计聚合 - 返回 count/min/max/avg/sum", dsl)
+    return search
 
 
-def example_extended_stats_aggregation():
+def example_extended_stats_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """扩展统计聚合示例 - 额外返回方差、标准差等."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_stats_aggregation(
         "price_extended_stats", "price", extended=True
@@ -112,6 +144,7 @@ def example_extended_stats_aggregation():
 
     dsl = search.to_dict()
     print_dsl("扩展统计聚合 - 额外包含 variance/std_deviation 等", dsl)
+    return search
 
 
 # ============================================================
@@ -119,19 +152,22 @@ def example_extended_stats_aggregation():
 # ============================================================
 
 
-def example_cardinality_aggregation():
+def example_cardinality_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """去重计数聚合示例 - 统计唯一值数量."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_cardinality_aggregation("unique_users", "user_id").build()
 
     dsl = search.to_dict()
     print_dsl("去重计数聚合 - 统计唯一用户数", dsl)
+    return search
 
 
-def example_cardinality_with_precision():
+def example_cardinality_with_precision(builder: DslQueryBuilder | None = None) -> Search:
     """带精度阈值的去重计数."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_cardinality_aggregation(
         "unique_users", "user_id", precision_threshold=10000
@@ -139,6 +175,7 @@ def example_cardinality_with_precision():
 
     dsl = search.to_dict()
     print_dsl("去重计数聚合 - 高精度模式", dsl)
+    return search
 
 
 # ============================================================
@@ -146,9 +183,10 @@ def example_cardinality_with_precision():
 # ============================================================
 
 
-def example_percentiles_aggregation():
+def example_percentiles_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """百分位数聚合示例 - 计算响应时间分布."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_percentiles_aggregation(
         "latency_percentiles", "response_time", percents=[50, 90, 95, 99]
@@ -156,11 +194,13 @@ def example_percentiles_aggregation():
 
     dsl = search.to_dict()
     print_dsl("百分位数聚合 - P50/P90/P95/P99", dsl)
+    return search
 
 
-def example_percentiles_default():
+def example_percentiles_default(builder: DslQueryBuilder | None = None) -> Search:
     """使用默认百分位的聚合."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_percentiles_aggregation(
         "latency_percentiles", "response_time"
@@ -168,6 +208,7 @@ def example_percentiles_default():
 
     dsl = search.to_dict()
     print_dsl("百分位数聚合 - 使用默认百分位", dsl)
+    return search
 
 
 # ============================================================
@@ -175,19 +216,21 @@ def example_percentiles_default():
 # ============================================================
 
 
-def example_top_hits_aggregation():
+def example_top_hits_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """Top Hits 聚合示例 - 独立使用."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_top_hits_aggregation(
         "latest_docs",
         size=5,
-        sort=[{"create_time": "desc"}],
+        sort=_SORT_CREATE_TIME_DESC,
         source=["id", "title", "create_time"],
     ).build()
 
     dsl = search.to_dict()
     print_dsl("Top Hits 聚合 - 获取最新5条记录", dsl)
+    return search
 
 
 # ============================================================
@@ -195,9 +238,10 @@ def example_top_hits_aggregation():
 # ============================================================
 
 
-def example_sub_aggregations():
+def example_sub_aggregations(builder: DslQueryBuilder | None = None) -> Search:
     """子聚合示例 - 每个状态的最新3条记录."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation(
         "by_status",
@@ -209,19 +253,21 @@ def example_sub_aggregations():
                 "name": "latest_docs",
                 "type": "top_hits",
                 "size": 3,
-                "sort": [{"create_time": "desc"}],
-                "_source": ["id", "title", "status", "create_time"],
+                "sort": _SORT_CREATE_TIME_DESC,
+                "_source": _SOURCE_LATEST,
             }
         ],
     ).build()
 
     dsl = search.to_dict()
     print_dsl("子聚合 - 每个状态的最新3条记录", dsl)
+    return search
 
 
-def example_nested_sub_aggregations():
+def example_nested_sub_aggregations(builder: DslQueryBuilder | None = None) -> Search:
     """多层子聚合示例."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation(
         "by_status",
@@ -243,11 +289,13 @@ def example_nested_sub_aggregations():
 
     dsl = search.to_dict()
     print_dsl("多层子聚合 - 每个状态的统计信息和最贵记录", dsl)
+    return search
 
 
-def example_sub_aggregations_with_class():
+def example_sub_aggregations_with_class(builder: DslQueryBuilder | None = None) -> Search:
     """使用 SubAggregation 类的子聚合示例 - 类型安全的方式."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation(
         "by_status",
@@ -260,8 +308,8 @@ def example_sub_aggregations_with_class():
                 type="top_hits",
                 kwargs={
                     "size": 3,
-                    "sort": [{"create_time": "desc"}],
-                    "_source": ["id", "title", "status", "create_time"],
+                    "sort": _SORT_CREATE_TIME_DESC,
+                    "_source": _SOURCE_LATEST,
                 },
             ),
             SubAggregation(
@@ -279,6 +327,7 @@ def example_sub_aggregations_with_class():
 
     dsl = search.to_dict()
     print_dsl("子聚合 - 使用 SubAggregation 类（类型安全）", dsl)
+    return search
 
 
 # ============================================================
@@ -286,67 +335,80 @@ def example_sub_aggregations_with_class():
 # ============================================================
 
 
-def example_raw_date_histogram():
+def _raw(
+    name: str, agg_type: str, params: dict, subaggs: dict | None = None
+) -> dict:
+    """构造 add_aggregation_raw 所需的原始聚合 DSL."""
+    body: dict = {agg_type: params}
+    if subaggs:
+        body["aggs"] = subaggs
+    return {name: body}
+
+
+def example_raw_date_histogram(builder: DslQueryBuilder | None = None) -> Search:
     """原始聚合 DSL - 日期直方图."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation_raw(
-        {
-            "events_over_time": {
-                "date_histogram": {
-                    "field": "create_time",
-                    "calendar_interval": "1d",
-                },
-                "aggs": {"avg_price": {"avg": {"field": "price"}}},
-            }
-        }
+        _raw(
+            "events_over_time",
+            "date_histogram",
+            {"field": "create_time", "calendar_interval": "1d"},
+            {"avg_price": {"avg": {"field": "price"}}},
+        )
     ).build()
 
     dsl = search.to_dict()
     print_dsl("原始聚合 DSL - 日期直方图（按天统计平均价格）", dsl)
+    return search
 
 
-def example_raw_filter_aggregation():
+def example_raw_filter_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """原始聚合 DSL - 过滤器聚合."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation_raw(
-        {
-            "error_stats": {
-                "filter": {"term": {"status.keyword": "error"}},
-                "aggs": {
-                    "count": {"value_count": {"field": "_id"}},
-                    "avg_response_time": {"avg": {"field": "response_time"}},
-                },
-            }
-        }
+        _raw(
+            "error_stats",
+            "filter",
+            {"term": {"status.keyword": "error"}},
+            {
+                "count": {"value_count": {"field": "_id"}},
+                "avg_response_time": {"avg": {"field": "response_time"}},
+            },
+        )
     ).build()
 
     dsl = search.to_dict()
     print_dsl("原始聚合 DSL - 过滤器聚合（仅统计 error 状态）", dsl)
+    return search
 
 
-def example_raw_range_aggregation():
+def example_raw_range_aggregation(builder: DslQueryBuilder | None = None) -> Search:
     """原始聚合 DSL - 范围聚合."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = builder.add_aggregation_raw(
-        {
-            "price_ranges": {
-                "range": {
-                    "field": "price",
-                    "ranges": [
-                        {"to": 100, "key": "cheap"},
-                        {"from": 100, "to": 500, "key": "medium"},
-                        {"from": 500, "key": "expensive"},
-                    ],
-                }
-            }
-        }
+        _raw(
+            "price_ranges",
+            "range",
+            {
+                "field": "price",
+                "ranges": [
+                    {"to": 100, "key": "cheap"},
+                    {"from": 100, "to": 500, "key": "medium"},
+                    {"from": 500, "key": "expensive"},
+                ],
+            },
+        )
     ).build()
 
     dsl = search.to_dict()
     print_dsl("原始聚合 DSL - 范围聚合（价格区间分布）", dsl)
+    return search
 
 
 # ============================================================
@@ -354,9 +416,10 @@ def example_raw_range_aggregation():
 # ============================================================
 
 
-def example_comprehensive():
+def example_comprehensive(builder: DslQueryBuilder | None = None) -> Search:
     """综合示例 - 带条件过滤的多维度分析."""
-    builder = create_builder()
+    if builder is None:
+        builder = create_builder()
 
     search = (
         builder.conditions(
@@ -374,42 +437,92 @@ def example_comprehensive():
 
     dsl = search.to_dict()
     print_dsl("综合示例 - 带过滤的多维度数据分析", dsl)
+    return search
+
+
+# ============================================================
+# 9. 批量执行（_msearch）
+# ============================================================
+
+
+ALL_EXAMPLES = (
+    example_terms_aggregation,
+    example_avg_aggregation,
+    example_multiple_metric_aggregations,
+    example_stats_aggregation,
+    example_extended_stats_aggregation,
+    example_cardinality_aggregation,
+    example_cardinality_with_precision,
+    example_percentiles_aggregation,
+    example_percentiles_default,
+    example_top_hits_aggregation,
+    example_sub_aggregations,
+    example_nested_sub_aggregations,
+    example_sub_aggregations_with_class,
+    example_raw_date_histogram,
+    example_raw_filter_aggregation,
+    example_raw_range_aggregation,
+    example_comprehensive,
+)
+
+
+def run_all_examples(client: Elasticsearch) -> list:
+    """将所有示例查询合并为一次 _msearch 请求执行.
+
+    每个示例单独执行需要一次网络往返，合并后只需一次。
+
+    Args:
+        client: Elasticsearch 客户端
+
+    Returns:
+        与示例顺序一致的响应列表
+    """
+    from elasticsearch.dsl import MultiSearch
+
+    builder = create_builder()
+    ms = MultiSearch(using=client)
+    for example in ALL_EXAMPLES:
+        ms = ms.add(example(builder.clear()))
+    return ms.execute()
 
 
 if __name__ == "__main__":
     print("\n" + "🎯 ElasticFlow 聚合查询示例 ".center(60, "="))
 
+    # 所有示例共用一个构建器，每次调用前通过 clear() 重置
+    builder = create_builder()
+
     # 1. 基础聚合
-    example_terms_aggregation()
-    example_avg_aggregation()
-    example_multiple_metric_aggregations()
+    example_terms_aggregation(builder.clear())
+    example_avg_aggregation(builder.clear())
+    example_multiple_metric_aggregations(builder.clear())
 
     # 2. 统计聚合
-    example_stats_aggregation()
-    example_extended_stats_aggregation()
+    example_stats_aggregation(builder.clear())
+    example_extended_stats_aggregation(builder.clear())
 
     # 3. 去重计数
-    example_cardinality_aggregation()
-    example_cardinality_with_precision()
+    example_cardinality_aggregation(builder.clear())
+    example_cardinality_with_precision(builder.clear())
 
     # 4. 百分位数
-    example_percentiles_aggregation()
-    example_percentiles_default()
+    example_percentiles_aggregation(builder.clear())
+    example_percentiles_default(builder.clear())
 
     # 5. Top Hits
-    example_top_hits_aggregation()
+    example_top_hits_aggregation(builder.clear())
 
     # 6. 子聚合
-    example_sub_aggregations()
-    example_nested_sub_aggregations()
-    example_sub_aggregations_with_class()
+    example_sub_aggregations(builder.clear())
+    example_nested_sub_aggregations(builder.clear())
+    example_sub_aggregations_with_class(builder.clear())
 
     # 7. 原始聚合 DSL
-    example_raw_date_histogram()
-    example_raw_filter_aggregation()
-    example_raw_range_aggregation()
+    example_raw_date_histogram(builder.clear())
+    example_raw_filter_aggregation(builder.clear())
+    example_raw_range_aggregation(builder.clear())
 
     # 8. 综合示例
-    example_comprehensive()
+    example_comprehensive(builder.clear())
 
     print("\n" + "✅ 所有示例执行完成！".center(60, "="))
@@ -3,26 +3,43 @@
 本文件展示了如何使用 BulkOperationTool 进行高效的 Elasticsearch 批量操作。
 """
 
-from elasticsearch import Elasticsearch
-from elasticflow.bulk import (
-    BulkAction,
-    BulkOperation,
-    BulkOperationTool,
-)
-from elasticflow.index_manager import IndexManager
-
-# 创建 Elasticsearch 客户端连接
-es_client = Elasticsearch(["http://localhost:9200"])
-
-# 创建批量操作工具实例
-bulk_tool = BulkOperationTool(
-    es_client=es_client,
-    batch_size=1000,  # 每批处理1000条记录
-    max_retries=3,  # 失败时最多重试3次
-    retry_delay=1.0,  # 重试间隔1秒
-    raise_on_error=False,  # 不抛出异常，通过结果对象检查错误
+# 批次大小按单次请求的目标字节数估算（ES 建议单个 bulk 请求约 5~15MB），
+# 并限制在 [500, 5000] 区间，避免文档过小时批次过大、过大时请求过多
+_TARGET_BULK_BYTES = 5 * 1024 * 1024
+_AVG_DOC_BYTES = 1024
+BATCH_SIZE = max(500, min(5000, _TARGET_BULK_BYTES // _AVG_DOC_BYTES))
+
+# 模拟日志数据用到的时间戳与级别，预先生成以免在生成器内逐条格式化
+_LOG_LEVELS = ("INFO", "WARNING", "ERROR")
+_LOG_TIMESTAMPS = tuple(
+    f"2024-01-{d:02d}T{h:02d}:00:00" for d in range(31) for h in range(24)
 )
 
+# 客户端及工具实例延迟创建：导入本模块时不加载 elasticsearch 客户端及传输层
+_bulk_tool = None
+
+
+def get_bulk_tool():
+    """获取批量操作工具实例（首次调用时创建）."""
+    global _bulk_tool
+    if _bulk_tool is None:
+        from elasticsearch import Elasticsearch
+
+        from elasticflow.bulk import BulkOperationTool
+
+        # 创建 Elasticsearch 客户端连接
+        es_client = Elasticsearch(["http://localhost:9200"])
+
+        # 创建批量操作工具实例
+        _bulk_tool = BulkOperationTool(
+            es_client=es_client,
+            batch_size=BATCH_SIZE,  # 按目标请求大小估算的批次大小
+            max_retries=3,  # 失败时最多重试3次
+            retry_delay=1.0,  # 重试间隔1秒
+            raise_on_error=False,  # 不抛出异常，通过结果对象检查错误
+        )
+    return _bulk_tool
+
 
 # ==================== 示例1：批量索引 ====================
 def example_bulk_index():
@@ -36,7 +53,7 @@ def example_bulk_index():
     ]
 
     # 执行批量索引
-    result = bulk_tool.bulk_index(
+    result = get_bulk_tool().bulk_index(
         index_name="users",
         documents=documents,
         doc_id_field="id",  # 使用 id 字段作为文档ID
@@ -67,7 +84,7 @@ def example_bulk_update():
     ]
 
     # 执行批量更新
-    result = bulk_tool.bulk_update(
+    result = get_bulk_tool().bulk_update(
         index_name="users",
         updates=updates,
         doc_id_field="id",
@@ -85,7 +102,7 @@ def example_bulk_delete():
     doc_ids = ["4"]  # 删除赵六
 
     # 执行批量删除
-    result = bulk_tool.bulk_delete(
+    result = get_bulk_tool().bulk_delete(
         index_name="users",
         doc_ids=doc_ids,
     )
@@ -106,7 +123,7 @@ def example_bulk_upsert():
     ]
 
     # 执行批量 UPSERT
-    result = bulk_tool.bulk_upsert(
+    result = get_bulk_tool().bulk_upsert(
         index_name="users",
         documents=documents,
         doc_id_field="id",
@@ -127,6 +144,7 @@ def example_bulk_upsert():
 # ==================== 示例5：流式批量处理 ====================
 def example_bulk_stream():
     """使用流式处理处理大量数据."""
+    from elasticflow.bulk import BulkAction, BulkOperation
 
     # 生成大量模拟数据（100000条）
     def generate_documents():
@@ -136,8 +154,8 @@ def example_bulk_stream():
                 index_name="logs",
                 doc_id=f"log_{i}",
                 source={
-                    "timestamp": f"2024-01-{i % 31:02d}T{i % 24:02d}:00:00",
-                    "level": ["INFO", "WARNING", "ERROR"][i % 3],
+                    "timestamp": _LOG_TIMESTAMPS[(i % 31) * 24 + i % 24],
+                    "level": _LOG_LEVELS[i % 3],
                     "message": f"日志消息 {i}",
                 },
             )
@@ -151,7 +169,7 @@ def example_bulk_stream():
         )
 
     # 执行流式批量处理
-    result = bulk_tool.bulk_stream(
+    result = get_bulk_tool().bulk_stream(
         operations=generate_documents(),
         progress_callback=progress_callback,
     )
@@ -162,9 +180,33 @@ def example_bulk_stream():
     return result
 
 
+# ==================== 示例5b：预序列化 NDJSON 流式写入 ====================
+def example_bulk_stream_ndjson():
+    """以预序列化的 NDJSON 请求体直接写入，跳过逐条 BulkOperation 对象.
+
+    动作行中不变的部分只编码一次，文档直接序列化到字节缓冲区，
+    凑满 batch_size 后一次性提交给 _bulk 接口。
+    """
+
+    def generate_documents(total: int = 100000):
+        for i in range(total):
+            yield {
+                "timestamp": _LOG_TIMESTAMPS[(i % 31) * 24 + i % 24],
+                "level": _LOG_LEVELS[i % 3],
+                "message": f"日志消息 {i}",
+            }
+
+    result = get_bulk_tool().raw_bulk_index("logs", generate_documents())
+
+    print(f"NDJSON 流式写入完成: 成功={result.success}, 失败={result.failed}")
+    return result
+
+
 # ==================== 示例6：自定义批量操作 ====================
 def example_custom_bulk():
     """使用自定义操作类型进行批量操作."""
+    from elasticflow.bulk import BulkAction, BulkOperation
+
     # 创建混合操作
     operations = [
         # 创建新文档
@@ -197,7 +239,7 @@ def example_custom_bulk():
     ]
 
     # 执行批量操作
-    result = bulk_tool.bulk_execute(operations)
+    result = get_bulk_tool().bulk_execute(operations)
 
     print(f"自定义批量操作结果: 成功={result.success}, 失败={result.failed}")
     return result
@@ -206,8 +248,10 @@ def example_custom_bulk():
 # ==================== 示例7：索引管理器 ====================
 def example_index_manager():
     """展示索引管理器的使用."""
+    from elasticflow.index_manager import IndexManager
+
     # 创建索引管理器实例
-    manager = IndexManager(es_client)
+    manager = IndexManager(get_bulk_tool().es_client)
 
     # 创建索引
     mappings = {
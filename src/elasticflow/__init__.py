@@ -16,199 +16,202 @@
     query_string = builder.build()
 """
 
-__version__ = "0.4.0"
-
-# 导出构建器
-from elasticflow.builders import DslQueryBuilder, SubAggregation, QueryStringBuilder
-
-# 导出核心组件
-from elasticflow.core import (
-    ConditionItem,
-    ConditionParser,
-    DefaultConditionParser,
-    FieldMapper,
-    GroupRelation,
-    LogicOperator,
-    Q,
-    QueryField,
-    QueryStringOperator,
-    escape_query_string,
-)
-
-# 导出异常
-from elasticflow.exceptions import (
-    ConditionParseError,
-    EsQueryToolkitError,
-    QueryStringParseError,
-    UnsupportedOperatorError,
-)
-
-# 导出转换器
-from elasticflow.transformers import QueryStringTransformer
-
-# 导出解析器
-from elasticflow.parsers import (
-    ResponseParser,
-    DataCleaner,
-    NullHandling,
-    PagedResponse,
-    HighlightedHit,
-    TermsBucket,
-    StatsResult,
-    PercentilesResult,
-    CardinalityResult,
-    SuggestionItem,
-)
+from typing import TYPE_CHECKING
 
-# 导出批量操作工具
-from elasticflow.bulk import (
-    BulkAction,
-    BulkErrorItem,
-    BulkOperation,
-    BulkOperationTool,
-    BulkResult,
-)
+from elasticflow._lazy import lazy_exports
 
-# 导出索引管理器
-from elasticflow.index_manager import (
-    IndexManager,
-    IndexInfo,
-    AliasInfo,
-    IndexTemplateInfo,
-    ILMPolicyInfo,
-    ILMPhase,
-    ILMIndexStatus,
-    RolloverInfo,
-    IndexSettings,
-    MappingProperty,
-    IndexMappings,
-)
-
-# 导出查询分析器
-from elasticflow.query_analyzer import (
-    QueryAnalyzer,
-    QueryAnalysis,
-    QuerySuggestion,
-    QueryOptimizationType,
-    QueryProfile,
-    ProfileShard,
-    SlowQueryInfo,
-    SeverityLevel,
-    RuleEngine,
-    OptimizationRule,
-)
-
-# 导出时间范围查询工具
-from elasticflow.time_range import (
-    TimeRangeQueryTool,
-    TimeRange,
-    TimeRangeType,
-    QuickTimeRange,
-)
-
-# 导出地理位置查询工具
-from elasticflow.geo import (
-    GeoQueryTool,
-    GeoPoint,
-    GeoBounds,
-    GeoDistanceUnit,
-)
-
-# 导出客户端工厂
-from elasticflow.connection import (
-    ESClientFactory,
-    ClusterConfig,
-    ConnectionConfig,
-    ClusterRole,
-    ESClientFactoryError,
-    ConnectionConfigError,
-    ClusterNotFoundError,
-    HealthCheckError,
-)
+__version__ = "0.4.0"
 
-__all__ = [
-    # 版本
-    "__version__",
+# 公共 API 按需导入: 名称 -> 所在模块
+# 首次访问时才导入对应子模块，避免 import elasticflow 时加载 elasticsearch 客户端等重量级依赖
+_LAZY_IMPORTS: dict[str, str] = {
     # 构建器
-    "QueryStringBuilder",
-    "DslQueryBuilder",
-    "SubAggregation",
-    # 操作符和枚举
-    "QueryStringOperator",
-    "LogicOperator",
-    "GroupRelation",
+    "DslQueryBuilder": "elasticflow.builders",
+    "SubAggregation": "elasticflow.builders",
+    "QueryStringBuilder": "elasticflow.builders",
     # 核心组件
-    "QueryField",
-    "FieldMapper",
-    "ConditionItem",
-    "ConditionParser",
-    "DefaultConditionParser",
-    "Q",
-    "escape_query_string",
+    "ConditionItem": "elasticflow.core",
+    "ConditionParser": "elasticflow.core",
+    "DefaultConditionParser": "elasticflow.core",
+    "FieldMapper": "elasticflow.core",
+    "GroupRelation": "elasticflow.core",
+    "LogicOperator": "elasticflow.core",
+    "Q": "elasticflow.core",
+    "QueryField": "elasticflow.core",
+    "QueryStringOperator": "elasticflow.core",
+    "escape_query_string": "elasticflow.core",
     # 异常
-    "EsQueryToolkitError",
-    "QueryStringParseError",
-    "ConditionParseError",
-    "UnsupportedOperatorError",
+    "ConditionParseError": "elasticflow.exceptions",
+    "EsQueryToolkitError": "elasticflow.exceptions",
+    "QueryStringParseError": "elasticflow.exceptions",
+    "UnsupportedOperatorError": "elasticflow.exceptions",
     # 转换器
-    "QueryStringTransformer",
+    "QueryStringTransformer": "elasticflow.transformers",
     # 解析器
-    "ResponseParser",
-    "DataCleaner",
-    "NullHandling",
-    "PagedResponse",
-    "HighlightedHit",
-    "TermsBucket",
-    "StatsResult",
-    "PercentilesResult",
-    "CardinalityResult",
-    "SuggestionItem",
+    "ResponseParser": "elasticflow.parsers",
+    "DataCleaner": "elasticflow.parsers",
+    "NullHandling": "elasticflow.parsers",
+    "PagedResponse": "elasticflow.parsers",
+    "HighlightedHit": "elasticflow.parsers",
+    "TermsBucket": "elasticflow.parsers",
+    "StatsResult": "elasticflow.parsers",
+    "PercentilesResult": "elasticflow.parsers",
+    "CardinalityResult": "elasticflow.parsers",
+    "SuggestionItem": "elasticflow.parsers",
     # 批量操作工具
-    "BulkAction",
-    "BulkErrorItem",
-    "BulkOperation",
-    "BulkOperationTool",
-    "BulkResult",
+    "BulkAction": "elasticflow.bulk",
+    "BulkErrorItem": "elasticflow.bulk",
+    "BulkOperation": "elasticflow.bulk",
+    "BulkOperationTool": "elasticflow.bulk",
+    "AsyncBulkOperationTool": "elasticflow.bulk",
+    "BulkResult": "elasticflow.bulk",
+    "OperationPool": "elasticflow.bulk",
+    "TokenBucket": "elasticflow.bulk",
     # 索引管理器
-    "IndexManager",
-    "IndexInfo",
-    "AliasInfo",
-    "IndexTemplateInfo",
-    "ILMPolicyInfo",
-    "ILMPhase",
-    "ILMIndexStatus",
-    "RolloverInfo",
-    "IndexSettings",
-    "MappingProperty",
-    "IndexMappings",
+    "IndexManager": "elasticflow.index_manager",
+    "IndexInfo": "elasticflow.index_manager",
+    "AliasInfo": "elasticflow.index_manager",
+    "IndexTemplateInfo": "elasticflow.index_manager",
+    "ILMPolicyInfo": "elasticflow.index_manager",
+    "ILMPhase": "elasticflow.index_manager",
+    "ILMIndexStatus": "elasticflow.index_manager",
+    "RolloverInfo": "elasticflow.index_manager",
+    "IndexSettings": "elasticflow.index_manager",
+    "MappingProperty": "elasticflow.index_manager",
+    "IndexMappings": "elasticflow.index_manager",
     # 查询分析器
-    "QueryAnalyzer",
-    "QueryAnalysis",
-    "QuerySuggestion",
-    "QueryOptimizationType",
-    "QueryProfile",
-    "ProfileShard",
-    "SlowQueryInfo",
-    "SeverityLevel",
-    "RuleEngine",
-    "OptimizationRule",
+    "QueryAnalyzer": "elasticflow.query_analyzer",
+    "QueryAnalysis": "elasticflow.query_analyzer",
+    "QuerySuggestion": "elasticflow.query_analyzer",
+    "QueryOptimizationType": "elasticflow.query_analyzer",
+    "QueryProfile": "elasticflow.query_analyzer",
+    "ProfileShard": "elasticflow.query_analyzer",
+    "SlowQueryInfo": "elasticflow.query_analyzer",
+    "SeverityLevel": "elasticflow.query_analyzer",
+    "RuleEngine": "elasticflow.query_analyzer",
+    "OptimizationRule": "elasticflow.query_analyzer",
     # 时间范围查询工具
-    "TimeRangeQueryTool",
-    "TimeRange",
-    "TimeRangeType",
-    "QuickTimeRange",
+    "TimeRangeQueryTool": "elasticflow.time_range",
+    "TimeRange": "elasticflow.time_range",
+    "TimeRangeType": "elasticflow.time_range",
+    "QuickTimeRange": "elasticflow.time_range",
     # 地理位置查询工具
-    "GeoQueryTool",
-    "GeoPoint",
-    "GeoBounds",
-    "GeoDistanceUnit",
+    "GeoQueryTool": "elasticflow.geo",
+    "GeoPoint": "elasticflow.geo",
+    "GeoBounds": "elasticflow.geo",
+    "GeoDistanceUnit": "elasticflow.geo",
     # 客户端工厂
-    "ESClientFactory",
-    "ClusterConfig",
-    "ConnectionConfig",
-    "ClusterRole",
-    "ESClientFactoryError",
-    "ConnectionConfigError",
-    "ClusterNotFoundError",
-    "HealthCheckError",
-]
+    "ESClientFactory": "elasticflow.connection",
+    "ClusterConfig": "elasticflow.connection",
+    "ConnectionConfig": "elasticflow.connection",
+    "ClusterRole": "elasticflow.connection",
+    "ESClientFactoryError": "elasticflow.connection",
+    "ConnectionConfigError": "elasticflow.connection",
+    "ClusterNotFoundError": "elasticflow.connection",
+    "HealthCheckError": "elasticflow.connection",
+}
+
+__all__ = ["__version__", *_LAZY_IMPORTS]
+
+# 原先随包一起导入的子模块，保持 elasticflow.<子模块> 属性访问可用
+_SUBMODULES = frozenset(module.rpartition(".")[2] for module in _LAZY_IMPORTS.values())
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS, _SUBMODULES)
+
+# 供类型检查器与 IDE 解析公共名称，运行时不导入
+if TYPE_CHECKING:
+    from elasticflow.builders import (
+        DslQueryBuilder as DslQueryBuilder,
+        SubAggregation as SubAggregation,
+        QueryStringBuilder as QueryStringBuilder,
+    )
+    from elasticflow.core import (
+        ConditionItem as ConditionItem,
+        ConditionParser as ConditionParser,
+        DefaultConditionParser as DefaultConditionParser,
+        FieldMapper as FieldMapper,
+        GroupRelation as GroupRelation,
+        LogicOperator as LogicOperator,
+        Q as Q,
+        QueryField as QueryField,
+        QueryStringOperator as QueryStringOperator,
+        escape_query_string as escape_query_string,
+    )
+    from elasticflow.exceptions import (
+        ConditionParseError as ConditionParseError,
+        EsQueryToolkitError as EsQueryToolkitError,
+        QueryStringParseError as QueryStringParseError,
+        UnsupportedOperatorError as UnsupportedOperatorError,
+    )
+    from elasticflow.transformers import (
+        QueryStringTransformer as QueryStringTransformer,
+    )
+    from elasticflow.parsers import (
+        ResponseParser as ResponseParser,
+        DataCleaner as DataCleaner,
+        NullHandling as NullHandling,
+        PagedResponse as PagedResponse,
+        HighlightedHit as HighlightedHit,
+        TermsBucket as TermsBucket,
+        StatsResult as StatsResult,
+        PercentilesResult as PercentilesResult,
+        CardinalityResult as CardinalityResult,
+        SuggestionItem as SuggestionItem,
+    )
+    from elasticflow.bulk import (
+        BulkAction as BulkAction,
+        BulkErrorItem as BulkErrorItem,
+        BulkOperation as BulkOperation,
+        BulkOperationTool as BulkOperationTool,
+        AsyncBulkOperationTool as AsyncBulkOperationTool,
+        BulkResult as BulkResult,
+        OperationPool as OperationPool,
+        TokenBucket as TokenBucket,
+    )
+    from elasticflow.index_manager import (
+        IndexManager as IndexManager,
+        IndexInfo as IndexInfo,
+        AliasInfo as AliasInfo,
+        IndexTemplateInfo as IndexTemplateInfo,
+        ILMPolicyInfo as ILMPolicyInfo,
+        ILMPhase as ILMPhase,
+        ILMIndexStatus as ILMIndexStatus,
+        RolloverInfo as RolloverInfo,
+        IndexSettings as IndexSettings,
+        MappingProperty as MappingProperty,
+        IndexMappings as IndexMappings,
+    )
+    from elasticflow.query_analyzer import (
+        QueryAnalyzer as QueryAnalyzer,
+        QueryAnalysis as QueryAnalysis,
+        QuerySuggestion as QuerySuggestion,
+        QueryOptimizationType as QueryOptimizationType,
+        QueryProfile as QueryProfile,
+        ProfileShard as ProfileShard,
+        SlowQueryInfo as SlowQueryInfo,
+        SeverityLevel as SeverityLevel,
+        RuleEngine as RuleEngine,
+        OptimizationRule as OptimizationRule,
+    )
+    from elasticflow.time_range import (
+        TimeRangeQueryTool as TimeRangeQueryTool,
+        TimeRange as TimeRange,
+        TimeRangeType as TimeRangeType,
+        QuickTimeRange as QuickTimeRange,
+    )
+    from elasticflow.geo import (
+        GeoQueryTool as GeoQueryTool,
+        GeoPoint as GeoPoint,
+        GeoBounds as GeoBounds,
+        GeoDistanceUnit as GeoDistanceUnit,
+    )
+    from elasticflow.connection import (
+        ESClientFactory as ESClientFactory,
+        ClusterConfig as ClusterConfig,
+        ConnectionConfig as ConnectionConfig,
+        ClusterRole as ClusterRole,
+        ESClientFactoryError as ESClientFactoryError,
+        ConnectionConfigError as ConnectionConfigError,
+        ClusterNotFoundError as ClusterNotFoundError,
+        HealthCheckError as HealthCheckError,
+    )
@@ -0,0 +1,44 @@
+"""包级别按需导入（PEP 562）的公共实现."""
+
+import importlib
+from collections.abc import Callable, Mapping
+from typing import Any
+
+
+def lazy_exports(
+    namespace: dict[str, Any],
+    lazy_imports: Mapping[str, str],
+    submodules: frozenset[str] = frozenset(),
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """生成包模块的 __getattr__ 与 __dir__.
+
+    首次访问公共名称时才导入其所在的子模块，并缓存到包的命名空间中，
+    后续访问不再经过 __getattr__。
+
+    Args:
+        namespace: 包模块的 globals()
+        lazy_imports: 公共名称 -> 所在模块
+        submodules: 可按属性访问的子模块名（elasticflow.<子模块>）
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    package = namespace["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        """首次访问公共名称时导入对应子模块."""
+        module_name = lazy_imports.get(name)
+        if module_name is not None:
+            value = getattr(importlib.import_module(module_name), name)
+        elif name in submodules:
+            value = importlib.import_module(f"{package}.{name}")
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        namespace[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        """包含尚未导入的公共名称."""
+        return sorted(set(namespace) | set(lazy_imports) | submodules)
+
+    return __getattr__, __dir__
@@ -1,10 +1,25 @@
 """构建器模块导出."""
 
-from elasticflow.builders.dsl import DslQueryBuilder, SubAggregation
-from elasticflow.builders.query_string import QueryStringBuilder
-
-__all__ = [
-    "QueryStringBuilder",
-    "DslQueryBuilder",
-    "SubAggregation",
-]
+from typing import TYPE_CHECKING
+
+from elasticflow._lazy import lazy_exports
+
+# 名称 -> 所在模块，首次访问时才导入
+# 只使用 QueryStringBuilder 时不会加载 elasticsearch.dsl
+_LAZY_IMPORTS: dict[str, str] = {
+    "QueryStringBuilder": "elasticflow.builders.query_string",
+    "DslQueryBuilder": "elasticflow.builders.dsl",
+    "SubAggregation": "elasticflow.builders.dsl",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
+
+# 供类型检查器与 IDE 解析公共名称，运行时不导入
+if TYPE_CHECKING:
+    from .query_string import QueryStringBuilder as QueryStringBuilder
+    from .dsl import (
+        DslQueryBuilder as DslQueryBuilder,
+        SubAggregation as SubAggregation,
+    )
@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+import copy
 import dataclasses
 import logging
+import weakref
+from collections import OrderedDict
 from typing import Any
-from collections.abc import Callable
+from collections.abc import Callable, Hashable, Iterable
 
-from elasticsearch.dsl import Q, Search
+from elasticsearch.dsl import A, MultiSearch, Q, Search
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时使用 _freeze 生成缓存键
+    orjson = None
 
 # 模块级别日志记录器
 logger = logging.getLogger(__name__)
@@ -18,11 +26,88 @@ from elasticflow.core.conditions import (
     NestedCondition,
     ConditionParser,
     DefaultConditionParser,
+    merge_nested_should,
 )
 from elasticflow.core.fields import FieldMapper
 
+# 顶层条件对象类型
+ConditionNode = ConditionItem | ConditionGroup | NestedCondition
+
+# 条件解析结果缓存的容量（每个解析器实例独立缓存）
+_PARSE_CACHE_SIZE = 1024
+
+# 默认解析器无状态，所有构建器共享同一实例，从而共享解析缓存
+_DEFAULT_CONDITION_PARSER = DefaultConditionParser()
+
+# 解析器实例 -> {条件规范化键: Q}，解析器被回收时缓存随之释放
+_PARSE_CACHES: weakref.WeakKeyDictionary[ConditionParser, OrderedDict] = (
+    weakref.WeakKeyDictionary()
+)
 
-@dataclasses.dataclass
+# 缓存未命中的标记（缓存值本身可能为 None）
+_MISSING = object()
+
+# add_cached_filter() 使用的过滤条件缓存: {调用方给定的键: Q}，所有构建器共享
+_FILTER_CACHE_SIZE = 1024
+_FILTER_CACHE: OrderedDict[Hashable, Q] = OrderedDict()
+
+# 子聚合配置中的保留键，其余键作为聚合参数透传
+_SUB_AGG_RESERVED = frozenset({"name", "type", "field", "sub_aggregations"})
+
+# 聚合名称中不允许出现的字符及其描述（ES 限制）
+_INVALID_AGG_NAME_CHARS = (('"', "双引号"), (".", "点号"), (" ", "空格"))
+# 删除上述字符的转换表，用于单次扫描判断名称是否合法
+_INVALID_AGG_NAME_TABLE = str.maketrans(
+    "", "", "".join(char for char, _ in _INVALID_AGG_NAME_CHARS)
+)
+
+
+def _freeze(value: Any) -> Hashable:
+    """将条件结构转换为可哈希的规范化形式.
+
+    dict 按键排序，list/tuple 转为 tuple；叶子值带上类型，
+    避免 1 / 1.0 / True 这类相等但语义不同的值共用缓存项.
+
+    Raises:
+        TypeError: 值中包含不可哈希的对象
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    hash(value)
+    return value.__class__, value
+
+
+if orjson is not None:
+    # 键排序保证规范化；datetime、dataclass 及 str/int 等的子类（如枚举）不直接序列化，
+    # 抛出 TypeError 后回退到 _freeze，避免与其序列化结果相同的普通值共用缓存项
+    _ORJSON_KEY_OPTIONS = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+    )
+
+
+def _condition_key(cond: dict) -> Hashable | None:
+    """生成条件的解析缓存键，条件中含不可哈希的值时返回 None.
+
+    安装了 orjson 时使用排序键的 JSON 字节串，比递归 _freeze 快得多;
+    无法序列化时回退到 _freeze
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(cond, option=_ORJSON_KEY_OPTIONS)
+        except TypeError:
+            pass
+    try:
+        return _freeze(cond)
+    except TypeError:
+        return None
+
+
+@dataclasses.dataclass(slots=True)
 class SubAggregation:
     """
     子聚合配置类.
@@ -73,6 +158,51 @@ class SubAggregation:
         return result
 
 
+@dataclasses.dataclass(slots=True, frozen=True)
+class _AggNode:
+    """add_aggregation() 时预先规范化的子聚合，字段已映射为 ES 字段名."""
+
+    name: str
+    type: str  # noqa: A003
+    field: str | None
+    kwargs: dict[str, Any]
+    subs: tuple[_AggNode, ...]
+
+
+def _aggregation_key(
+    agg_type: str, field: str | None, kwargs: dict, subs: tuple[_AggNode, ...]
+) -> Hashable:
+    """聚合定义的规范化键，名称之外定义相同的聚合得到相同的键.
+
+    子聚合的名称会出现在响应中，因此计入键.
+
+    Raises:
+        TypeError: 聚合参数中包含不可哈希的对象
+    """
+    return (
+        agg_type,
+        field,
+        _freeze(kwargs),
+        tuple(
+            (sub.name, _aggregation_key(sub.type, sub.field, sub.kwargs, sub.subs))
+            for sub in subs
+        ),
+    )
+
+
+def _detach_search(search: Search) -> Search:
+    """复制 Search 中与缓存共享的查询与聚合对象.
+
+    extra() 只做浅复制，查询与各聚合对象仍与缓存的 Search（以及解析缓存中的
+    Q 对象）共享，调用方原地修改（如 s.aggs["x"].metric(...)）会影响之后的构建.
+    """
+    search.query._proxied = copy.deepcopy(search.query._proxied)
+    aggs = search.aggs._params.get("aggs")
+    if aggs:
+        search.aggs._params = {"aggs": copy.deepcopy(aggs)}
+    return search
+
+
 class DslQueryBuilder:
     """
     ES DSL 查询构建器.
@@ -100,14 +230,46 @@ class DslQueryBuilder:
         )
 
         result = search.execute()
+
+        # 多个查询通过一次 _msearch 请求执行，减少网络往返
+        responses = DslQueryBuilder.build_many([builder_a, builder_b]).execute()
     """
 
+    __slots__ = (
+        "_search_factory",
+        "_field_mapper",
+        "_condition_parser",
+        "_parse_cache",
+        "_query_string_transformer",
+        "_conditions",
+        "_condition_keys",
+        "_condition_nodes",
+        "_condition_ors",
+        "_query_string",
+        "_ordering",
+        "_page",
+        "_page_size",
+        "_agg_names",
+        "_agg_types",
+        "_agg_fields",
+        "_agg_kwargs",
+        "_agg_subs",
+        "_dedupe_aggregations",
+        "_agg_keys",
+        "_aggregation_aliases",
+        "_raw_aggregations",
+        "_extra_filters",
+        "_prepared",
+        "_prepared_dict",
+    )
+
     def __init__(
         self,
         search_factory: Callable[[], Search],
         field_mapper: FieldMapper | None = None,
         condition_parser: ConditionParser | None = None,
         query_string_transformer: Callable[[str], str] | None = None,
+        dedupe_aggregations: bool = False,
     ):
         """
         初始化构建器.
@@ -117,21 +279,51 @@ class DslQueryBuilder:
             field_mapper: 字段映射器
             condition_parser: 条件解析器
             query_string_transformer: Query String 转换函数
+            dedupe_aggregations: 是否合并定义相同的聚合。开启后，与已添加聚合
+                除名称外完全相同的聚合不再发送给 ES，通过 aggregation_aliases
+                获取被合并的聚合名称对应的实际聚合名称
         """
         self._search_factory = search_factory
         self._field_mapper = field_mapper or FieldMapper()
-        self._condition_parser = condition_parser or DefaultConditionParser()
+        self._condition_parser = condition_parser or _DEFAULT_CONDITION_PARSER
+        try:
+            self._parse_cache = _PARSE_CACHES.setdefault(
+                self._condition_parser, OrderedDict()
+            )
+        except TypeError:
+            # 解析器不可哈希或不支持弱引用时，退化为构建器私有缓存
+            self._parse_cache = OrderedDict()
         self._query_string_transformer = query_string_transformer
 
         # 查询参数
         self._conditions: list[dict] = []
+        # conditions() 时预先转换好的条件，按列分别存放（下标一一对应），build() 直接使用:
+        # 解析缓存键（None 表示不走缓存）、条件对象、是否以 or 与前面的条件组合
+        self._condition_keys: tuple[Hashable | None, ...] = ()
+        self._condition_nodes: tuple[ConditionNode, ...] = ()
+        self._condition_ors: tuple[bool, ...] = ()
         self._query_string: str = ""
         self._ordering: list[str] = []
         self._page: int = 1
         self._page_size: int = 10
-        self._aggregations: list[dict] = []
+        # add_aggregation() 添加的聚合，按列分别存放（下标一一对应）:
+        # 名称、类型、ES 字段名、聚合参数、子聚合列表
+        self._agg_names: list[str] = []
+        self._agg_types: list[str] = []
+        self._agg_fields: list[str | None] = []
+        self._agg_kwargs: list[dict[str, Any]] = []
+        self._agg_subs: list[tuple[_AggNode, ...]] = []
+        self._dedupe_aggregations = dedupe_aggregations
+        # 开启聚合合并时使用: 聚合定义键 -> 实际聚合名称
+        self._agg_keys: dict[Hashable, str] = {}
+        # 被合并的聚合名称 -> 实际聚合名称
+        self._aggregation_aliases: dict[str, str] = {}
         self._raw_aggregations: list[dict] = []  # 原始聚合 DSL
         self._extra_filters: list[Q] = []
+        # 除分页外的已构建 Search，查询参数变化时失效，仅翻页时直接复用
+        self._prepared: Search | None = None
+        # to_dict() 结果缓存: ((page, page_size), dsl)，与 _prepared 同时失效
+        self._prepared_dict: tuple[tuple[int, int], dict[str, Any]] | None = None
 
     def conditions(self, conditions: list[dict]) -> DslQueryBuilder:
         """
@@ -143,7 +335,20 @@ class DslQueryBuilder:
         Returns:
             self，支持链式调用
         """
-        self._conditions = self._field_mapper.transform_condition_fields(conditions)
+        if self._field_mapper.is_empty:
+            # 没有字段映射时无需转换，字段名保持原样
+            conditions = list(conditions)
+        else:
+            conditions = self._field_mapper.transform_condition_fields(conditions)
+        self._conditions = self._prune_conditions(conditions)
+        keys, nodes, ors = self._normalize_conditions(self._conditions)
+        if keys == self._condition_keys and None not in keys:
+            # 与当前条件完全相同（缓存键是条件内容的快照），保留已构建的 Search
+            return self
+        self._condition_keys = keys
+        self._condition_nodes = nodes
+        self._condition_ors = ors
+        self._invalidate()
         return self
 
     def query_string(self, query_string: str | None) -> DslQueryBuilder:
@@ -156,7 +361,11 @@ class DslQueryBuilder:
         Returns:
             self，支持链式调用
         """
-        self._query_string = query_string or ""
+        # 保存去除首尾空白后的结果，构建时无需再处理
+        query_string = (query_string or "").strip()
+        if query_string != self._query_string:
+            self._query_string = query_string
+            self._invalidate()
         return self
 
     def ordering(self, ordering: list[str]) -> DslQueryBuilder:
@@ -169,7 +378,13 @@ class DslQueryBuilder:
         Returns:
             self，支持链式调用
         """
-        self._ordering = self._field_mapper.transform_ordering_fields(ordering)
+        if self._field_mapper.is_empty:
+            ordering = list(ordering)
+        else:
+            ordering = self._field_mapper.transform_ordering_fields(ordering)
+        if ordering != self._ordering:
+            self._ordering = ordering
+            self._invalidate()
         return self
 
     def pagination(self, page: int = 1, page_size: int = 10) -> DslQueryBuilder:
@@ -187,8 +402,12 @@ class DslQueryBuilder:
             # 只获取聚合结果，不返回文档
             builder.pagination(page=1, page_size=0)
         """
+        page_size = max(0, page_size)  # 允许 0，用于只返回聚合结果
+        if (page_size == 0) != (self._page_size == 0):
+            # 只返回聚合结果时不添加排序，切换时需要重新构建
+            self._invalidate()
         self._page = max(1, page)
-        self._page_size = max(0, page_size)  # 允许 0，用于只返回聚合结果
+        self._page_size = page_size
         return self
 
     def add_filter(self, q: Q | None) -> DslQueryBuilder:
@@ -203,8 +422,49 @@ class DslQueryBuilder:
         """
         if q is not None:
             self._extra_filters.append(q)
+            self._invalidate()
         return self
 
+    def add_cached_filter(
+        self, key: Hashable, factory: Callable[[], Q | None]
+    ) -> DslQueryBuilder:
+        """
+        添加按键缓存的额外过滤条件.
+
+        相同 key 的过滤条件只通过 factory 构造一次，之后所有构建器共享同一个
+        Q 对象，适用于租户隔离等在大量查询中重复出现的过滤条件。
+
+        Args:
+            key: 缓存键，需能唯一确定过滤条件的内容
+            factory: 构造 Q 对象的函数，仅在缓存未命中时调用
+
+        Returns:
+            self，支持链式调用
+
+        示例:
+            builder.add_cached_filter(
+                ("tenant", tenant_id), lambda: Q("term", tenant_id=tenant_id)
+            )
+        """
+        # 缓存在线程间共享且不加锁，其他线程可能在任意两步之间淘汰该键
+        q = _FILTER_CACHE.get(key)
+        if q is None:
+            q = factory()
+            if q is None:
+                return self
+            q = _FILTER_CACHE.setdefault(key, q)
+            if len(_FILTER_CACHE) > _FILTER_CACHE_SIZE:
+                try:
+                    _FILTER_CACHE.popitem(last=False)
+                except KeyError:
+                    pass
+        else:
+            try:
+                _FILTER_CACHE.move_to_end(key)
+            except KeyError:
+                pass
+        return self.add_filter(q)
+
     def _validate_aggregation_name(self, name: str) -> None:
         """
         验证聚合名称是否有效.
@@ -225,9 +485,10 @@ class DslQueryBuilder:
             raise ValueError("聚合名称不能为空")
         if not isinstance(name, str):
             raise ValueError("聚合名称必须是字符串")
-        # 聚合名称不能包含特殊字符（ES 限制）
-        invalid_chars = {'"': "双引号", ".": "点号", " ": "空格"}
-        for char, char_name in invalid_chars.items():
+        # 聚合名称不能包含特殊字符（ES 限制），长度不变说明没有非法字符
+        if len(name.translate(_INVALID_AGG_NAME_TABLE)) == len(name):
+            return
+        for char, char_name in _INVALID_AGG_NAME_CHARS:
             if char in name:
                 raise ValueError(f"聚合名称不能包含{char_name}: '{char}'")
 
@@ -302,25 +563,98 @@ class DslQueryBuilder:
         es_field = (
             self._field_mapper.get_es_field(field, for_agg=True) if field else None
         )
-        # 将 SubAggregation 对象转换为字典
-        normalized_sub_aggs = None
-        if sub_aggregations:
-            normalized_sub_aggs = [
-                sub.to_dict() if isinstance(sub, SubAggregation) else sub
-                for sub in sub_aggregations
-            ]
-
-        self._aggregations.append(
-            {
-                "name": name,
-                "type": agg_type,
-                "field": es_field,
-                "kwargs": kwargs,
-                "sub_aggregations": normalized_sub_aggs,
-            }
-        )
+        # 子聚合一次性规范化（含字段映射），build() 时直接使用
+        normalized_sub_aggs = self._normalize_sub_aggregations(sub_aggregations)
+
+        if self._dedupe_aggregations and self._merge_duplicate_aggregation(
+            name, agg_type, es_field, kwargs, normalized_sub_aggs
+        ):
+            return self
+
+        self._agg_names.append(name)
+        self._agg_types.append(agg_type)
+        self._agg_fields.append(es_field)
+        self._agg_kwargs.append(kwargs)
+        self._agg_subs.append(normalized_sub_aggs)
+        self._invalidate()
         return self
 
+    def _merge_duplicate_aggregation(
+        self,
+        name: str,
+        agg_type: str,
+        field: str | None,
+        kwargs: dict[str, Any],
+        subs: tuple[_AggNode, ...],
+    ) -> bool:
+        """登记聚合定义，与已添加的聚合定义相同时记录别名并返回 True."""
+        try:
+            key = _aggregation_key(agg_type, field, kwargs, subs)
+        except TypeError:
+            # 参数不可哈希时无法判断是否重复，照常添加
+            key = None
+
+        existing = self._agg_keys.get(key) if key is not None else None
+        if existing is not None:
+            if existing != name:
+                logger.debug(f"聚合 '{name}' 与 '{existing}' 定义相同，已合并")
+                self._aggregation_aliases[name] = existing
+            return True
+
+        # 同名聚合会覆盖先前的定义，先前的定义不能再作为合并目标
+        if name in self._agg_names:
+            self._agg_keys = {k: v for k, v in self._agg_keys.items() if v != name}
+        self._aggregation_aliases.pop(name, None)
+        if key is not None:
+            self._agg_keys[key] = name
+        return False
+
+    @property
+    def aggregation_aliases(self) -> dict[str, str]:
+        """被合并的聚合名称 -> 实际发送给 ES 的聚合名称（dedupe_aggregations 开启时）.
+
+        示例:
+            builder = DslQueryBuilder(search_factory=..., dedupe_aggregations=True)
+            builder.add_aggregation("a", "terms", field="status")
+            builder.add_aggregation("b", "terms", field="status")
+            builder.aggregation_aliases  # {"b": "a"}
+            # 读取 b 的结果: response.aggregations[aliases.get("b", "b")]
+        """
+        return dict(self._aggregation_aliases)
+
+    def _normalize_sub_aggregations(
+        self, sub_aggregations: list[dict | SubAggregation] | None
+    ) -> tuple[_AggNode, ...]:
+        """将子聚合（字典或 SubAggregation）递归转换为 _AggNode."""
+        if not sub_aggregations:
+            return ()
+
+        nodes = []
+        for sub in sub_aggregations:
+            if isinstance(sub, SubAggregation):
+                name, agg_type, field = sub.name, sub.type, sub.field
+                kwargs = sub.kwargs
+                subs = sub.sub_aggregations
+            else:
+                name, agg_type = sub.get("name"), sub.get("type")
+                field = sub.get("field")
+                kwargs = {k: v for k, v in sub.items() if k not in _SUB_AGG_RESERVED}
+                subs = sub.get("sub_aggregations")
+
+            # 对子聚合字段也进行映射转换
+            if field:
+                field = self._field_mapper.get_es_field(field, for_agg=True)
+            nodes.append(
+                _AggNode(
+                    name=name,
+                    type=agg_type,
+                    field=field,
+                    kwargs=kwargs,
+                    subs=self._normalize_sub_aggregations(subs),
+                )
+            )
+        return tuple(nodes)
+
     def add_stats_aggregation(
         self,
         name: str,
@@ -482,137 +816,339 @@ class DslQueryBuilder:
             })
         """
         self._raw_aggregations.append(agg_dict)
+        self._invalidate()
         return self
 
+    def _invalidate(self) -> None:
+        """查询参数变化后清除已构建的 Search 及 DSL 缓存."""
+        self._prepared = None
+        self._prepared_dict = None
+
     def build(self) -> Search:
         """
         构建 Search 对象.
 
+        除分页外的部分只在查询参数变化后构建一次，之后仅改变分页时
+        直接在缓存的 Search 上设置 from/size（extra() 会返回新的副本）。
+        返回值中的查询与聚合对象为独立副本，原地修改不会影响之后的 build()。
+
         Returns:
             elasticsearch.dsl.Search 对象
         """
-        search = self._search_factory()
+        return _detach_search(self._paginated())
 
-        # 添加条件过滤
-        search = self._apply_conditions(search)
+    def _paginated(self) -> Search:
+        """在缓存的 Search 上设置分页，返回的 Search 与缓存共享查询与聚合对象."""
+        if self._prepared is None:
+            self._prepared = self._prepare()
 
-        # 添加 Query String
-        search = self._apply_query_string(search)
+        # 添加分页
+        # 当 page_size=0 时，仍然需要显式设置 size，这样 ES 会返回聚合结果但返回 0 条文档，
+        # 且只有 size=0 的请求才会被 ES 分片请求缓存（shard request cache）缓存
+        if self._page_size == 0:
+            return self._prepared.extra(size=0)
+        return self._prepared.extra(
+            from_=(self._page - 1) * self._page_size, size=self._page_size
+        )
 
-        # 添加额外过滤
-        for q in self._extra_filters:
-            search = search.filter(q)
+    def _prepare(self) -> Search:
+        """构建除分页外的 Search 对象."""
+        search = self._search_factory()
 
-        # 添加排序
-        if self._ordering:
-            search = search.sort(*self._ordering)
+        # 添加条件过滤、Query String 与额外过滤（合并为一次 query 调用）
+        search = self._apply_query(search)
 
-        # 添加分页
-        start = (self._page - 1) * self._page_size
-        # 当 page_size=0 时，仍然需要调用切片，这样 ES 会返回聚合结果但返回 0 条文档
-        search = search[start : start + self._page_size]
+        # 添加排序（只返回聚合结果时排序没有意义，不添加）
+        if self._ordering and self._page_size:
+            search = search.sort(*self._ordering)
 
         # 添加聚合
-        search = self._apply_aggregations(search)
+        if self._agg_names or self._raw_aggregations:
+            search = self._apply_aggregations(search)
 
         return search
 
-    def _apply_conditions(self, search: Search) -> Search:
-        """应用条件过滤."""
-        if not self._conditions:
+    def _apply_query(self, search: Search) -> Search:
+        """应用条件过滤、Query String 与额外过滤.
+
+        条件子句、额外过滤与 Query String 合并为一个 bool 查询，只调用一次
+        search.query()，避免每个部分、每个额外过滤各自复制一次 Search；
+        三者均为空时直接返回工厂产出的 Search，不做任何复制
+        """
+        if not (self._condition_nodes or self._extra_filters or self._query_string):
             return search
 
-        combined_q = None
+        filters, must_not = self._condition_clauses()
+        filters.extend(self._extra_filters)
+        query_string = self._query_string_clause()
+
+        params: dict[str, list[Q]] = {}
+        if filters:
+            params["filter"] = filters
+        if must_not:
+            params["must_not"] = must_not
+        if query_string is not None:
+            if not params:
+                # 仅有 Query String 时直接作为查询，不额外包装
+                return search.query(query_string)
+            params["must"] = [query_string]
+        if params:
+            search = search.query(Q("bool", **params))
 
-        for cond in self._conditions:
-            # 支持多种条件类型
-            cond_type = cond.get("type", "item")
+        return search
 
+    def _condition_clauses(self) -> tuple[list[Q], list[Q]]:
+        """将条件解析为顶层 bool 的 filter 与 must_not 子句."""
+        filters: list[Q] = []
+        must_not: list[Q] = []
+        if not self._condition_nodes:
+            return filters, must_not
+
+        # 条件按出现顺序从左到右组合: ((c1 AND c2) OR c3) AND c4 ...
+        # shoulds: 当前 OR 组的子句（非 None 时作为 AND 列表的第一项）
+        # clauses: 其后以 AND 连接的子句
+        # 收集完成后一次性构造 bool 查询，避免逐个 &/| 反复包装 Q 对象
+        shoulds: list[Q] | None = None
+        clauses: list[Q] = []
+
+        for key, node, is_or in zip(
+            self._condition_keys, self._condition_nodes, self._condition_ors
+        ):
             try:
-                if cond_type == "item":
-                    # 普通条件
-                    if "key" not in cond or "value" not in cond:
-                        # 跳过无效条件
-                        continue
-
-                    condition_item = ConditionItem(
-                        key=cond["key"],
-                        method=cond.get("method", "eq"),
-                        value=cond["value"],
-                        condition=cond.get("condition", "and"),
-                    )
-                    q = self._condition_parser.parse(condition_item)
-
-                elif cond_type == "group":
-                    # 条件组（逻辑嵌套）
-                    condition_group = ConditionGroup(
-                        condition=cond.get("condition", "and"),
-                        children=cond.get("children", []),
-                        minimum_should_match=cond.get("minimum_should_match"),
-                    )
-                    q = self._condition_parser.parse_group(condition_group)
-
-                elif cond_type == "nested":
-                    # nested 条件（ES Nested 类型）
-                    if "path" not in cond:
-                        # 跳过无效条件
-                        continue
-
-                    nested_condition = NestedCondition(
-                        path=cond["path"],
-                        condition=cond.get("condition", "and"),
-                        children=cond.get("children", []),
-                        score_mode=cond.get("score_mode"),
-                        minimum_should_match=cond.get("minimum_should_match"),
-                        inner_hits=cond.get("inner_hits"),
-                    )
-                    q = self._condition_parser.parse_nested(nested_condition)
+                q = self._parse_node_cached(key, node)
+            except (KeyError, ValueError) as e:
+                # 记录无效条件，便于生产环境排查问题
+                logger.warning(f"跳过无效条件: {node}, 错误: {e}")
+                continue
+
+            if q is None:
+                continue
 
+            if is_or and (shoulds is not None or clauses):
+                if clauses:
+                    shoulds = [self._and_queries(shoulds, clauses), q]
+                    clauses = []
                 else:
-                    # 未知类型，跳过
-                    continue
+                    # 连续的 or 合并到同一个 should 列表
+                    shoulds.append(q)
+            else:
+                clauses.append(q)
 
+        if shoulds is not None:
+            clauses.insert(0, Q("bool", should=merge_nested_should(shoulds)))
+
+        # 各子句直接作为顶层 bool 的 filter / must_not 元素，保持在不评分、可缓存的过滤上下文中，
+        # 纯否定子句（如 neq、nexists）展开到 must_not，避免再嵌套一层 bool
+        for q in clauses:
+            negated = self._negated_clauses(q)
+            if negated is None:
+                filters.append(q)
+            else:
+                must_not.extend(negated)
+
+        return filters, must_not
+
+    @staticmethod
+    def _negated_clauses(q: Q) -> list[Q] | None:
+        """若 q 是仅包含 must_not 的 bool 查询则返回其否定子句，否则返回 None."""
+        if getattr(q, "name", None) == "bool" and q._params.keys() == {"must_not"}:
+            return list(q.must_not)
+        return None
+
+    @staticmethod
+    def _and_queries(shoulds: list[Q] | None, clauses: list[Q]) -> Q:
+        """以 AND 组合 OR 组与其后的子句，只有一项时直接返回该项."""
+        items = (
+            [Q("bool", should=merge_nested_should(shoulds))]
+            if shoulds is not None
+            else []
+        )
+        items.extend(clauses)
+        return items[0] if len(items) == 1 else Q("bool", filter=items)
+
+    @classmethod
+    def _prune_conditions(cls, conditions: list[dict]) -> list[dict]:
+        """移除不会产生任何查询的条件子树.
+
+        - children 为空（递归裁剪后）的 group / nested 直接丢弃
+        - 只有一个普通条件子项、且未指定 minimum_should_match 的 group
+          折叠为该子项（沿用 group 与前面条件的组合方式）
+        """
+        pruned = []
+        for cond in conditions:
+            cond_type = cond.get("type", "item")
+            if cond_type not in ("group", "nested"):
+                pruned.append(cond)
+                continue
+
+            children = cls._prune_conditions(cond.get("children") or [])
+            if not children:
+                continue
+
+            if (
+                cond_type == "group"
+                and len(children) == 1
+                and children[0].get("type", "item") == "item"
+                and cond.get("minimum_should_match") is None
+            ):
+                child = children[0].copy()
+                child["condition"] = cond.get("condition", "and")
+                pruned.append(child)
+                continue
+
+            if children != cond["children"]:
+                cond = {**cond, "children": children}
+            pruned.append(cond)
+        return pruned
+
+    def _normalize_conditions(
+        self, conditions: list[dict]
+    ) -> tuple[
+        tuple[Hashable | None, ...], tuple[ConditionNode, ...], tuple[bool, ...]
+    ]:
+        """将条件字典预先转换为条件对象，build() 时无需再读取字典.
+
+        Returns:
+            (缓存键, 条件对象, 是否以 or 与前面的条件组合) 三个等长元组；
+            缓存键为 None 表示该条件含不可哈希的值，不走解析缓存
+        """
+        keys: list[Hashable | None] = []
+        nodes: list[ConditionNode] = []
+        ors: list[bool] = []
+        for cond in conditions:
+            try:
+                node = self._build_condition_node(cond)
             except (KeyError, ValueError) as e:
                 # 记录无效条件，便于生产环境排查问题
                 logger.warning(f"跳过无效条件: {cond}, 错误: {e}")
                 continue
 
-            if q is None:
+            if node is None:
                 continue
 
-            # 组合条件
-            if combined_q is None:
-                combined_q = q
-            elif cond.get("condition") == "or":
-                combined_q = combined_q | q
-            else:
-                combined_q = combined_q & q
+            keys.append(_condition_key(cond))
+            nodes.append(node)
+            ors.append(cond.get("condition") == "or")
+        return tuple(keys), tuple(nodes), tuple(ors)
+
+    @staticmethod
+    def _build_item_node(cond: dict) -> ConditionItem | None:
+        """普通条件，缺少 key 或 value 时跳过."""
+        if "key" not in cond or "value" not in cond:
+            return None
+
+        return ConditionItem(
+            key=cond["key"],
+            method=cond.get("method", "eq"),
+            value=cond["value"],
+            condition=cond.get("condition", "and"),
+        )
 
-        if combined_q is not None:
-            search = search.filter(combined_q)
+    @staticmethod
+    def _build_group_node(cond: dict) -> ConditionGroup:
+        """条件组（逻辑嵌套）."""
+        return ConditionGroup(
+            condition=cond.get("condition", "and"),
+            children=cond.get("children", []),
+            minimum_should_match=cond.get("minimum_should_match"),
+        )
 
-        return search
+    @staticmethod
+    def _build_nested_node(cond: dict) -> NestedCondition | None:
+        """nested 条件（ES Nested 类型），缺少 path 时跳过."""
+        if "path" not in cond:
+            return None
+
+        return NestedCondition(
+            path=cond["path"],
+            condition=cond.get("condition", "and"),
+            children=cond.get("children", []),
+            score_mode=cond.get("score_mode"),
+            minimum_should_match=cond.get("minimum_should_match"),
+            inner_hits=cond.get("inner_hits"),
+        )
 
-    def _apply_query_string(self, search: Search) -> Search:
-        """应用 Query String."""
-        query_string = self._query_string.strip()
+    # 条件类型 -> 条件对象构造函数，只需一次字典查找
+    _NODE_BUILDERS = {
+        "item": _build_item_node,
+        "group": _build_group_node,
+        "nested": _build_nested_node,
+    }
+
+    @classmethod
+    def _build_condition_node(cls, cond: dict) -> ConditionNode | None:
+        """将单个条件字典转换为条件对象，无效或未知类型的条件返回 None."""
+        builder = cls._NODE_BUILDERS.get(cond.get("type", "item"))
+        if builder is None:
+            # 未知类型，跳过
+            return None
+        return builder(cond)
+
+    def _parse_node_cached(self, key: Hashable | None, node: ConditionNode) -> Q | None:
+        """解析条件对象，相同结构的条件直接复用缓存的 Q 对象.
+
+        缓存挂在解析器实例上，共享同一解析器的构建器之间可以复用.
+        解析器应当是无副作用的：相同输入总是得到相同的 Q 对象.
+        """
+        if key is None:
+            # 条件中包含不可哈希的值，不走缓存
+            return self._parse_node(node)
+
+        # 缓存在线程间共享且不加锁：只做单步的 get / 赋值，其他线程在两步之间
+        # 淘汰了该键时忽略 KeyError，避免被当作无效条件而丢弃
+        cache = self._parse_cache
+        q = cache.get(key, _MISSING)
+        if q is not _MISSING:
+            try:
+                cache.move_to_end(key)
+            except KeyError:
+                pass
+            return q
+
+        q = self._parse_node(node)
+        cache[key] = q
+        if len(cache) > _PARSE_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                pass
+        return q
+
+    def _parse_node(self, node: ConditionNode) -> Q | None:
+        """按条件对象类型分派给解析器."""
+        if isinstance(node, ConditionItem):
+            return self._condition_parser.parse(node)
+        if isinstance(node, NestedCondition):
+            return self._condition_parser.parse_nested(node)
+        return self._condition_parser.parse_group(node)
+
+    def _query_string_clause(self) -> Q | None:
+        """构造 Query String 查询，未设置时返回 None."""
+        query_string = self._query_string
         if not query_string:
-            return search
+            return None
 
         # 转换处理
         if self._query_string_transformer:
             query_string = self._query_string_transformer(query_string)
 
-        search = search.query("query_string", query=query_string)
-        return search
+        return Q("query_string", query=query_string)
 
     def _apply_aggregations(self, search: Search) -> Search:
         """应用聚合.
 
         注意: search.aggs.bucket() 是原地修改，不需要重新赋值
         """
-        for agg in self._aggregations:
-            self._apply_single_aggregation(search.aggs, agg)
+        for name, agg_type, field, kwargs, sub_aggregations in zip(
+            self._agg_names,
+            self._agg_types,
+            self._agg_fields,
+            self._agg_kwargs,
+            self._agg_subs,
+        ):
+            self._apply_single_aggregation(
+                search.aggs, name, agg_type, field, kwargs, sub_aggregations
+            )
 
         # 应用原始聚合 DSL
         for raw_agg in self._raw_aggregations:
@@ -620,26 +1156,26 @@ class DslQueryBuilder:
 
         return search
 
-    def _apply_single_aggregation(self, parent_aggs: Any, agg: dict) -> None:
+    def _apply_single_aggregation(
+        self,
+        parent_aggs: Any,
+        name: str,
+        agg_type: str,
+        field: str | None,
+        kwargs: dict[str, Any],
+        sub_aggregations: tuple[_AggNode, ...],
+    ) -> None:
         """
         应用单个聚合（支持子聚合递归）.
 
         Args:
             parent_aggs: 父聚合对象
-            agg: 聚合配置
+            name: 聚合名称
+            agg_type: 聚合类型
+            field: ES 字段名
+            kwargs: 聚合参数
+            sub_aggregations: 已规范化的子聚合
         """
-        name = agg["name"]
-        agg_type = agg["type"]
-        field = agg.get("field")
-        # 支持 kwargs 字典或顶层直接展平的参数
-        kwargs = agg.get("kwargs", {})
-        if not kwargs:
-            # 如果没有 kwargs 键，从顶层获取除保留键外的所有参数
-            reserved_keys = {"name", "type", "field", "sub_aggregations", "kwargs"}
-            kwargs = {k: v for k, v in agg.items() if k not in reserved_keys}
-
-        sub_aggregations = agg.get("sub_aggregations")
-
         # 处理 top_hits 特殊参数
         if agg_type == "top_hits":
             # top_hits 不需要 field 参数
@@ -650,65 +1186,83 @@ class DslQueryBuilder:
             agg_obj = parent_aggs.bucket(name, agg_type, **kwargs)
 
         # 递归处理子聚合
-        if sub_aggregations:
-            for sub_agg in sub_aggregations:
-                # 将子聚合配置标准化
-                sub_field = sub_agg.get("field")
-                # 对子聚合字段也进行映射转换
-                if sub_field:
-                    es_sub_field = self._field_mapper.get_es_field(
-                        sub_field, for_agg=True
-                    )
-                else:
-                    es_sub_field = None
-
-                sub_agg_config = {
-                    "name": sub_agg.get("name"),
-                    "type": sub_agg.get("type"),
-                    "field": es_sub_field,
-                    "kwargs": {
-                        k: v
-                        for k, v in sub_agg.items()
-                        if k not in ("name", "type", "field", "sub_aggregations")
-                    },
-                    "sub_aggregations": sub_agg.get("sub_aggregations"),
-                }
-                self._apply_single_aggregation(agg_obj, sub_agg_config)
+        for sub in sub_aggregations:
+            self._apply_single_aggregation(
+                agg_obj, sub.name, sub.type, sub.field, sub.kwargs, sub.subs
+            )
 
     def _apply_raw_aggregation(self, search: Search, raw_agg: dict) -> None:
         """
         应用原始聚合 DSL.
 
+        直接将每个聚合挂载到 search.aggs 上，不再经过
+        to_dict/update_from_dict 的整体序列化与重新解析，
+        也不会影响 query/sort/size 等其他查询参数。
+
         Args:
             search: Search 对象
-            raw_agg: 原始聚合 DSL
+            raw_agg: 原始聚合 DSL，格式为 {聚合名称: 聚合定义}
         """
-        # 获取当前查询 DSL
-        current_dict = search.to_dict()
-        # 合并聚合，避免覆盖其他查询参数
-        aggs = current_dict.get("aggs", {})
-        aggs.update(raw_agg)
-        # 使用 update_from_dict 传入完整 DSL，避免覆盖 query/sort/size 等
-        current_dict["aggs"] = aggs
-        search.update_from_dict(current_dict)
+        for name, body in raw_agg.items():
+            search.aggs[name] = A(body)
 
     def clear(self) -> DslQueryBuilder:
         """清空所有查询参数."""
         self._conditions.clear()
+        self._condition_keys = ()
+        self._condition_nodes = ()
+        self._condition_ors = ()
         self._query_string = ""
         self._ordering.clear()
         self._page = 1
         self._page_size = 10
-        self._aggregations.clear()
+        self._agg_names.clear()
+        self._agg_types.clear()
+        self._agg_fields.clear()
+        self._agg_kwargs.clear()
+        self._agg_subs.clear()
+        self._agg_keys.clear()
+        self._aggregation_aliases.clear()
         self._raw_aggregations.clear()
         self._extra_filters.clear()
+        self._invalidate()
         return self
 
     def to_dict(self) -> dict[str, Any]:
         """
         导出为字典格式的 DSL.
 
+        结果按分页窗口缓存，查询参数未变化时重复调用直接返回同一个字典，
+        不再重新序列化。返回值为只读：不要原地修改，需要修改时先自行
+        copy.deepcopy()。
+
         Returns:
             字典格式的 DSL
         """
-        return self.build().to_dict()
+        window = (self._page, self._page_size)
+        if self._prepared_dict is None or self._prepared_dict[0] != window:
+            self._prepared_dict = (window, self._paginated().to_dict())
+        return self._prepared_dict[1]
+
+    @classmethod
+    def build_many(
+        cls, builders: Iterable[DslQueryBuilder], **kwargs: Any
+    ) -> MultiSearch:
+        """
+        将多个构建器的查询合并为一个 MultiSearch.
+
+        执行时所有查询通过一次 _msearch 请求发送，相比逐个执行
+        减少了 HTTP 往返及协调节点的请求处理开销.
+
+        Args:
+            builders: 构建器列表，响应顺序与其一致
+            **kwargs: 传给 MultiSearch 的参数，如 index、using
+
+        Returns:
+            elasticsearch.dsl.MultiSearch 对象
+        """
+        multi_search = MultiSearch(**kwargs)
+        for builder in builders:
+            # add() 返回新的副本
+            multi_search = multi_search.add(builder.build())
+        return multi_search
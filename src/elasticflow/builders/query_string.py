@@ -1,14 +1,41 @@
 """Query String 构建器模块."""
 
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain, islice
 from typing import TYPE_CHECKING, Any
 
-from elasticflow.core.operators import GroupRelation, LogicOperator, QueryStringOperator
-from elasticflow.core.utils import escape_query_string
+from elasticflow.core.operators import (
+    EQUAL_OPERATORS,
+    INCLUDE_OPERATORS,
+    NO_VALUE_OPERATORS,
+    RANGE_OPERATORS,
+    REGEX_OPERATORS,
+    GroupRelation,
+    LogicOperator,
+    QueryStringOperator,
+)
+from elasticflow.core.utils import escape_query_value
 from elasticflow.exceptions import UnsupportedOperatorError
 
 if TYPE_CHECKING:
     from elasticflow.core.query import Q
 
+# 多个值之间的连接串
+_OR_JOIN = f" {LogicOperator.OR.value} "
+_AND_JOIN = f" {LogicOperator.AND.value} "
+
+# 精确匹配时双引号的转义表
+_QUOTE_ESCAPE_TABLE = str.maketrans({'"': '\\"'})
+
+
+def _strip_wildcards(value: Any) -> str:
+    """转为字符串并去除首尾通配符，不含首尾通配符时不做 strip."""
+    value = value if type(value) is str else str(value)
+    if value[:1] == "*" or value[-1:] == "*":
+        return value.strip("*")
+    return value
+
 
 class QueryStringBuilder:
     """
@@ -44,21 +71,33 @@ class QueryStringBuilder:
         # 输出: message: *timeout* AND (@timestamp: [now-1h TO now]) AND (status: "error")
     """
 
-    # Query String 操作符模板
-    OPERATOR_TEMPLATES = {
-        QueryStringOperator.EXISTS: "{field}: *",
-        QueryStringOperator.NOT_EXISTS: "NOT {field}: *",
-        QueryStringOperator.EQUAL: "{field}: {value}",
-        QueryStringOperator.NOT_EQUAL: "NOT {field}: {value}",
-        QueryStringOperator.INCLUDE: "{field}: {value}",
-        QueryStringOperator.NOT_INCLUDE: "NOT {field}: {value}",
-        QueryStringOperator.GT: "{field}: >{value}",
-        QueryStringOperator.LT: "{field}: <{value}",
-        QueryStringOperator.GTE: "{field}: >={value}",
-        QueryStringOperator.LTE: "{field}: <={value}",
-        QueryStringOperator.BETWEEN: "{field}: [{start_value} TO {end_value}]",
-        QueryStringOperator.REG: "{field}: /{value}/",
-        QueryStringOperator.NREG: "NOT {field}: /{value}/",
+    __slots__ = (
+        "_filters",
+        "_compiled",
+        "_raw_queries",
+        "_operator_mapping",
+        "_logic_operator",
+        "_join_str",
+        "_cached",
+    )
+
+    # Query String 操作符渲染函数: (字段名, 处理后的值) -> 查询语句
+    # 使用 f-string 直接拼接，避免每次调用 str.format 重新解析模板；
+    # BETWEEN 的值为 "起始值 TO 结束值"，EXISTS / NOT_EXISTS 忽略值
+    OPERATOR_RENDERERS: dict[QueryStringOperator, Callable[[str, str], str]] = {
+        QueryStringOperator.EXISTS: lambda field, value: f"{field}: *",
+        QueryStringOperator.NOT_EXISTS: lambda field, value: f"NOT {field}: *",
+        QueryStringOperator.EQUAL: lambda field, value: f"{field}: {value}",
+        QueryStringOperator.NOT_EQUAL: lambda field, value: f"NOT {field}: {value}",
+        QueryStringOperator.INCLUDE: lambda field, value: f"{field}: {value}",
+        QueryStringOperator.NOT_INCLUDE: lambda field, value: f"NOT {field}: {value}",
+        QueryStringOperator.GT: lambda field, value: f"{field}: >{value}",
+        QueryStringOperator.LT: lambda field, value: f"{field}: <{value}",
+        QueryStringOperator.GTE: lambda field, value: f"{field}: >={value}",
+        QueryStringOperator.LTE: lambda field, value: f"{field}: <={value}",
+        QueryStringOperator.BETWEEN: lambda field, value: f"{field}: [{value}]",
+        QueryStringOperator.REG: lambda field, value: f"{field}: /{value}/",
+        QueryStringOperator.NREG: lambda field, value: f"NOT {field}: /{value}/",
     }
 
     def __init__(
@@ -73,10 +112,20 @@ class QueryStringBuilder:
             operator_mapping: 自定义操作符映射，将外部操作符名映射到 QueryStringOperator
             logic_operator: 条件之间的逻辑关系，默认 AND
         """
-        self._filters: list[dict[str, Any]] = []
-        self._raw_queries: list[str] = []  # 存储原生 Query String
+        # 过滤条件: (字段名, 操作符, 值列表, 值之间的逻辑关系)
+        self._filters: list[
+            tuple[str, QueryStringOperator, list[Any], GroupRelation]
+        ] = []
+        # 已构建的条件语句，与 _filters 前若干项一一对应，重复 build() 时直接复用
+        self._compiled: list[str] = []
+        # 存储原生 Query String，添加时即用括号包裹以确保优先级
+        self._raw_queries: list[str] = []
         self._operator_mapping = operator_mapping or {}
         self._logic_operator = logic_operator
+        # 条件之间的连接串，构建时直接使用
+        self._join_str = f" {logic_operator.value} "
+        # 上次 build() 的结果，条件变更时置为 None
+        self._cached: str | None = None
 
     def add_filter(
         self,
@@ -100,6 +149,10 @@ class QueryStringBuilder:
             self，支持链式调用
         """
 
+        # 字段名来自有限的集合且反复出现，驻留后各条件共享同一字符串对象
+        if type(field) is str:
+            field = sys.intern(field)
+
         if not isinstance(values, list):
             values = [values]
 
@@ -107,14 +160,18 @@ class QueryStringBuilder:
         if not isinstance(operator, QueryStringOperator):
             operator = self._operator_mapping.get(operator, QueryStringOperator.EQUAL)
 
-        self._filters.append(
-            {
-                "field": field,
-                "operator": operator,
-                "values": values,
-                "group_relation": group_relation,
-            }
-        )
+        # 值为空的条件构建结果恒为空，直接跳过；
+        # 无需值的操作符照常添加，BETWEEN 保留以便构建时报告值不足
+        if (
+            not values
+            and operator not in NO_VALUE_OPERATORS
+            and operator != QueryStringOperator.BETWEEN
+        ):
+            return self
+
+        # 以元组存储，按 _build_single_filter 的参数顺序排列，构建时直接解包
+        self._filters.append((field, operator, values, group_relation))
+        self._cached = None
         return self
 
     def add_raw(self, raw_query: str) -> "QueryStringBuilder":
@@ -133,11 +190,15 @@ class QueryStringBuilder:
         示例:
             builder.add_raw("status: error AND level: >=3")
         """
-        # 忽略空值
-        if raw_query is None or (isinstance(raw_query, str) and not raw_query.strip()):
+        # 忽略空值，strip 只做一次，结果直接用于存储
+        if not raw_query:
+            return self
+        stripped = raw_query.strip()
+        if not stripped:
             return self
 
-        self._raw_queries.append(raw_query.strip())
+        self._raw_queries.append(f"({stripped})")
+        self._cached = None
         return self
 
     def add_q(self, q: "Q") -> "QueryStringBuilder":
@@ -160,7 +221,8 @@ class QueryStringBuilder:
 
         query_str = q.build()
         if query_str:
-            self._raw_queries.append(query_str)
+            self._raw_queries.append(f"({query_str})")
+            self._cached = None
 
         return self
 
@@ -168,26 +230,23 @@ class QueryStringBuilder:
         """
         构建 Query String.
 
+        条件在首次构建时转换为查询语句并缓存，之后只需转换新增的条件；
+        条件未变更时直接返回上次构建的结果。
+
         Returns:
             Query String 字符串
         """
-        query_parts = []
-
-        for f in self._filters:
-            query_part = self._build_single_filter(
-                field=f["field"],
-                operator=f["operator"],
-                values=f["values"],
-                group_relation=f["group_relation"],
-            )
-            if query_part:
-                query_parts.append(query_part)
+        if self._cached is not None:
+            return self._cached
 
-        # 添加原生 Query String，用括号包裹以确保优先级
-        for raw_query in self._raw_queries:
-            query_parts.append(f"({raw_query})")
+        compiled = self._compiled
+        for f in islice(self._filters, len(compiled), None):
+            compiled.append(self._build_single_filter(*f))
 
-        return f" {self._logic_operator.value} ".join(query_parts)
+        # 过滤掉结果为空的条件，原生 Query String 已在添加时包裹括号
+        filter_parts = filter(None, compiled)
+        self._cached = self._join_str.join(chain(filter_parts, self._raw_queries))
+        return self._cached
 
     def _build_single_filter(
         self,
@@ -196,92 +255,121 @@ class QueryStringBuilder:
         values: list[Any],
         group_relation: GroupRelation,
     ) -> str:
-        """构建单个过滤条件."""
-        template = self.OPERATOR_TEMPLATES.get(operator)
-        if not template:
+        """构建单个过滤条件，按操作符分派给对应的构建函数."""
+        render = self.OPERATOR_RENDERERS.get(operator)
+        if render is None:
             raise UnsupportedOperatorError(f"Unsupported operator: {operator}")
 
-        # 处理特殊操作符
-        if operator == QueryStringOperator.BETWEEN:
-            if len(values) < 2:
-                raise ValueError("BETWEEN operator requires 2 values")
-            return template.format(
-                field=field,
-                start_value=values[0],
-                end_value=values[1],
-            )
-
-        if operator in (QueryStringOperator.EXISTS, QueryStringOperator.NOT_EXISTS):
-            return template.format(field=field)
-
-        # 处理值
-        if not values:
-            return ""
+        build = self._FILTER_BUILDERS.get(operator)
+        if build is None:
+            build = QueryStringBuilder._build_multi_value
+        return build(self, render, field, operator, values, group_relation)
 
-        processed_values = self._process_values(values, operator)
+    def _build_between(
+        self,
+        render: Callable[[str, str], str],
+        field: str,
+        operator: QueryStringOperator,
+        values: list[Any],
+        group_relation: GroupRelation,
+    ) -> str:
+        """BETWEEN: 使用前两个值构造范围."""
+        if len(values) < 2:
+            raise ValueError("BETWEEN operator requires 2 values")
+        return render(field, f"{values[0]} TO {values[1]}")
+
+    def _build_no_value(
+        self,
+        render: Callable[[str, str], str],
+        field: str,
+        operator: QueryStringOperator,
+        values: list[Any],
+        group_relation: GroupRelation,
+    ) -> str:
+        """EXISTS / NOT_EXISTS: 不需要值."""
+        return render(field, "")
+
+    def _build_first_value(
+        self,
+        render: Callable[[str, str], str],
+        field: str,
+        operator: QueryStringOperator,
+        values: list[Any],
+        group_relation: GroupRelation,
+    ) -> str:
+        """范围操作符: 只使用第一个值，不需要处理其余的值."""
+        first = next(self._process_values(values, operator), None)
+        return "" if first is None else render(field, first)
+
+    def _build_multi_value(
+        self,
+        render: Callable[[str, str], str],
+        field: str,
+        operator: QueryStringOperator,
+        values: list[Any],
+        group_relation: GroupRelation,
+    ) -> str:
+        """其他操作符: 按 group_relation 组合多个值."""
+        processed_values = list(self._process_values(values, operator))
         if not processed_values:
             return ""
+        if len(processed_values) == 1:
+            return render(field, processed_values[0])
 
-        # 对于范围操作符和正则表达式，只使用第一个值，不需要多值组合
-        if operator in (
-            QueryStringOperator.GT,
-            QueryStringOperator.LT,
-            QueryStringOperator.GTE,
-            QueryStringOperator.LTE,
-        ):
-            return template.format(
-                field=field, value=processed_values[0] if processed_values else ""
-            )
-
-        # 组合多个值
-        logic = (
-            LogicOperator.OR.value
-            if group_relation == GroupRelation.OR
-            else LogicOperator.AND.value
-        )
-        value_str = f" {logic} ".join(str(v) for v in processed_values)
-
-        if len(processed_values) > 1:
-            value_str = f"({value_str})"
+        join_str = _OR_JOIN if group_relation == GroupRelation.OR else _AND_JOIN
+        return render(field, f"({join_str.join(processed_values)})")
 
-        return template.format(field=field, value=value_str)
+    # 操作符 -> 过滤条件构建函数，未列出的操作符使用 _build_multi_value
+    _FILTER_BUILDERS: dict[QueryStringOperator, Callable[..., str]] = {
+        QueryStringOperator.BETWEEN: _build_between,
+        **dict.fromkeys(NO_VALUE_OPERATORS, _build_no_value),
+        **dict.fromkeys(RANGE_OPERATORS, _build_first_value),
+    }
 
     def _process_values(
         self,
         values: list[Any],
         operator: QueryStringOperator,
-    ) -> list[str]:
-        """处理值列表，所有值默认进行转义."""
-        result = []
-
-        for value in values:
-            if operator in (
-                QueryStringOperator.INCLUDE,
-                QueryStringOperator.NOT_INCLUDE,
-            ):
-                # 去除通配符
-                value = str(value).strip("*")
-                if value == "":
-                    continue
-                # 模糊匹配，转义后直接返回（模板中已包含通配符）
-                escaped = escape_query_string(value)
-                escaped = f"*{escaped}*"
-            elif operator in (QueryStringOperator.EQUAL, QueryStringOperator.NOT_EQUAL):
-                # 精确匹配，添加双引号（只需转义双引号）
-                escaped = str(value).replace('"', '\\"')
-                escaped = f'"{escaped}"'
-            elif operator in (QueryStringOperator.REG, QueryStringOperator.NREG):
-                # 正则表达式操作符，不转义
-                escaped = str(value)
-            else:
-                # 其他操作符（GT, GTE, LT, LTE 等），转义值
-                escaped = escape_query_string(str(value))
-
-            result.append(escaped)
-        return result
+    ) -> Iterator[str]:
+        """处理值列表，所有值默认进行转义.
+
+        按操作符类别选择处理方式，逐个产出处理后的值，
+        类别判断只做一次，不在每个值上重复。
+        """
+        if operator in INCLUDE_OPERATORS:
+            return self._process_include(values)
+        if operator in EQUAL_OPERATORS:
+            return self._process_equal(values)
+        if operator in REGEX_OPERATORS:
+            # 正则表达式操作符，不转义
+            return map(str, values)
+        # 其他操作符（GT, GTE, LT, LTE 等），转义值
+        return map(escape_query_value, map(str, values))
+
+    @staticmethod
+    def _process_include(values: Iterable[Any]) -> Iterator[str]:
+        """模糊匹配，去除通配符后转义再以通配符包裹，去除后为空的值跳过."""
+        return (
+            f"*{escape_query_value(value)}*"
+            for value in map(_strip_wildcards, values)
+            if value
+        )
+
+    @staticmethod
+    def _process_equal(values: Iterable[Any]) -> Iterator[str]:
+        """精确匹配，添加双引号（只需转义双引号）."""
+        # 转义与加引号在同一个 f-string 中完成；大多数值不含双引号，直接加引号
+        return (
+            f'"{value.translate(_QUOTE_ESCAPE_TABLE)}"'
+            if '"' in value
+            else f'"{value}"'
+            for value in map(str, values)
+        )
 
     def clear(self) -> "QueryStringBuilder":
         """清空所有过滤条件."""
         self._filters.clear()
+        self._compiled.clear()
         self._raw_queries.clear()
+        self._cached = None
         return self
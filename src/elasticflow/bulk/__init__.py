@@ -6,6 +6,7 @@
 - 自动分批处理
 - 失败重试机制
 - 流式处理支持（适用于超大数据量）
+- 基于 AsyncElasticsearch 的异步并发批量写入
 
 示例用法:
     >>> from elasticflow.bulk import BulkOperationTool, BulkAction
@@ -20,8 +21,11 @@ from .models import (
     BulkErrorItem,
     BulkOperation,
     BulkResult,
+    OperationPool,
+    TokenBucket,
 )
 from .tool import BulkOperationTool
+from .async_tool import AsyncBulkOperationTool
 from .exceptions import (
     BulkOperationError,
     BulkProcessingError,
@@ -34,7 +38,10 @@ __all__ = [
     "BulkErrorItem",
     "BulkOperation",
     "BulkResult",
+    "OperationPool",
+    "TokenBucket",
     "BulkOperationTool",
+    "AsyncBulkOperationTool",
     "BulkOperationError",
     "BulkProcessingError",
     "BulkRetryExhaustedError",
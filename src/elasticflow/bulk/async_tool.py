@@ -0,0 +1,402 @@
+"""批量操作异步工具类."""
+
+import asyncio
+import time
+import logging
+from typing import Any
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_streaming_bulk
+from elasticsearch.exceptions import TransportError
+
+from .models import (
+    BulkAction,
+    BulkOperation,
+    BulkResult,
+    OperationPool,
+    TokenBucket,
+)
+from .exceptions import BulkRetryExhaustedError
+from .tool import (
+    _BulkToolBase,
+    _StreamProgress,
+    _flatten_response_item,
+    _is_retryable,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBulkOperationTool(_BulkToolBase):
+    """Elasticsearch 异步批量操作工具.
+
+    基于 AsyncElasticsearch 与 async_streaming_bulk，多个批次的请求在同一个
+    事件循环中并发发送，同时在途的批次数由 concurrency 限制，
+    无需额外的线程或进程。
+
+    Args:
+        es_client: Elasticsearch 异步客户端实例
+        batch_size: 每批次操作数量，默认为 500
+        max_retries: 最大重试次数，默认为 3
+        retry_delay: 重试基础延迟时间（秒），默认为 1.0
+        raise_on_error: 遇到错误时是否抛出异常，默认为 False
+        chunk_size: 与 batch_size 同义，保留用于兼容性
+        concurrency: 同时在途的批次数，默认为 4
+        max_chunk_bytes: 单个 bulk 请求的最大字节数，默认为 10MB
+        max_backoff: 单次重试等待时间的上限（秒），默认为 30.0
+        rate_limiter: 自适应令牌桶，每个批次发送前取得令牌，默认为 None
+        breaker_threshold: 连续请求异常达到该次数后打开熔断器，默认为 5
+        breaker_cooldown: 熔断持续时间（秒），默认为 30.0
+
+    Example:
+        >>> es_client = AsyncElasticsearch(["http://localhost:9200"])
+        >>> bulk_tool = AsyncBulkOperationTool(es_client, concurrency=8)
+        >>> result = await bulk_tool.bulk_index("users", documents)
+        >>> print(f"成功: {result.success}, 失败: {result.failed}")
+    """
+
+    def __init__(
+        self,
+        es_client: AsyncElasticsearch,
+        batch_size: int = 500,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        raise_on_error: bool = False,
+        chunk_size: int | None = None,
+        concurrency: int = 4,
+        max_chunk_bytes: int = 10 * 1024 * 1024,
+        max_backoff: float = 30.0,
+        rate_limiter: TokenBucket | None = None,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
+    ):
+        super().__init__(
+            es_client,
+            batch_size=batch_size,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            raise_on_error=raise_on_error,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            max_backoff=max_backoff,
+            rate_limiter=rate_limiter,
+            breaker_threshold=breaker_threshold,
+            breaker_cooldown=breaker_cooldown,
+        )
+        self.concurrency = concurrency
+        logger.info(
+            f"初始化异步批量操作工具: batch_size={self.batch_size}, "
+            f"max_retries={max_retries}, retry_delay={retry_delay}, "
+            f"concurrency={concurrency}"
+        )
+
+    async def _execute_bulk_with_retry(
+        self,
+        actions: list[dict[str, Any]],
+    ) -> tuple[int, int, list[dict[str, Any]], list[dict[str, Any]]]:
+        """执行单个批次并支持重试.
+
+        Args:
+            actions: 操作动作列表
+
+        Returns:
+            元组：(成功数, 失败数, 错误详情列表, 成功详情列表)
+        """
+        errors: list[dict[str, Any]] = []
+        successes: list[dict[str, Any]] = []
+
+        for attempt in range(self.max_retries + 1):
+            attempt_errors: list[dict[str, Any]] = []
+            attempt_successes: list[dict[str, Any]] = []
+            # 可重试的操作（见 _is_retryable），响应按提交顺序返回，
+            # 按位置直接取对应的动作
+            retry_actions: list[dict[str, Any]] = []
+            # 整个请求失败时的异常，用于读取 Retry-After 响应头
+            retry_exc: Exception | None = None
+            idx = 0
+            self._ensure_breaker_closed()
+            delay = self._throttle_delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                async for ok, info in async_streaming_bulk(
+                    self.es_client,
+                    actions,
+                    chunk_size=len(actions),
+                    max_chunk_bytes=self.max_chunk_bytes,
+                    raise_on_exception=False,
+                    raise_on_error=False,
+                ):
+                    if ok:
+                        attempt_successes.append(info)
+                    else:
+                        error = _flatten_response_item(info)
+                        if _is_retryable(error):
+                            retry_actions.append(actions[idx])
+                            if retry_exc is None:
+                                retry_exc = error.get("exception")
+                        attempt_errors.append(error)
+                    idx += 1
+
+            except (TransportError, Exception) as e:
+                self._record_request_failure()
+                if attempt < self.max_retries and not self._breaker_open():
+                    logger.warning(
+                        f"批量操作遇到异常，第 {attempt + 1} 次重试: {str(e)}"
+                    )
+                    await asyncio.sleep(self._backoff_delay(attempt, e))
+                    continue
+                # 重试次数耗尽
+                raise BulkRetryExhaustedError(f"批量操作重试次数耗尽: {str(e)}") from e
+
+            self._record_attempt(len(attempt_successes), attempt_errors)
+            successes.extend(attempt_successes)
+            self._update_rate_limiter(attempt_errors)
+
+            # 检查是否有可重试的失败操作，只重试这些操作
+            if (
+                retry_actions
+                and attempt < self.max_retries
+                and not self._breaker_open()
+            ):
+                logger.warning(
+                    f"检测到 {len(retry_actions)} 个可重试的失败操作，"
+                    f"第 {attempt + 1} 次重试..."
+                )
+                await asyncio.sleep(self._backoff_delay(attempt, retry_exc))
+                # 其余失败不再重试，直接记录
+                errors.extend(e for e in attempt_errors if not _is_retryable(e))
+                actions = retry_actions
+                continue
+
+            # 成功完成，跳出重试循环
+            errors.extend(attempt_errors)
+            break
+
+        return len(successes), len(errors), errors, successes
+
+    async def _execute_actions(
+        self,
+        actions: Iterable[dict[str, Any]],
+        result: BulkResult,
+        operation: BulkAction | None = None,
+    ) -> BulkResult:
+        """分批并发执行动作并将结果累加到 result 中.
+
+        Args:
+            actions: 动作迭代器（可用于 elasticsearch.helpers 的操作字典）
+            result: 结果对象，total 由调用方设置
+            operation: 批次整体失败时记录的操作类型，默认按 _op_type 推断
+
+        Returns:
+            result
+        """
+        start_time = time.time()
+
+        async def run_batch(batch_no: int, batch: list[dict[str, Any]]) -> None:
+            try:
+                outcome = await self._execute_bulk_with_retry(batch)
+            except Exception as e:
+                logger.error(f"批次 {batch_no} 处理失败: {str(e)}")
+                self._mark_batch_failed(result, batch, e, operation)
+                return
+
+            success_count, failed_count, errors, _ = outcome
+
+            # 事件循环单线程执行，结果累加无需加锁
+            result.success += success_count
+            result.failed += failed_count
+            if errors:
+                result.extend_errors(self._process_errors(errors))
+
+            if failed_count > 0:
+                logger.warning(
+                    f"批次 {batch_no}: 成功 {success_count}, 失败 {failed_count}"
+                )
+            else:
+                logger.info(f"批次 {batch_no}: 全部成功 ({success_count})")
+
+        # 按需从迭代器中取出批次，在途任务不超过 concurrency 个，
+        # 内存中只保留在途批次的动作
+        batch_count = 0
+        in_flight: set[asyncio.Task] = set()
+        try:
+            for batch in self._iter_batches(actions):
+                if len(in_flight) >= self.concurrency:
+                    _, in_flight = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                batch_count += 1
+                in_flight.add(asyncio.create_task(run_batch(batch_count, batch)))
+            if in_flight:
+                await asyncio.wait(in_flight)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        result.took = time.time() - start_time
+        result.batch_count = batch_count
+
+        # 如果配置了 raise_on_error 且有失败，抛出异常
+        self._raise_if_failed(result)
+
+        return result
+
+    async def bulk_execute(
+        self,
+        operations: list[BulkOperation],
+    ) -> BulkResult:
+        """执行批量操作.
+
+        各批次在 concurrency 限制内并发发送。
+
+        Args:
+            operations: 批量操作项列表
+
+        Returns:
+            批量操作结果
+        """
+        if not operations:
+            return BulkResult(total=0, success=0, failed=0)
+
+        return await self._execute_actions(
+            map(self._prepare_bulk_action, operations),
+            BulkResult(total=len(operations)),
+        )
+
+    async def bulk_stream(
+        self,
+        operations: Iterable[BulkOperation] | AsyncIterable[BulkOperation],
+        progress_callback: Callable[[int, int, BulkResult], None] | None = None,
+        operation_pool: OperationPool | None = None,
+    ) -> BulkResult:
+        """流式批量处理.
+
+        与 BulkOperationTool.bulk_stream 相同，operations 也可以是异步迭代器；
+        批次按顺序逐个发送。
+
+        Args:
+            operations: 批量操作项迭代器（同步或异步）
+            progress_callback: 进度回调函数，参数为 (已处理数, 总数, 当前批次结果)
+            operation_pool: 操作项对象池，每个批次完成后将其中的操作项归还到池中
+
+        Returns:
+            批量操作结果
+        """
+        start_time = time.time()
+        progress = _StreamProgress(self, progress_callback, operation_pool)
+
+        try:
+            async for batch in self._stream_batches(operations, progress.prepare):
+                # 集群持续不可用、熔断器打开时终止整个流，不再读取后续操作项
+                self._ensure_breaker_closed()
+                try:
+                    outcome = await self._execute_bulk_with_retry(batch)
+                except Exception as e:
+                    progress.fail_batch(batch, e)
+                else:
+                    success_count, failed_count, errors, _ = outcome
+                    progress.add_batch(batch, success_count, failed_count, errors)
+
+        except Exception as e:
+            raise progress.fail(e) from e
+
+        return progress.finish(start_time)
+
+    async def _stream_batches(
+        self,
+        operations: Iterable[BulkOperation] | AsyncIterable[BulkOperation],
+        prepare: Callable[[BulkOperation], dict[str, Any]],
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """将操作项逐条转换为动作，按 batch_size 分批产出."""
+        if not isinstance(operations, AsyncIterable):
+            for batch in self._iter_batches(map(prepare, operations)):
+                yield batch
+            return
+
+        batch: list[dict[str, Any]] = []
+        async for operation in operations:
+            batch.append(prepare(operation))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def bulk_index(
+        self,
+        index_name: str,
+        documents: list[dict[str, Any]],
+        doc_id_field: str | None = None,
+        routing_field: str | None = None,
+    ) -> BulkResult:
+        """批量索引文档.
+
+        Args:
+            index_name: 索引名称
+            documents: 文档列表
+            doc_id_field: 用作文档ID的字段名，如果不指定则让ES自动生成ID
+            routing_field: 用作路由键的字段名
+
+        Returns:
+            批量操作结果
+        """
+        if not documents:
+            return BulkResult(total=0, success=0, failed=0)
+
+        actions = self._document_actions(
+            "index", index_name, documents, doc_id_field, routing_field
+        )
+        return await self._execute_actions(actions, BulkResult(total=len(documents)))
+
+    async def bulk_create(
+        self,
+        index_name: str,
+        documents: list[dict[str, Any]],
+        doc_id_field: str | None = None,
+        routing_field: str | None = None,
+    ) -> BulkResult:
+        """批量创建文档（文档已存在时失败）.
+
+        Args:
+            index_name: 索引名称
+            documents: 文档列表
+            doc_id_field: 用作文档ID的字段名，如果不指定则让ES自动生成ID
+            routing_field: 用作路由键的字段名
+
+        Returns:
+            批量操作结果
+        """
+        if not documents:
+            return BulkResult(total=0, success=0, failed=0)
+
+        actions = self._document_actions(
+            "create", index_name, documents, doc_id_field, routing_field
+        )
+        return await self._execute_actions(actions, BulkResult(total=len(documents)))
+
+    async def bulk_delete(
+        self,
+        index_name: str,
+        doc_ids: list[str],
+    ) -> BulkResult:
+        """批量删除文档.
+
+        Args:
+            index_name: 索引名称
+            doc_ids: 文档ID列表
+
+        Returns:
+            批量操作结果
+        """
+        if not doc_ids:
+            return BulkResult(total=0, success=0, failed=0)
+
+        actions = (
+            {"_op_type": "delete", "_index": index_name, "_id": doc_id}
+            for doc_id in doc_ids
+        )
+        result = await self._execute_actions(actions, BulkResult(total=len(doc_ids)))
+        # 对于删除操作，成功的数量就是删除的数量
+        result.deleted = result.success
+        return result
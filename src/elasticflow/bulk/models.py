@@ -1,5 +1,7 @@
 """批量操作工具数据模型定义模块."""
 
+import time
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
@@ -15,7 +17,7 @@ class BulkAction(Enum):
     UPSERT = "upsert"
 
 
-@dataclass
+@dataclass(slots=True)
 class BulkOperation:
     """批量操作项数据类.
 
@@ -37,8 +39,189 @@ class BulkOperation:
     retry_on_conflict: int | None = None
     metadata: dict[str, Any] = field(default_factory=dict)
 
+    def reset(
+        self,
+        action: BulkAction,
+        index_name: str,
+        doc_id: str | None = None,
+        source: dict[str, Any] | None = None,
+        routing: str | None = None,
+        retry_on_conflict: int | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> "BulkOperation":
+        """原地重置全部字段，用于复用已有实例（见 OperationPool）.
+
+        未提供 metadata 时，仅在原 metadata 非空时替换为新的空字典，
+        不清空调用方传入过的字典。
+
+        Returns:
+            self
+        """
+        self.action = action
+        self.index_name = index_name
+        self.doc_id = doc_id
+        self.source = source
+        self.routing = routing
+        self.retry_on_conflict = retry_on_conflict
+        if metadata is not None:
+            self.metadata = metadata
+        elif self.metadata:
+            self.metadata = {}
+        return self
+
+
+class OperationPool:
+    """BulkOperation 对象池.
+
+    流式写入超大数据量时，每条文档都新建 BulkOperation 会带来大量的对象分配
+    与 GC 压力。生成操作时通过 acquire() 取得实例，收到响应后由
+    BulkOperationTool.bulk_stream(operation_pool=...) 自动 release() 回池中复用。
+
+    注意：release() 之后实例会被重置复用，调用方不应再持有其引用。
+
+    Args:
+        max_size: 池中最多保留的空闲实例数，默认为 10000
+    """
+
+    __slots__ = ("_free", "max_size")
+
+    def __init__(self, max_size: int = 10000):
+        self._free: list[BulkOperation] = []
+        self.max_size = max_size
+
+    def __len__(self) -> int:
+        """当前空闲实例数."""
+        return len(self._free)
+
+    def acquire(
+        self,
+        action: BulkAction,
+        index_name: str,
+        doc_id: str | None = None,
+        source: dict[str, Any] | None = None,
+        routing: str | None = None,
+        retry_on_conflict: int | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> BulkOperation:
+        """取得一个已按参数设置好的 BulkOperation，池为空时新建."""
+        if self._free:
+            return self._free.pop().reset(
+                action,
+                index_name,
+                doc_id,
+                source,
+                routing,
+                retry_on_conflict,
+                metadata,
+            )
+        return BulkOperation(
+            action=action,
+            index_name=index_name,
+            doc_id=doc_id,
+            source=source,
+            routing=routing,
+            retry_on_conflict=retry_on_conflict,
+            metadata=metadata if metadata is not None else {},
+        )
+
+    def release(self, operation: BulkOperation) -> None:
+        """归还单个实例."""
+        if len(self._free) < self.max_size:
+            # 释放对文档数据的引用，避免池中实例延长其生命周期
+            operation.source = None
+            self._free.append(operation)
 
-@dataclass
+    def release_many(self, operations: Iterable[BulkOperation]) -> None:
+        """批量归还实例，超出 max_size 的部分直接丢弃."""
+        for operation in operations:
+            if len(self._free) >= self.max_size:
+                break
+            operation.source = None
+            self._free.append(operation)
+
+
+class TokenBucket:
+    """自适应令牌桶，用于批量请求限流.
+
+    每次发送 bulk 请求前取得一个令牌，令牌按 refill_rate（个/秒）补充。
+    集群返回 429（bulk 线程池队列已满）时 refill_rate 减半，连续
+    success_threshold 个批次无错误后 refill_rate 加 1（加性增、乘性减），
+    避免在集群过载时继续加压形成重试风暴。
+
+    Args:
+        capacity: 桶容量，即允许的最大突发请求数，默认为 10
+        refill_rate: 初始及最大的令牌补充速率（个/秒），默认为 10.0
+        min_rate: 令牌补充速率的下限（个/秒），默认为 0.5
+        success_threshold: 提升速率所需的连续无错误批次数，默认为 5
+    """
+
+    __slots__ = (
+        "capacity",
+        "tokens",
+        "refill_rate",
+        "max_rate",
+        "min_rate",
+        "success_threshold",
+        "_successes",
+        "_last",
+    )
+
+    def __init__(
+        self,
+        capacity: int = 10,
+        refill_rate: float = 10.0,
+        min_rate: float = 0.5,
+        success_threshold: int = 5,
+    ):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.refill_rate = refill_rate
+        self.max_rate = refill_rate
+        self.min_rate = min_rate
+        self.success_threshold = success_threshold
+        self._successes = 0
+        self._last = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._last) * self.refill_rate
+        )
+        self._last = now
+
+    def reserve(self) -> float:
+        """预占一个令牌，返回取得令牌前需要等待的秒数（可能为 0）.
+
+        令牌不足时余额会变为负数，后续请求依次排队等待。
+        """
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_rate
+
+    def acquire(self) -> None:
+        """阻塞直到取得一个令牌."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_throttle(self) -> None:
+        """集群返回 429 时调用，令牌补充速率减半."""
+        self._refill()
+        self.refill_rate = max(self.min_rate, self.refill_rate / 2)
+        self._successes = 0
+
+    def on_success(self) -> None:
+        """批次无错误完成时调用，连续达到阈值后令牌补充速率加 1."""
+        self._successes += 1
+        if self._successes >= self.success_threshold:
+            self._successes = 0
+            self._refill()
+            self.refill_rate = min(self.max_rate, self.refill_rate + 1)
+
+
+@dataclass(slots=True)
 class BulkErrorItem:
     """批量操作错误项数据类.
 
@@ -48,7 +231,7 @@ class BulkErrorItem:
         error_type: 错误类型
         error_reason: 错误原因
         status: HTTP状态码
-        caused_by: 根本原因
+        caused_by: 根本原因（ES 返回的原始 caused_by 字典）
         operation: 失败的操作类型
     """
 
@@ -57,11 +240,18 @@ class BulkErrorItem:
     error_type: str
     error_reason: str
     status: int
-    caused_by: str | None = None
+    caused_by: dict[str, Any] | None = None
     operation: BulkAction | None = None
 
+    @property
+    def caused_by_str(self) -> str | None:
+        """格式化后的根本原因，形如 "类型: 原因"."""
+        if not self.caused_by:
+            return None
+        return f"{self.caused_by.get('type', '')}: {self.caused_by.get('reason', '')}"
+
 
-@dataclass
+@dataclass(slots=True)
 class BulkResult:
     """批量操作结果数据类.
 
@@ -72,10 +262,10 @@ class BulkResult:
         created: 创建数（用于UPSERT操作）
         updated: 更新数（用于UPSERT操作）
         deleted: 删除数
-        errors: 错误详情列表
+        errors: 错误详情列表（没有错误时为 None）
         took: 总耗时（秒）
         batch_count: 批次数
-        warnings: 警告信息列表
+        warnings: 警告信息列表（没有警告时为 None）
     """
 
     total: int = 0
@@ -84,10 +274,11 @@ class BulkResult:
     created: int = 0
     updated: int = 0
     deleted: int = 0
-    errors: list[BulkErrorItem] = field(default_factory=list)
+    # 错误与警告列表在首次添加时才创建，全部成功的批次不分配空列表
+    errors: list[BulkErrorItem] | None = None
     took: float = 0.0
     batch_count: int = 0
-    warnings: list[str] = field(default_factory=list)
+    warnings: list[str] | None = None
 
     def is_success(self) -> bool:
         """判断操作是否全部成功."""
@@ -100,7 +291,7 @@ class BulkResult:
         error_type: str,
         error_reason: str,
         status: int,
-        caused_by: str | None = None,
+        caused_by: dict[str, Any] | None = None,
         operation: BulkAction | None = None,
     ) -> None:
         """添加错误项."""
@@ -113,23 +304,50 @@ class BulkResult:
             caused_by=caused_by,
             operation=operation,
         )
+        if self.errors is None:
+            self.errors = []
         self.errors.append(error_item)
 
+    def extend_errors(self, error_items: list[BulkErrorItem]) -> None:
+        """批量添加错误项."""
+        if not error_items:
+            return
+        if self.errors is None:
+            self.errors = []
+        self.errors.extend(error_items)
+
     def add_warning(self, warning: str) -> None:
         """添加警告信息."""
+        if self.warnings is None:
+            self.warnings = []
         self.warnings.append(warning)
 
+    def merge(self, other: "BulkResult") -> None:
+        """合并另一个结果的计数、错误与警告（不含耗时和批次数）."""
+        self.total += other.total
+        self.success += other.success
+        self.failed += other.failed
+        self.created += other.created
+        self.updated += other.updated
+        self.deleted += other.deleted
+        if other.errors:
+            self.extend_errors(other.errors)
+        if other.warnings:
+            if self.warnings is None:
+                self.warnings = []
+            self.warnings.extend(other.warnings)
+
     def get_error_summary(self) -> str:
         """获取错误摘要."""
         if not self.errors:
             return "No errors"
-        summary = f"Total errors: {len(self.errors)}\n"
+        parts = [f"Total errors: {len(self.errors)}\n"]
         for i, error in enumerate(self.errors[:10], 1):  # 只显示前10个错误
-            summary += (
+            parts.append(
                 f"{i}. [{error.operation.value if error.operation else 'unknown'}] "
                 f"Index: {error.index_name}, DocID: {error.doc_id}, "
                 f"Status: {error.status}, Reason: {error.error_reason}\n"
             )
         if len(self.errors) > 10:
-            summary += f"... and {len(self.errors) - 10} more errors\n"
-        return summary
+            parts.append(f"... and {len(self.errors) - 10} more errors\n")
+        return "".join(parts)
@@ -1,55 +1,156 @@
 """批量操作核心工具类."""
 
+import json
+import uuid
+import random
 import time
 import logging
+from contextlib import contextmanager
 from typing import Any
-from collections.abc import Callable, Iterable
+from datetime import date
+from decimal import Decimal
+from collections import deque
+from itertools import islice
+from operator import itemgetter
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import parallel_bulk
 from elasticsearch.exceptions import TransportError
 
-from .models import BulkAction, BulkOperation, BulkResult, BulkErrorItem
+from .models import (
+    BulkAction,
+    BulkOperation,
+    BulkResult,
+    BulkErrorItem,
+    OperationPool,
+    TokenBucket,
+)
 from .exceptions import BulkProcessingError, BulkRetryExhaustedError
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时使用标准库 json 序列化
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 单条操作失败后可重试的状态码：版本冲突与集群拒绝（bulk 线程池队列已满）
+_RETRY_STATUSES = frozenset({409, 429})
+
+# 操作类型 -> bulk 底层操作类型，UPSERT 实际使用 UPDATE + doc_as_upsert
+_OP_TYPES: dict[BulkAction, str] = {
+    BulkAction.INDEX: "index",
+    BulkAction.CREATE: "create",
+    BulkAction.UPDATE: "update",
+    BulkAction.UPSERT: "update",
+    BulkAction.DELETE: "delete",
+}
+# 操作类型 -> 文档数据所在的字段，UPDATE 使用 doc 字段而非 _source
+_SOURCE_KEYS: dict[BulkAction, str] = {
+    BulkAction.INDEX: "_source",
+    BulkAction.CREATE: "_source",
+    BulkAction.UPDATE: "doc",
+    BulkAction.UPSERT: "doc",
+}
+# 必须提供 source 数据的操作类型
+_SOURCE_REQUIRED = frozenset({BulkAction.INDEX, BulkAction.CREATE})
+# 操作类型名称 -> BulkAction，解析错误响应时使用
+_BULK_ACTIONS: dict[str, BulkAction] = {action.value: action for action in BulkAction}
+
+
+def _json_default(obj: Any) -> Any:
+    """序列化 JSON 不支持的值，规则与客户端的 JsonSerializer 相同.
+
+    日期使用 isoformat()，UUID 转为字符串，Decimal 转为浮点数，
+    保证预序列化写入与经过 helpers 写入的文档内容一致。
+    """
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"无法序列化为 JSON: {obj!r} (类型: {type(obj).__name__})")
 
-class BulkOperationTool:
-    """批量操作核心工具类.
 
-    提供高效的 Elasticsearch 批量操作功能，支持：
-    - 自动分批处理
-    - 失败重试机制
-    - 操作结果统计
-    - 流式处理支持
+def _dumps_bytes(obj: Any) -> bytes:
+    """将对象序列化为紧凑的 UTF-8 JSON 字节串."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
 
-    Args:
-        es_client: Elasticsearch 客户端实例
-        batch_size: 每批次操作数量，默认为 500
-        max_retries: 最大重试次数，默认为 3
-        retry_delay: 重试延迟时间（秒），默认为 1.0
-        raise_on_error: 遇到错误时是否抛出异常，默认为 False
-        chunk_size: 与 batch_size 同义，保留用于兼容性
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """读取请求异常响应中的 Retry-After 头（秒），不存在或无法解析时返回 None.
+
+    elasticsearch 8.x 的响应头位于 exc.meta.headers，7.x 仅能从 exc.info 中读取。
+    """
+    headers = getattr(getattr(exc, "meta", None), "headers", None)
+    if headers is None:
+        headers = getattr(exc, "info", None)
+    if not isinstance(headers, Mapping):
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        # 缺失或为 HTTP 日期格式时忽略，使用常规退避时间
+        return None
+
+
+def _is_request_failure(error: dict[str, Any]) -> bool:
+    """失败项是否由整个请求失败（请求级异常或 5xx）导致，而非单条文档的错误."""
+    return "exception" in error or error.get("status", 0) >= 500
+
+
+def _is_retryable(error: dict[str, Any]) -> bool:
+    """失败项是否可以重试：版本冲突、被拒绝，或整个请求因 5xx 失败."""
+    status = error.get("status", 0)
+    return status in _RETRY_STATUSES or ("exception" in error and status >= 500)
+
+
+def _flatten_response_item(info: dict[str, Any]) -> dict[str, Any]:
+    """将 bulk 响应项 {操作类型: 详情} 展开为扁平结构，并记录操作类型."""
+    op_type, item = next(iter(info.items()))
+    return {**item, "op_type": op_type}
+
+
+class _BulkToolBase:
+    """批量操作工具的公共部分.
+
+    包含配置、动作构造、分批与错误解析等与客户端调用方式无关的逻辑，
+    由同步的 BulkOperationTool 与异步的 AsyncBulkOperationTool 共用。
     """
 
     def __init__(
         self,
-        es_client: Elasticsearch,
+        es_client: Any,
         batch_size: int = 500,
         max_retries: int = 3,
         retry_delay: float = 1.0,
         raise_on_error: bool = False,
         chunk_size: int | None = None,
+        max_chunk_bytes: int = 10 * 1024 * 1024,
+        max_backoff: float = 30.0,
+        rate_limiter: TokenBucket | None = None,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
     ):
         self.es_client = es_client
         self.batch_size = chunk_size if chunk_size is not None else batch_size
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.raise_on_error = raise_on_error
-        logger.info(
-            f"初始化批量操作工具: batch_size={self.batch_size}, "
-            f"max_retries={max_retries}, retry_delay={retry_delay}"
-        )
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        # 熔断器状态：连续请求失败次数与熔断结束时间（time.monotonic()）
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
 
     def _prepare_bulk_action(
         self,
@@ -65,13 +166,9 @@ class BulkOperationTool:
         Returns:
             可用于 elasticsearch.helpers.bulk 的操作字典
         """
-        # 对于 UPSERT 操作，实际使用 UPDATE 作为底层操作类型
-        op_type = operation.action.value
-        if operation.action == BulkAction.UPSERT:
-            op_type = "update"
-
+        op = operation.action
         action: dict[str, Any] = {
-            "_op_type": op_type,
+            "_op_type": _OP_TYPES[op],
             "_index": operation.index_name,
         }
 
@@ -81,111 +178,94 @@ class BulkOperationTool:
         if operation.routing is not None:
             action["_routing"] = operation.routing
 
-        # 根据操作类型处理 source 数据
-        if operation.action in (BulkAction.INDEX, BulkAction.CREATE):
-            if operation.source is not None:
-                action["_source"] = operation.source
-            else:
-                raise BulkProcessingError(
-                    f"操作类型 {operation.action.value} 需要提供 source 数据"
-                )
-        elif operation.action in (BulkAction.UPDATE, BulkAction.UPSERT):
-            if operation.source is not None:
-                # UPDATE 操作使用 doc 字段而非 _source
-                action["doc"] = operation.source
-                # 如果是 UPSERT 操作，启用 doc_as_upsert
-                if operation.action == BulkAction.UPSERT or doc_as_upsert:
-                    action["doc_as_upsert"] = True
-
-        if (
-            operation.action in (BulkAction.UPDATE, BulkAction.UPSERT)
-            and operation.retry_on_conflict is not None
-        ):
-            action["retry_on_conflict"] = operation.retry_on_conflict
+        # DELETE 不携带文档数据
+        source_key = _SOURCE_KEYS.get(op)
+        if source_key is None:
+            return action
+
+        source = operation.source
+        if source is not None:
+            action[source_key] = source
+        elif op in _SOURCE_REQUIRED:
+            raise BulkProcessingError(f"操作类型 {op.value} 需要提供 source 数据")
+
+        # 以下仅适用于 UPDATE / UPSERT
+        if source_key == "doc":
+            # 如果是 UPSERT 操作，启用 doc_as_upsert
+            if source is not None and (op is BulkAction.UPSERT or doc_as_upsert):
+                action["doc_as_upsert"] = True
+            if operation.retry_on_conflict is not None:
+                action["retry_on_conflict"] = operation.retry_on_conflict
 
         return action
 
-    def _execute_bulk_with_retry(
-        self,
-        actions: list[dict[str, Any]],
-    ) -> tuple[int, int, list[dict[str, Any]], list[dict[str, Any]]]:
-        """执行批量操作并支持重试.
-
-        Args:
-            actions: 操作动作列表
+    def _backoff_delay(self, attempt: int, exc: Exception | None = None) -> float:
+        """计算第 attempt 次重试前的等待时间（指数退避 + 完全抖动）.
 
-        Returns:
-            元组：(成功数, 失败数, 错误详情列表, 成功详情列表)
+        各客户端的重试时间随机错开，避免故障恢复时同时重试压垮集群。
+        请求异常的响应带有 Retry-After 头（如 429 / 503）时，至少等待该时长。
         """
-        success_count = 0
-        failed_count = 0
-        errors: list[dict[str, Any]] = []
-        successes: list[dict[str, Any]] = []
+        delay = random.uniform(
+            0, min(self.retry_delay * (2**attempt), self.max_backoff)
+        )
+        retry_after = _retry_after_seconds(exc) if exc is not None else None
+        if retry_after is not None:
+            return max(delay, retry_after)
+        return delay
+
+    def _breaker_open(self) -> bool:
+        """熔断器是否处于打开状态."""
+        return time.monotonic() < self._breaker_open_until
+
+    def _ensure_breaker_closed(self) -> None:
+        """熔断器打开期间直接失败，不再向集群发送请求."""
+        if self._breaker_open():
+            raise BulkRetryExhaustedError(
+                "熔断器已打开：集群连续请求失败，暂停发送批量请求"
+            )
 
-        for attempt in range(self.max_retries + 1):
-            try:
-                # 直接使用 stats_only=False 获取详细结果，避免重复执行
-                success_count = 0
-                failed_count = 0
-                errors = []
-                successes = []
-
-                for ok, info in bulk(
-                    self.es_client,
-                    actions,
-                    raise_on_exception=False,
-                    raise_on_error=False,
-                    stats_only=False,
-                ):
-                    if ok:
-                        success_count += 1
-                        successes.append(info)
-                    else:
-                        failed_count += 1
-                        errors.append(info)
+    def _record_request_failure(self) -> None:
+        """记录一次请求异常，连续失败达到阈值时打开熔断器."""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.breaker_threshold:
+            self._breaker_open_until = time.monotonic() + self.breaker_cooldown
+            logger.error(
+                f"连续 {self._consecutive_failures} 次请求失败，"
+                f"熔断 {self.breaker_cooldown} 秒"
+            )
 
-                # 检查是否有版本冲突错误需要重试
-                if errors:
-                    conflict_errors = [e for e in errors if e.get("status") == 409]
-
-                    if conflict_errors and attempt < self.max_retries:
-                        logger.warning(
-                            f"检测到 {len(conflict_errors)} 个版本冲突错误，"
-                            f"第 {attempt + 1} 次重试..."
-                        )
-                        time.sleep(self.retry_delay)
-                        # 只重试冲突的操作（需要根据索引位置匹配）
-                        retry_actions = []
-                        for i, action in enumerate(actions):
-                            # 检查该操作是否在错误列表中且是版本冲突
-                            for error in errors:
-                                if (
-                                    error.get("_id") == action.get("_id")
-                                    and error.get("_index") == action.get("_index")
-                                    and error.get("status") == 409
-                                ):
-                                    retry_actions.append(action)
-                                    break
-                        if retry_actions:
-                            actions = retry_actions
-                            continue
-
-                # 成功完成，跳出重试循环
-                break
+    def _record_attempt(self, success_count: int, errors: list[dict[str, Any]]) -> None:
+        """根据一次请求的响应更新熔断器状态.
 
-            except (TransportError, Exception) as e:
-                if attempt < self.max_retries:
-                    logger.warning(
-                        f"批量操作遇到异常，第 {attempt + 1} 次重试: {str(e)}"
-                    )
-                    time.sleep(self.retry_delay)
-                else:
-                    # 重试次数耗尽
-                    raise BulkRetryExhaustedError(
-                        f"批量操作重试次数耗尽: {str(e)}"
-                    ) from e
-
-        return success_count, failed_count, errors, successes
+        helpers 将整个请求失败（如集群返回 5xx）转为逐条的失败项，全部失败项
+        都属于这种情况时同样计为一次请求失败；至少有一条动作成功时才重置
+        连续失败次数，只有单条文档错误时保持不变。
+        """
+        if success_count:
+            self._consecutive_failures = 0
+        elif errors and all(_is_request_failure(e) for e in errors):
+            self._record_request_failure()
+
+    def _throttle_delay(self) -> float:
+        """发送请求前需要等待的秒数，未配置限流时为 0."""
+        if self.rate_limiter is None:
+            return 0.0
+        return self.rate_limiter.reserve()
+
+    def _update_rate_limiter(
+        self,
+        errors: Iterable[dict[str, Any]],
+        exc: Exception | None = None,
+    ) -> None:
+        """根据一次请求的结果调整限流速率：遇到 429 减速，无错误时计入成功."""
+        if self.rate_limiter is None:
+            return
+        if getattr(exc, "status_code", None) == 429 or any(
+            e.get("status") == 429 for e in errors
+        ):
+            self.rate_limiter.on_throttle()
+        elif exc is None and not errors:
+            self.rate_limiter.on_success()
 
     def _process_errors(
         self,
@@ -204,76 +284,436 @@ class BulkOperationTool:
         for error in errors:
             try:
                 # 提取错误信息
-                index_name = error.get("index", error.get("_index", ""))
-                doc_id = error.get("_id", error.get("id"))
-                error_info = error.get("error", {})
-                error_type = error_info.get("type", "unknown")
-                error_reason = error_info.get("reason", "unknown error")
-                status = error.get("status", 0)
-
-                # 提取根本原因
-                caused_by = None
-                if "caused_by" in error_info:
-                    caused_by_info = error_info["caused_by"]
-                    caused_by = f"{caused_by_info.get('type', '')}: {caused_by_info.get('reason', '')}"
-
-                # 提取操作类型
-                operation = error.get("op_type")
-                if operation:
-                    try:
-                        operation_enum = BulkAction(operation)
-                    except ValueError:
-                        operation_enum = None
+                index_name = error.get("index")
+                if index_name is None:
+                    index_name = error.get("_index", "")
+                doc_id = error.get("_id")
+                if doc_id is None:
+                    doc_id = error.get("id")
+
+                error_info = error.get("error") or {}
+                if isinstance(error_info, dict):
+                    error_type = error_info.get("type", "unknown")
+                    error_reason = error_info.get("reason", "unknown error")
+                    # 根本原因保留原始字典，需要时再通过 caused_by_str 格式化
+                    caused_by = error_info.get("caused_by") or None
                 else:
-                    operation_enum = None
-
-                error_item = BulkErrorItem(
-                    index_name=index_name,
-                    doc_id=doc_id,
-                    error_type=error_type,
-                    error_reason=error_reason,
-                    status=status,
-                    caused_by=caused_by,
-                    operation=operation_enum,
+                    # 请求异常时 error 为异常信息字符串
+                    exception = error.get("exception")
+                    error_type = (
+                        type(exception).__name__ if exception is not None else "unknown"
+                    )
+                    error_reason = str(error_info)
+                    caused_by = None
+
+                error_items.append(
+                    BulkErrorItem(
+                        index_name=index_name,
+                        doc_id=doc_id,
+                        error_type=error_type,
+                        error_reason=error_reason,
+                        status=error.get("status", 0),
+                        caused_by=caused_by,
+                        operation=_BULK_ACTIONS.get(error.get("op_type")),
+                    )
                 )
-                error_items.append(error_item)
 
             except Exception as e:
                 logger.error(f"解析错误信息失败: {str(e)}, 错误内容: {error}")
 
         return error_items
 
-    def _execute_bulk_operations(
+    def _iter_batches(
         self,
-        operations: list[BulkOperation],
-    ) -> BulkResult:
-        """执行批量操作的核心方法.
+        actions: Iterable[dict[str, Any]],
+    ) -> Iterator[list[dict[str, Any]]]:
+        """按条数分批，逐批产出动作列表.
+
+        只按 batch_size 分批，不预先序列化动作估算大小；发送时由 helpers
+        按 max_chunk_bytes 将批次拆分为多个请求，避免同一动作序列化两次。
 
         Args:
-            operations: 批量操作项列表
+            actions: 动作迭代器
+
+        Yields:
+            批次动作列表
+        """
+        it = iter(actions)
+        while batch := list(islice(it, self.batch_size)):
+            yield batch
+
+    @staticmethod
+    def _document_actions(
+        op_type: str,
+        index_name: str,
+        documents: list[dict[str, Any]],
+        doc_id_field: str | None,
+        routing_field: str | None,
+    ) -> Iterator[dict[str, Any]]:
+        """将文档直接转换为 index / create 动作，不经过 BulkOperation.
+
+        是否提取文档ID与路由在整次调用中不变，按此选择专用的循环，
+        避免逐条判断。
+        """
+        if not doc_id_field and not routing_field:
+            # 由ES自动生成ID
+            for doc in documents:
+                yield {"_op_type": op_type, "_index": index_name, "_source": doc}
+            return
+
+        # 使用 itemgetter 直接取字段值，字段缺失或为 None 时不设置对应元数据
+        if not routing_field:
+            get_id = itemgetter(doc_id_field)
+            for doc in documents:
+                action = {"_op_type": op_type, "_index": index_name, "_source": doc}
+                try:
+                    doc_id = get_id(doc)
+                except KeyError:
+                    doc_id = None
+                if doc_id is not None:
+                    action["_id"] = doc_id
+                yield action
+            return
+
+        get_routing = itemgetter(routing_field)
+        if not doc_id_field:
+            for doc in documents:
+                action = {"_op_type": op_type, "_index": index_name, "_source": doc}
+                try:
+                    routing = get_routing(doc)
+                except KeyError:
+                    routing = None
+                if routing is not None:
+                    action["_routing"] = routing
+                yield action
+            return
+
+        get_id = itemgetter(doc_id_field)
+        for doc in documents:
+            action = {"_op_type": op_type, "_index": index_name, "_source": doc}
+            try:
+                doc_id = get_id(doc)
+            except KeyError:
+                doc_id = None
+            if doc_id is not None:
+                action["_id"] = doc_id
+            try:
+                routing = get_routing(doc)
+            except KeyError:
+                routing = None
+            if routing is not None:
+                action["_routing"] = routing
+            yield action
+
+    @staticmethod
+    def _mark_batch_failed(
+        result: BulkResult,
+        batch: list[dict[str, Any]],
+        exc: Exception,
+        operation: BulkAction | None = None,
+    ) -> None:
+        """将整个批次标记为失败."""
+        for action in batch:
+            result.add_error(
+                index_name=action["_index"],
+                doc_id=action.get("_id"),
+                error_type="BatchProcessingError",
+                error_reason=str(exc),
+                status=500,
+                operation=operation or BulkAction(action["_op_type"]),
+            )
+        result.failed += len(batch)
+
+    def _raise_if_failed(self, result: BulkResult) -> None:
+        """配置了 raise_on_error 且有失败时抛出异常."""
+        if self.raise_on_error and result.failed > 0:
+            raise BulkProcessingError(
+                f"批量操作完成，但有 {result.failed} 个失败: "
+                f"{result.get_error_summary()}"
+            )
+
+
+class _StreamProgress:
+    """流式写入的结果汇总.
+
+    记录已转换为动作、尚未执行的操作项；每个批次执行完毕后汇总批次结果、
+    将批次中的操作项归还到对象池并调用进度回调。
+    """
+
+    __slots__ = (
+        "_tool",
+        "_progress_callback",
+        "_operation_pool",
+        "_pending",
+        "result",
+        "batch_count",
+        "processed_count",
+    )
+
+    def __init__(
+        self,
+        tool: _BulkToolBase,
+        progress_callback: Callable[[int, int, BulkResult], None] | None,
+        operation_pool: OperationPool | None,
+    ):
+        self._tool = tool
+        self._progress_callback = progress_callback
+        self._operation_pool = operation_pool
+        self._pending: deque[BulkOperation] = deque()
+        self.result = BulkResult(total=0)
+        self.batch_count = 0
+        self.processed_count = 0
+
+    def prepare(self, operation: BulkOperation) -> dict[str, Any]:
+        """登记操作项并转换为动作."""
+        self._pending.append(operation)
+        return self._tool._prepare_bulk_action(operation)
+
+    def add_batch(
+        self,
+        batch: list[dict[str, Any]],
+        success_count: int,
+        failed_count: int,
+        errors: list[dict[str, Any]],
+    ) -> None:
+        """汇总一个执行完毕的批次."""
+        self.batch_count += 1
+        batch_result = BulkResult(
+            total=len(batch), success=success_count, failed=failed_count
+        )
+        if errors:
+            batch_result.extend_errors(self._tool._process_errors(errors))
+        if failed_count > 0:
+            logger.warning(
+                f"批次 {self.batch_count}: 成功 {success_count}, 失败 {failed_count}"
+            )
+        else:
+            logger.info(f"批次 {self.batch_count}: 全部成功 ({success_count})")
+        self._finish_batch(batch_result)
+
+    def fail_batch(self, batch: list[dict[str, Any]], exc: Exception) -> None:
+        """将重试耗尽的批次标记为失败，后续批次继续处理."""
+        self.batch_count += 1
+        logger.error(f"批次 {self.batch_count} 处理失败: {str(exc)}")
+        batch_result = BulkResult(total=len(batch))
+        self._tool._mark_batch_failed(batch_result, batch, exc)
+        self._finish_batch(batch_result)
+
+    def _finish_batch(self, batch_result: BulkResult) -> None:
+        """合并批次结果，归还操作项并调用进度回调."""
+        operations = [self._pending.popleft() for _ in range(batch_result.total)]
+        if self._operation_pool is not None:
+            self._operation_pool.release_many(operations)
+
+        self.result.merge(batch_result)
+        self.processed_count += batch_result.total
+        if self._progress_callback:
+            self._progress_callback(self.processed_count, -1, batch_result)
+        self._tool._raise_if_failed(batch_result)
+
+    def fail(self, exc: Exception) -> BulkProcessingError:
+        """记录已处理的结果，返回需要抛出的异常."""
+        logger.error(f"流式处理过程中发生异常: {str(exc)}")
+        if self._progress_callback:
+            self._progress_callback(self.processed_count, -1, self.result)
+        return BulkProcessingError(f"流式处理失败: {str(exc)}")
+
+    def finish(self, start_time: float) -> BulkResult:
+        """填写耗时与批次数，返回汇总结果."""
+        self.result.took = time.time() - start_time
+        self.result.batch_count = self.batch_count
+        return self.result
+
+
+class BulkOperationTool(_BulkToolBase):
+    """批量操作核心工具类.
+
+    提供高效的 Elasticsearch 批量操作功能，支持：
+    - 自动分批处理
+    - 失败重试机制
+    - 操作结果统计
+    - 流式处理支持
+
+    Args:
+        es_client: Elasticsearch 客户端实例
+        batch_size: 每批次操作数量，默认为 500
+        max_retries: 最大重试次数，默认为 3
+        retry_delay: 重试基础延迟时间（秒），默认为 1.0；第 n 次重试前等待
+            [0, min(retry_delay * 2**n, max_backoff)] 之间的随机时长
+        raise_on_error: 遇到错误时是否抛出异常，默认为 False
+        chunk_size: 与 batch_size 同义，保留用于兼容性
+        thread_count: 每个批次并发发送 bulk 请求的线程数，默认为 4；
+            批次会被均分为 thread_count 个请求，单个请求的文档数应满足
+            请求大小 <= max_chunk_bytes（即 文档数 <= max_chunk_bytes / 平均文档大小）
+        queue_size: parallel_bulk 任务队列长度，默认为 4
+        max_chunk_bytes: 单个 bulk 请求的最大字节数，默认为 10MB；批次序列化后
+            超过该值时由 helpers 拆分为多个请求，以适应大小不一的文档
+        max_backoff: 单次重试等待时间的上限（秒），默认为 30.0
+        rate_limiter: 自适应令牌桶，每个批次发送前取得令牌，集群返回 429
+            时自动降低发送速率；默认为 None，不限流
+        breaker_threshold: 连续请求异常达到该次数后打开熔断器，默认为 5
+        breaker_cooldown: 熔断持续时间（秒），期间批次直接失败而不发送请求，
+            默认为 30.0
+    """
+
+    def __init__(
+        self,
+        es_client: Elasticsearch,
+        batch_size: int = 500,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        raise_on_error: bool = False,
+        chunk_size: int | None = None,
+        thread_count: int = 4,
+        queue_size: int = 4,
+        max_chunk_bytes: int = 10 * 1024 * 1024,
+        max_backoff: float = 30.0,
+        rate_limiter: TokenBucket | None = None,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
+    ):
+        super().__init__(
+            es_client,
+            batch_size=batch_size,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            raise_on_error=raise_on_error,
+            chunk_size=chunk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            max_backoff=max_backoff,
+            rate_limiter=rate_limiter,
+            breaker_threshold=breaker_threshold,
+            breaker_cooldown=breaker_cooldown,
+        )
+        self.thread_count = thread_count
+        self.queue_size = queue_size
+        logger.info(
+            f"初始化批量操作工具: batch_size={self.batch_size}, "
+            f"max_retries={max_retries}, retry_delay={retry_delay}, "
+            f"thread_count={thread_count}"
+        )
+
+    def _execute_bulk_with_retry(
+        self,
+        actions: list[dict[str, Any]],
+    ) -> tuple[int, int, list[dict[str, Any]], list[dict[str, Any]]]:
+        """执行批量操作并支持重试.
+
+        Args:
+            actions: 操作动作列表
 
         Returns:
-            批量操作结果
+            元组：(成功数, 失败数, 错误详情列表, 成功详情列表)
         """
-        if not operations:
-            return BulkResult(total=0, success=0, failed=0)
+        errors: list[dict[str, Any]] = []
+        successes: list[dict[str, Any]] = []
 
-        result = BulkResult(total=len(operations))
+        for attempt in range(self.max_retries + 1):
+            attempt_errors: list[dict[str, Any]] = []
+            attempt_successes: list[dict[str, Any]] = []
+            # 可重试的操作（见 _is_retryable），响应按提交顺序返回，
+            # 按位置直接取对应的动作
+            retry_actions: list[dict[str, Any]] = []
+            # 整个请求失败时的异常，用于读取 Retry-After 响应头
+            retry_exc: Exception | None = None
+            self._ensure_breaker_closed()
+            delay = self._throttle_delay()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                # 将批次均分为 thread_count 个请求并发发送，重叠网络往返时间
+                chunk_size = max(1, -(-len(actions) // self.thread_count))
+                for idx, (ok, info) in enumerate(
+                    parallel_bulk(
+                        self.es_client,
+                        actions,
+                        thread_count=self.thread_count,
+                        queue_size=self.queue_size,
+                        chunk_size=chunk_size,
+                        max_chunk_bytes=self.max_chunk_bytes,
+                        raise_on_exception=False,
+                        raise_on_error=False,
+                    )
+                ):
+                    if ok:
+                        attempt_successes.append(info)
+                        continue
+                    error = _flatten_response_item(info)
+                    if _is_retryable(error):
+                        retry_actions.append(actions[idx])
+                        if retry_exc is None:
+                            retry_exc = error.get("exception")
+                    attempt_errors.append(error)
+
+            except (TransportError, Exception) as e:
+                self._record_request_failure()
+                if attempt < self.max_retries and not self._breaker_open():
+                    logger.warning(
+                        f"批量操作遇到异常，第 {attempt + 1} 次重试: {str(e)}"
+                    )
+                    time.sleep(self._backoff_delay(attempt, e))
+                    continue
+                # 重试次数耗尽
+                raise BulkRetryExhaustedError(f"批量操作重试次数耗尽: {str(e)}") from e
+
+            self._record_attempt(len(attempt_successes), attempt_errors)
+            successes.extend(attempt_successes)
+            self._update_rate_limiter(attempt_errors)
+
+            # 检查是否有可重试的失败操作，只重试这些操作
+            if (
+                retry_actions
+                and attempt < self.max_retries
+                and not self._breaker_open()
+            ):
+                logger.warning(
+                    f"检测到 {len(retry_actions)} 个可重试的失败操作，"
+                    f"第 {attempt + 1} 次重试..."
+                )
+                time.sleep(self._backoff_delay(attempt, retry_exc))
+                # 其余失败不再重试，直接记录
+                errors.extend(e for e in attempt_errors if not _is_retryable(e))
+                actions = retry_actions
+                continue
+
+            # 成功完成，跳出重试循环
+            errors.extend(attempt_errors)
+            break
+
+        return len(successes), len(errors), errors, successes
+
+    def _execute_actions(
+        self,
+        actions: Iterable[dict[str, Any]],
+        result: BulkResult,
+        operation: BulkAction | None = None,
+        success_hook: Callable[[BulkResult, list[dict[str, Any]]], None] | None = None,
+    ) -> BulkResult:
+        """分批执行动作并将结果累加到 result 中.
+
+        所有批量写入（bulk_execute 及各 bulk_* 方法）共用该执行路径。
+
+        Args:
+            actions: 动作迭代器（可用于 elasticsearch.helpers 的操作字典）
+            result: 结果对象，total 由调用方设置
+            operation: 批次整体失败时记录的操作类型，默认按 _op_type 推断
+            success_hook: 每个批次完成后以 (result, 成功响应列表) 调用，
+                用于按响应内容统计额外的结果（如 UPSERT 的创建数和更新数）
+
+        Returns:
+            result
+        """
         start_time = time.time()
         batch_count = 0
 
-        # 分批处理
-        for i in range(0, len(operations), self.batch_size):
-            batch = operations[i : i + self.batch_size]
+        # 按条数与字节数分批处理
+        for batch in self._iter_batches(actions):
             batch_count += 1
 
-            # 准备操作动作
-            actions = [self._prepare_bulk_action(op) for op in batch]
-
             try:
                 # 执行批量操作
                 success_count, failed_count, errors, successes = (
-                    self._execute_bulk_with_retry(actions)
+                    self._execute_bulk_with_retry(batch)
                 )
 
                 result.success += success_count
@@ -282,7 +722,10 @@ class BulkOperationTool:
                 # 处理错误
                 if errors:
                     error_items = self._process_errors(errors)
-                    result.errors.extend(error_items)
+                    result.extend_errors(error_items)
+
+                if success_hook is not None:
+                    success_hook(result, successes)
 
                 if failed_count > 0:
                     logger.warning(
@@ -293,30 +736,36 @@ class BulkOperationTool:
 
             except Exception as e:
                 logger.error(f"批次 {batch_count} 处理失败: {str(e)}")
-                # 将整个批次标记为失败
-                for op in batch:
-                    result.add_error(
-                        index_name=op.index_name,
-                        doc_id=op.doc_id,
-                        error_type="BatchProcessingError",
-                        error_reason=str(e),
-                        status=500,
-                        operation=op.action,
-                    )
-                result.failed += len(batch)
+                self._mark_batch_failed(result, batch, e, operation)
 
         result.took = time.time() - start_time
         result.batch_count = batch_count
 
         # 如果配置了 raise_on_error 且有失败，抛出异常
-        if self.raise_on_error and result.failed > 0:
-            raise BulkProcessingError(
-                f"批量操作完成，但有 {result.failed} 个失败: "
-                f"{result.get_error_summary()}"
-            )
+        self._raise_if_failed(result)
 
         return result
 
+    def _execute_bulk_operations(
+        self,
+        operations: list[BulkOperation],
+    ) -> BulkResult:
+        """执行批量操作项列表.
+
+        Args:
+            operations: 批量操作项列表
+
+        Returns:
+            批量操作结果
+        """
+        if not operations:
+            return BulkResult(total=0, success=0, failed=0)
+
+        return self._execute_actions(
+            map(self._prepare_bulk_action, operations),
+            BulkResult(total=len(operations)),
+        )
+
     def bulk_execute(
         self,
         operations: list[BulkOperation],
@@ -358,14 +807,20 @@ class BulkOperationTool:
         self,
         operations: Iterable[BulkOperation],
         progress_callback: Callable[[int, int, BulkResult], None] | None = None,
+        operation_pool: OperationPool | None = None,
     ) -> BulkResult:
         """流式执行批量操作.
 
-        适用于处理超大量数据，不需要将所有数据加载到内存。
+        适用于处理超大量数据，不需要将所有数据加载到内存。操作项逐条转换为动作，
+        每满 batch_size 条作为一个批次发送，与 bulk_execute 相同地重试、限流；
+        批次重试耗尽时只将该批次标记为失败，继续处理后续批次；熔断器打开时
+        （集群连续请求失败）终止流式处理并抛出 BulkProcessingError。
 
         Args:
             operations: 批量操作项迭代器
             progress_callback: 进度回调函数，参数为 (当前处理数, 已知总数或-1, 当前批次结果)
+            operation_pool: 对象池，指定时每个批次完成后将其中的操作归还到池中，
+                operations 可通过 operation_pool.acquire() 复用实例
 
         Returns:
             批量操作结果
@@ -380,68 +835,102 @@ class BulkOperationTool:
             >>> result = bulk_tool.bulk_stream(
             ...     operations, progress_callback=progress_callback
             ... )
+            >>>
+            >>> pool = OperationPool()
+            >>> operations = (
+            ...     pool.acquire(BulkAction.INDEX, "logs", source=doc) for doc in docs
+            ... )
+            >>> result = bulk_tool.bulk_stream(operations, operation_pool=pool)
         """
-        result = BulkResult(total=0)
         start_time = time.time()
-        batch: list[BulkOperation] = []
-        batch_count = 0
-        processed_count = 0
+        progress = _StreamProgress(self, progress_callback, operation_pool)
 
         try:
-            for operation in operations:
-                batch.append(operation)
-
-                # 达到批次大小时执行
-                if len(batch) >= self.batch_size:
-                    batch_count += 1
-                    batch_result = self._execute_bulk_operations(batch)
-
-                    # 合并结果
-                    result.total += batch_result.total
-                    result.success += batch_result.success
-                    result.failed += batch_result.failed
-                    result.created += batch_result.created
-                    result.updated += batch_result.updated
-                    result.deleted += batch_result.deleted
-                    result.errors.extend(batch_result.errors)
-                    result.warnings.extend(batch_result.warnings)
-                    processed_count += batch_result.total
-
-                    # 调用进度回调
-                    if progress_callback:
-                        progress_callback(processed_count, -1, batch_result)
-
-                    batch.clear()
-
-            # 处理剩余的操作
-            if batch:
-                batch_count += 1
-                batch_result = self._execute_bulk_operations(batch)
-
-                result.total += batch_result.total
-                result.success += batch_result.success
-                result.failed += batch_result.failed
-                result.created += batch_result.created
-                result.updated += batch_result.updated
-                result.deleted += batch_result.deleted
-                result.errors.extend(batch_result.errors)
-                result.warnings.extend(batch_result.warnings)
-                processed_count += batch_result.total
-
-                if progress_callback:
-                    progress_callback(processed_count, -1, batch_result)
+            # 动作由生成器逐条产出并按 batch_size 分批，内存中只保留当前批次的数据
+            for batch in self._iter_batches(map(progress.prepare, operations)):
+                # 集群持续不可用、熔断器打开时终止整个流，不再读取后续操作项
+                self._ensure_breaker_closed()
+                try:
+                    outcome = self._execute_bulk_with_retry(batch)
+                except Exception as e:
+                    progress.fail_batch(batch, e)
+                else:
+                    success_count, failed_count, errors, _ = outcome
+                    progress.add_batch(batch, success_count, failed_count, errors)
 
         except Exception as e:
-            logger.error(f"流式处理过程中发生异常: {str(e)}")
-            # 记录已处理的结果
-            if progress_callback:
-                progress_callback(processed_count, -1, result)
-            raise BulkProcessingError(f"流式处理失败: {str(e)}") from e
+            raise progress.fail(e) from e
 
-        result.took = time.time() - start_time
-        result.batch_count = batch_count
+        return progress.finish(start_time)
 
-        return result
+    @contextmanager
+    def tune_index_for_bulk(self, index_name: str) -> Iterator[None]:
+        """在大批量写入期间关闭索引刷新与副本，退出时恢复原设置.
+
+        进入时将 refresh_interval 设为 -1、number_of_replicas 设为 0，
+        避免写入过程中反复生成段与同步副本；退出时（包括发生异常）按
+        索引恢复原有设置并执行一次 refresh。原先未显式设置的项恢复为默认值。
+        某个索引恢复失败时仍会恢复其余索引并执行 refresh；写入过程中发生
+        异常时抛出该异常，否则抛出第一个恢复失败的异常。
+
+        Args:
+            index_name: 索引名称（可以是别名或通配符）
+
+        Example:
+            >>> with bulk_tool.tune_index_for_bulk("users"):
+            ...     bulk_tool.bulk_index("users", documents)
+        """
+        response = self.es_client.indices.get_settings(
+            index=index_name,
+            name="index.refresh_interval,index.number_of_replicas",
+        )
+        previous: dict[str, dict[str, Any]] = {}
+        for name, data in response.items():
+            settings = data.get("settings", {}).get("index", {})
+            previous[name] = {
+                "refresh_interval": settings.get("refresh_interval"),
+                "number_of_replicas": settings.get("number_of_replicas"),
+            }
+
+        self.es_client.indices.put_settings(
+            index=index_name,
+            body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+        )
+        logger.info(f"已为批量写入关闭索引刷新与副本: {index_name}")
+        try:
+            yield
+        except BaseException:
+            # 写入过程中的异常优先抛出，恢复失败只记录日志
+            self._restore_index_settings(index_name, previous)
+            raise
+        error = self._restore_index_settings(index_name, previous)
+        if error is not None:
+            raise error
+
+    def _restore_index_settings(
+        self, index_name: str, previous: dict[str, dict[str, Any]]
+    ) -> Exception | None:
+        """逐个索引恢复设置并执行 refresh，返回第一个失败的异常.
+
+        某个索引恢复失败时记录日志并继续恢复其余索引，refresh 总会执行。
+        """
+        error: Exception | None = None
+        for name, settings in previous.items():
+            try:
+                self.es_client.indices.put_settings(
+                    index=name, body={"index": settings}
+                )
+            except Exception as e:
+                logger.error(f"恢复索引设置失败: {name}, {str(e)}")
+                error = error or e
+        try:
+            self.es_client.indices.refresh(index=index_name)
+        except Exception as e:
+            logger.error(f"刷新索引失败: {index_name}, {str(e)}")
+            error = error or e
+        if error is None:
+            logger.info(f"已恢复索引设置: {index_name}")
+        return error
 
     def set_config(
         self,
@@ -449,6 +938,7 @@ class BulkOperationTool:
         max_retries: int | None = None,
         retry_delay: float | None = None,
         raise_on_error: bool | None = None,
+        thread_count: int | None = None,
     ) -> None:
         """更新工具配置.
 
@@ -457,6 +947,7 @@ class BulkOperationTool:
             max_retries: 最大重试次数
             retry_delay: 重试延迟时间（秒）
             raise_on_error: 遇到错误时是否抛出异常
+            thread_count: 每个批次并发发送 bulk 请求的线程数
         """
         if batch_size is not None:
             self.batch_size = batch_size
@@ -466,12 +957,15 @@ class BulkOperationTool:
             self.retry_delay = retry_delay
         if raise_on_error is not None:
             self.raise_on_error = raise_on_error
+        if thread_count is not None:
+            self.thread_count = thread_count
 
         logger.info(
             f"更新配置: batch_size={self.batch_size}, "
             f"max_retries={self.max_retries}, "
             f"retry_delay={self.retry_delay}, "
-            f"raise_on_error={self.raise_on_error}"
+            f"raise_on_error={self.raise_on_error}, "
+            f"thread_count={self.thread_count}"
         )
 
     def bulk_index(
@@ -500,27 +994,13 @@ class BulkOperationTool:
             >>> result = bulk_tool.bulk_index("users", documents, doc_id_field="id")
             >>> print(f"成功: {result.success}, 失败: {result.failed}")
         """
-        operations: list[BulkOperation] = []
-
-        for doc in documents:
-            doc_id = None
-            if doc_id_field:
-                doc_id = doc.get(doc_id_field)
-
-            routing = None
-            if routing_field:
-                routing = doc.get(routing_field)
-
-            operation = BulkOperation(
-                action=BulkAction.INDEX,
-                index_name=index_name,
-                doc_id=doc_id,
-                source=doc,
-                routing=routing,
-            )
-            operations.append(operation)
+        if not documents:
+            return BulkResult(total=0, success=0, failed=0)
 
-        return self._execute_bulk_operations(operations)
+        actions = self._document_actions(
+            "index", index_name, documents, doc_id_field, routing_field
+        )
+        return self._execute_actions(actions, BulkResult(total=len(documents)))
 
     def bulk_create(
         self,
@@ -548,27 +1028,137 @@ class BulkOperationTool:
             >>> result = bulk_tool.bulk_create("users", documents, doc_id_field="id")
             >>> print(f"成功: {result.success}, 失败: {result.failed}")
         """
-        operations: list[BulkOperation] = []
+        if not documents:
+            return BulkResult(total=0, success=0, failed=0)
+
+        actions = self._document_actions(
+            "create", index_name, documents, doc_id_field, routing_field
+        )
+        return self._execute_actions(actions, BulkResult(total=len(documents)))
 
+    def raw_bulk_index(
+        self,
+        index_name: str,
+        documents: Iterable[dict[str, Any]],
+        doc_id_field: str | None = None,
+    ) -> BulkResult:
+        """以预序列化的 NDJSON 请求体批量索引文档.
+
+        索引名放在请求路径中，动作行只包含文档ID，其余部分预先编码一次；
+        文档直接序列化写入字节缓冲区后提交给 _bulk 接口，不构造动作字典，
+        也不经过 elasticsearch.helpers。适用于向单个索引高吞吐写入。
+
+        Args:
+            index_name: 索引名称
+            documents: 文档迭代器
+            doc_id_field: 用作文档ID的字段名，如果不指定则让ES自动生成ID
+
+        Returns:
+            批量操作结果
+
+        Example:
+            >>> bulk_tool = BulkOperationTool(es_client)
+            >>> result = bulk_tool.raw_bulk_index("logs", documents, "id")
+        """
+        result = BulkResult(total=0)
+        start_time = time.time()
+        # 动作行中不变的部分只编码一次
+        auto_id_header = b'{"index":{}}\n'
+        id_prefix = b'{"index":{"_id":'
+        id_suffix = b"}}\n"
+
+        buffer = bytearray()
+        doc_ids: list[Any] = []
         for doc in documents:
-            doc_id = None
-            if doc_id_field:
-                doc_id = doc.get(doc_id_field)
-
-            routing = None
-            if routing_field:
-                routing = doc.get(routing_field)
-
-            operation = BulkOperation(
-                action=BulkAction.CREATE,
-                index_name=index_name,
-                doc_id=doc_id,
-                source=doc,
-                routing=routing,
-            )
-            operations.append(operation)
+            doc_id = doc.get(doc_id_field) if doc_id_field else None
+            if doc_id is None:
+                buffer += auto_id_header
+            else:
+                buffer += id_prefix
+                buffer += _dumps_bytes(str(doc_id))
+                buffer += id_suffix
+            buffer += _dumps_bytes(doc)
+            buffer += b"\n"
+            doc_ids.append(doc_id)
+            if len(doc_ids) >= self.batch_size or len(buffer) >= self.max_chunk_bytes:
+                self._send_raw_batch(index_name, bytes(buffer), doc_ids, result)
+                buffer.clear()
+                doc_ids = []
+        if doc_ids:
+            self._send_raw_batch(index_name, bytes(buffer), doc_ids, result)
 
-        return self._execute_bulk_operations(operations)
+        result.took = time.time() - start_time
+        self._raise_if_failed(result)
+        return result
+
+    def _raw_bulk_with_retry(self, index_name: str, body: bytes) -> dict[str, Any]:
+        """提交 NDJSON 请求体，请求异常时重试."""
+        for attempt in range(self.max_retries + 1):
+            self._ensure_breaker_closed()
+            delay = self._throttle_delay()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                response = self.es_client.bulk(body=body, index=index_name)
+            except (TransportError, Exception) as e:
+                self._update_rate_limiter((), e)
+                self._record_request_failure()
+                if attempt < self.max_retries and not self._breaker_open():
+                    logger.warning(
+                        f"批量操作遇到异常，第 {attempt + 1} 次重试: {str(e)}"
+                    )
+                    time.sleep(self._backoff_delay(attempt, e))
+                    continue
+                raise BulkRetryExhaustedError(f"批量操作重试次数耗尽: {str(e)}") from e
+            return response
+
+    def _send_raw_batch(
+        self,
+        index_name: str,
+        body: bytes,
+        doc_ids: list[Any],
+        result: BulkResult,
+    ) -> None:
+        """提交一个 NDJSON 批次并将结果累加到 result 中，请求异常时重试."""
+        result.total += len(doc_ids)
+        result.batch_count += 1
+        try:
+            response = self._raw_bulk_with_retry(index_name, body)
+        except Exception as e:
+            logger.error(f"批次 {result.batch_count} 处理失败: {str(e)}")
+            for doc_id in doc_ids:
+                result.add_error(
+                    index_name=index_name,
+                    doc_id=doc_id,
+                    error_type="BatchProcessingError",
+                    error_reason=str(e),
+                    status=500,
+                    operation=BulkAction.INDEX,
+                )
+            result.failed += len(doc_ids)
+            return
+
+        if not response.get("errors"):
+            result.success += len(doc_ids)
+            self._consecutive_failures = 0
+            self._update_rate_limiter(())
+            logger.info(f"批次 {result.batch_count}: 全部成功 ({len(doc_ids)})")
+            return
+
+        errors = [
+            _flatten_response_item(item)
+            for item in response["items"]
+            if "error" in next(iter(item.values()))
+        ]
+        self._record_attempt(len(doc_ids) - len(errors), errors)
+        self._update_rate_limiter(errors)
+        result.success += len(doc_ids) - len(errors)
+        result.failed += len(errors)
+        result.extend_errors(self._process_errors(errors))
+        logger.warning(
+            f"批次 {result.batch_count}: 成功 {len(doc_ids) - len(errors)}, "
+            f"失败 {len(errors)}"
+        )
 
     def bulk_update(
         self,
@@ -602,8 +1192,8 @@ class BulkOperationTool:
         if retry_on_conflict is None:
             retry_on_conflict = 3
 
-        operations: list[BulkOperation] = []
-
+        # 先校验并转换全部数据，缺少ID时在发送任何请求之前报错
+        actions: list[dict[str, Any]] = []
         for update_data in updates:
             doc_id = update_data.get(doc_id_field)
             if not doc_id:
@@ -614,16 +1204,20 @@ class BulkOperationTool:
             # 排除ID字段，只保留需要更新的字段
             source = {k: v for k, v in update_data.items() if k != doc_id_field}
 
-            operation = BulkOperation(
-                action=BulkAction.UPDATE,
-                index_name=index_name,
-                doc_id=doc_id,
-                source=source,
-                retry_on_conflict=retry_on_conflict,
+            actions.append(
+                {
+                    "_op_type": "update",
+                    "_index": index_name,
+                    "_id": doc_id,
+                    "doc": source,
+                    "retry_on_conflict": retry_on_conflict,
+                }
             )
-            operations.append(operation)
 
-        return self._execute_bulk_operations(operations)
+        if not actions:
+            return BulkResult(total=0, success=0, failed=0)
+
+        return self._execute_actions(actions, BulkResult(total=len(actions)))
 
     def bulk_delete(
         self,
@@ -647,17 +1241,14 @@ class BulkOperationTool:
             >>> result = bulk_tool.bulk_delete("users", doc_ids)
             >>> print(f"成功: {result.success}, 失败: {result.failed}")
         """
-        operations: list[BulkOperation] = []
-
-        for doc_id in doc_ids:
-            operation = BulkOperation(
-                action=BulkAction.DELETE,
-                index_name=index_name,
-                doc_id=doc_id,
-            )
-            operations.append(operation)
+        if not doc_ids:
+            return BulkResult(total=0, success=0, failed=0)
 
-        result = self._execute_bulk_operations(operations)
+        actions = (
+            {"_op_type": "delete", "_index": index_name, "_id": doc_id}
+            for doc_id in doc_ids
+        )
+        result = self._execute_actions(actions, BulkResult(total=len(doc_ids)))
         # 对于删除操作，成功的数量就是删除的数量
         result.deleted = result.success
         return result
@@ -692,10 +1283,8 @@ class BulkOperationTool:
             ...     f"创建: {result.created}, 更新: {result.updated}, 失败: {result.failed}"
             ... )
         """
-        operations: list[BulkOperation] = []
+        actions: list[dict[str, Any]] = []
         result = BulkResult(total=len(documents))
-        start_time = time.time()
-        batch_count = 0
 
         for doc in documents:
             doc_id = doc.get(doc_id_field)
@@ -706,81 +1295,44 @@ class BulkOperationTool:
                 result.add_warning(warning_msg)
                 continue
 
-            # 使用 UPSERT 操作类型，底层会转换为 UPDATE + doc_as_upsert
+            # 使用 UPDATE + doc_as_upsert 实现 UPSERT
             # 当 doc_id 不存在时，会创建新文档；存在时则更新
-            operation = BulkOperation(
-                action=BulkAction.UPSERT,
-                index_name=index_name,
-                doc_id=doc_id,
-                source=doc,
-                retry_on_conflict=3,
+            actions.append(
+                {
+                    "_op_type": "update",
+                    "_index": index_name,
+                    "_id": doc_id,
+                    "doc": doc,
+                    "doc_as_upsert": True,
+                    "retry_on_conflict": 3,
+                }
             )
-            operations.append(operation)
 
-        if not operations:
+        if not actions:
             logger.warning("没有有效的操作需要执行")
-            result.took = time.time() - start_time
             return result
 
-        # 分批执行
-        for i in range(0, len(operations), self.batch_size):
-            batch = operations[i : i + self.batch_size]
-            batch_count += 1
-
-            # 准备操作动作
-            actions = [self._prepare_bulk_action(op) for op in batch]
-
-            try:
-                # 执行批量操作
-                success_count, failed_count, errors, successes = (
-                    self._execute_bulk_with_retry(actions)
-                )
-
-                result.success += success_count
-                result.failed += failed_count
-
-                # 处理错误
-                if errors:
-                    error_items = self._process_errors(errors)
-                    result.errors.extend(error_items)
-
-                # 从成功结果中统计创建和更新数
-                for success_info in successes:
-                    # 从响应中提取 result 字段
-                    # success_info 格式类似: {"update": {"_index": "xxx", "_id": "xxx", "result": "created"}}
-                    for op_type, op_result in success_info.items():
-                        result_status = op_result.get("result", "")
-                        if result_status == "created":
-                            result.created += 1
-                        elif result_status in ("updated", "noop"):
-                            # noop 表示没有变化的更新，也算作更新
-                            result.updated += 1
-
-                if failed_count > 0:
-                    logger.warning(
-                        f"UPSERT 批次 {batch_count}: 成功 {success_count}, "
-                        f"失败 {failed_count}"
-                    )
-                else:
-                    logger.info(
-                        f"UPSERT 批次 {batch_count}: 全部成功 ({success_count})"
-                    )
-
-            except Exception as e:
-                logger.error(f"UPSERT 批次 {batch_count} 处理失败: {str(e)}")
-                # 将整个批次标记为失败
-                for op in batch:
-                    result.add_error(
-                        index_name=op.index_name,
-                        doc_id=op.doc_id,
-                        error_type="BatchProcessingError",
-                        error_reason=str(e),
-                        status=500,
-                        operation=op.action,
-                    )
-                result.failed += len(batch)
+        return self._execute_actions(
+            actions,
+            result,
+            operation=BulkAction.UPSERT,
+            success_hook=self._count_upsert_results,
+        )
 
-        result.took = time.time() - start_time
-        result.batch_count = batch_count
+    @staticmethod
+    def _count_upsert_results(
+        result: BulkResult,
+        successes: list[dict[str, Any]],
+    ) -> None:
+        """从成功响应中统计创建数和更新数.
 
-        return result
+        响应格式类似: {"update": {"_index": "xxx", "_id": "xxx", "result": "created"}}
+        """
+        for success_info in successes:
+            for op_result in success_info.values():
+                result_status = op_result.get("result", "")
+                if result_status == "created":
+                    result.created += 1
+                elif result_status in ("updated", "noop"):
+                    # noop 表示没有变化的更新，也算作更新
+                    result.updated += 1
@@ -28,7 +28,7 @@ class ClusterRole(Enum):
     WRITE = "write"
 
 
-@dataclass
+@dataclass(slots=True)
 class ClusterConfig:
     """集群配置模型.
 
@@ -71,7 +71,7 @@ class ClusterConfig:
             raise ConnectionConfigError("hosts 不能为空，请提供至少一个 ES 节点地址")
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectionConfig:
     """连接池配置模型.
 
@@ -86,6 +86,7 @@ class ConnectionConfig:
         sniff_on_start: 启动时是否嗅探节点，默认 False
         sniff_on_connection_fail: 连接失败时是否嗅探，默认 False
         sniffer_timeout: 嗅探超时时间（秒），默认 60
+        use_orjson: 安装了 orjson 时是否将其作为客户端的 JSON 序列化器，默认 True
 
     Raises:
         ConnectionConfigError: 当参数不合法时抛出
@@ -102,6 +103,7 @@ class ConnectionConfig:
     sniff_on_start: bool = False
     sniff_on_connection_fail: bool = False
     sniffer_timeout: int = 60
+    use_orjson: bool = True
 
     def __post_init__(self) -> None:
         """校验连接池配置参数合法性."""
@@ -21,6 +21,11 @@ from __future__ import annotations
 
 from elasticsearch import Elasticsearch
 
+try:
+    from elasticsearch.serializer import OrjsonSerializer
+except ImportError:  # orjson 为可选依赖，旧版客户端也没有该序列化器
+    OrjsonSerializer = None
+
 from .exceptions import (
     ClusterNotFoundError,
     ConnectionConfigError,
@@ -72,7 +77,8 @@ class ESClientFactory:
         """根据集群配置创建 Elasticsearch 客户端实例.
 
         根据认证方式（Basic Auth / API Key / Bearer Token / 无认证）
-        和 SSL 配置构建客户端。
+        和 SSL 配置构建客户端。安装了 orjson 时使用其作为 JSON 序列化器，
+        批量写入时文档序列化是主要的 CPU 开销。
 
         Args:
             cluster_config: 单个集群的配置信息
@@ -111,6 +117,10 @@ class ESClientFactory:
             kwargs["ca_certs"] = cluster_config.ca_certs
         kwargs["verify_certs"] = cluster_config.verify_certs
 
+        # JSON 序列化器
+        if self._connection_config.use_orjson and OrjsonSerializer is not None:
+            kwargs["serializer"] = OrjsonSerializer()
+
         return Elasticsearch(**kwargs)
 
     def get_client(self, role: ClusterRole | None = None) -> Elasticsearch:
@@ -1,31 +1,53 @@
 """核心模块导出."""
 
-from elasticflow.core.conditions import (
-    ConditionItem,
-    ConditionGroup,
-    NestedCondition,
-    ConditionParser,
-    DefaultConditionParser,
-)
-from elasticflow.core.constants import QueryStringCharacters, QueryStringLogicOperators
-from elasticflow.core.fields import FieldMapper, QueryField
-from elasticflow.core.operators import GroupRelation, LogicOperator, QueryStringOperator
-from elasticflow.core.query import Q
-from elasticflow.core.utils import escape_query_string
+from typing import TYPE_CHECKING
 
-__all__ = [
-    "QueryStringCharacters",
-    "QueryStringLogicOperators",
-    "LogicOperator",
-    "GroupRelation",
-    "QueryStringOperator",
-    "ConditionItem",
-    "ConditionGroup",
-    "NestedCondition",
-    "ConditionParser",
-    "DefaultConditionParser",
-    "QueryField",
-    "FieldMapper",
-    "Q",
-    "escape_query_string",
-]
+from elasticflow._lazy import lazy_exports
+
+# 名称 -> 所在模块，首次访问时才导入
+# 只有条件解析相关的名称依赖 elasticsearch.dsl，其余名称不会触发加载
+_LAZY_IMPORTS: dict[str, str] = {
+    "QueryStringCharacters": "elasticflow.core.constants",
+    "QueryStringLogicOperators": "elasticflow.core.constants",
+    "LogicOperator": "elasticflow.core.operators",
+    "GroupRelation": "elasticflow.core.operators",
+    "QueryStringOperator": "elasticflow.core.operators",
+    "ConditionItem": "elasticflow.core.conditions",
+    "ConditionGroup": "elasticflow.core.conditions",
+    "NestedCondition": "elasticflow.core.conditions",
+    "ConditionParser": "elasticflow.core.conditions",
+    "DefaultConditionParser": "elasticflow.core.conditions",
+    "QueryField": "elasticflow.core.fields",
+    "FieldMapper": "elasticflow.core.fields",
+    "Q": "elasticflow.core.query",
+    "escape_query_string": "elasticflow.core.utils",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
+
+# 供类型检查器与 IDE 解析公共名称，运行时不导入
+if TYPE_CHECKING:
+    from .constants import (
+        QueryStringCharacters as QueryStringCharacters,
+        QueryStringLogicOperators as QueryStringLogicOperators,
+    )
+    from .operators import (
+        LogicOperator as LogicOperator,
+        GroupRelation as GroupRelation,
+        QueryStringOperator as QueryStringOperator,
+    )
+    from .conditions import (
+        ConditionItem as ConditionItem,
+        ConditionGroup as ConditionGroup,
+        NestedCondition as NestedCondition,
+        ConditionParser as ConditionParser,
+        DefaultConditionParser as DefaultConditionParser,
+    )
+    from .fields import (
+        QueryField as QueryField,
+        FieldMapper as FieldMapper,
+    )
+    from .query import Q as Q
+    from .utils import escape_query_string as escape_query_string
@@ -12,6 +12,25 @@ from elasticsearch.dsl import Q as ElasticsearchQ
 
 logger = logging.getLogger(__name__)
 
+# minimum_should_match 字符串格式：百分比（如 "50%"）或范围（如 "3<5"）
+_MSM_RE = re.compile(r"^\d+%$|^[\d<>]+$")
+
+# ConditionItem 支持的条件方法
+_VALID_METHODS = frozenset(
+    (
+        "eq",
+        "neq",
+        "include",
+        "exclude",
+        "gt",
+        "gte",
+        "lt",
+        "lte",
+        "exists",
+        "nexists",
+    )
+)
+
 
 def _validate_minimum_should_match(value: int | str | None) -> None:
     """验证 minimum_should_match 参数.
@@ -29,13 +48,55 @@ def _validate_minimum_should_match(value: int | str | None) -> None:
             raise ValueError(f"minimum_should_match must be >= 0, got {value}")
     elif isinstance(value, str):
         # 验证字符串格式：可以是百分比（如 "50%"）或范围（如 "3<5"）
-        if not re.match(r"^\d+%$|^[\d<>]+$", value):
+        if not _MSM_RE.match(value):
             raise ValueError(f"Invalid minimum_should_match format: {value}")
 
 
-@dataclass
+# 可以合并的 nested 查询参数；带 inner_hits 等其他参数时保持独立
+_MERGEABLE_NESTED_PARAMS = frozenset(("path", "query", "score_mode"))
+
+
+def merge_nested_should(queries: list[ElasticsearchQ]) -> list[ElasticsearchQ]:
+    """合并 OR（should）关系中 path 与 score_mode 相同的 nested 查询.
+
+    "存在满足 A 的子文档" OR "存在满足 B 的子文档" 等价于
+    "存在满足 A OR B 的子文档"，合并后 ES 只需执行一次 nested 关联。
+    AND 关系不能这样合并（两个条件可能由不同子文档满足）。
+
+    Args:
+        queries: should 子句列表
+
+    Returns:
+        合并后的子句列表，保持各子句首次出现的顺序
+    """
+    merged: list[ElasticsearchQ] = []
+    inner_queries: dict[int, list[ElasticsearchQ]] = {}
+    positions: dict[tuple, int] = {}
+    for q in queries:
+        if (
+            getattr(q, "name", None) == "nested"
+            and q._params.keys() <= _MERGEABLE_NESTED_PARAMS
+        ):
+            group_key = (q._params["path"], q._params.get("score_mode"))
+            index = positions.get(group_key)
+            if index is not None:
+                inner_queries[index].append(q._params["query"])
+                continue
+            positions[group_key] = len(merged)
+            inner_queries[len(merged)] = [q._params["query"]]
+        merged.append(q)
+
+    for index, inner in inner_queries.items():
+        if len(inner) > 1:
+            params = merged[index]._params.copy()
+            params["query"] = ElasticsearchQ("bool", should=inner)
+            merged[index] = ElasticsearchQ("nested", **params)
+    return merged
+
+
+@dataclass(slots=True, frozen=True)
 class ConditionItem:
-    """条件项."""
+    """条件项（不可变）."""
 
     key: str
     method: str  # eq, neq, include, exclude, gt, gte, lt, lte, exists, nexists
@@ -44,19 +105,7 @@ class ConditionItem:
 
     def __post_init__(self):
         """验证条件项参数."""
-        valid_methods = (
-            "eq",
-            "neq",
-            "include",
-            "exclude",
-            "gt",
-            "gte",
-            "lt",
-            "lte",
-            "exists",
-            "nexists",
-        )
-        if self.method not in valid_methods:
+        if self.method not in _VALID_METHODS:
             logger.warning(f"Unknown method '{self.method}', will be treated as 'eq'")
         if self.condition not in ("and", "or"):
             raise ValueError(
@@ -64,9 +113,9 @@ class ConditionItem:
             )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConditionGroup:
-    """条件组，用于逻辑嵌套.
+    """条件组（不可变），用于逻辑嵌套.
 
     例如: (status = "error" AND level >= 3) OR (type = "alert" AND priority = "high")
     可以表示为:
@@ -110,7 +159,8 @@ class ConditionGroup:
 
     def __post_init__(self):
         if self.children is None:
-            self.children = []
+            # frozen dataclass 需通过 object.__setattr__ 设置默认值
+            object.__setattr__(self, "children", [])
         # 验证 condition
         if self.condition not in ("and", "or"):
             raise ValueError(
@@ -120,9 +170,9 @@ class ConditionGroup:
         _validate_minimum_should_match(self.minimum_should_match)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NestedCondition:
-    """ES Nested 类型条件.
+    """ES Nested 类型条件（不可变）.
 
     用于查询 ES 中的嵌套文档.
 
@@ -163,7 +213,8 @@ class NestedCondition:
 
     def __post_init__(self):
         if self.children is None:
-            self.children = []
+            # frozen dataclass 需通过 object.__setattr__ 设置默认值
+            object.__setattr__(self, "children", [])
         # 验证 path
         if not self.path or not self.path.strip():
             raise ValueError("NestedCondition.path cannot be empty")
@@ -311,6 +362,73 @@ class DefaultConditionParser(ConditionParser):
 
         return queries
 
+    @staticmethod
+    def _build_terms(key: str, method: str, value: Any) -> ElasticsearchQ:
+        """等于，单个值时使用 term 查询."""
+        if not isinstance(value, list):
+            return ElasticsearchQ("term", **{key: value})
+        if len(value) == 1:
+            return ElasticsearchQ("term", **{key: value[0]})
+        # 空列表保持 terms: []（匹配不到任何文档），不能省略
+        return ElasticsearchQ("terms", **{key: value})
+
+    @staticmethod
+    def _build_not_terms(key: str, method: str, value: Any) -> ElasticsearchQ:
+        """不等于."""
+        return ~DefaultConditionParser._build_terms(key, method, value)
+
+    @staticmethod
+    def _build_wildcard(key: str, method: str, value: Any) -> ElasticsearchQ:
+        """模糊匹配."""
+        if isinstance(value, list):
+            queries = [ElasticsearchQ("wildcard", **{key: f"*{v}*"}) for v in value]
+            return (
+                queries[0]
+                if len(queries) == 1
+                else ElasticsearchQ("bool", should=queries)
+            )
+        return ElasticsearchQ("wildcard", **{key: f"*{value}*"})
+
+    @staticmethod
+    def _build_not_wildcard(key: str, method: str, value: Any) -> ElasticsearchQ:
+        """排除匹配."""
+        return ~DefaultConditionParser._build_wildcard(key, method, value)
+
+    @staticmethod
+    def _build_range(key: str, method: str, value: Any) -> ElasticsearchQ:
+        """范围查询，method 即 gte/gt/lte/lt 操作符."""
+        if isinstance(value, list) and value:
+            value = value[0]
+        return ElasticsearchQ("range", **{key: {method: value}})
+
+    @staticmethod
+    def _build_exists(key: str, method: str, value: Any) -> ElasticsearchQ:
+        """exists 查询不使用 value 参数."""
+        if value:
+            logger.debug(f"'exists' method ignores value parameter: {value}")
+        return ElasticsearchQ("exists", field=key)
+
+    @staticmethod
+    def _build_not_exists(key: str, method: str, value: Any) -> ElasticsearchQ:
+        """nexists 查询不使用 value 参数."""
+        if value:
+            logger.debug(f"'nexists' method ignores value parameter: {value}")
+        return ~ElasticsearchQ("exists", field=key)
+
+    # method -> 查询构造函数，parse 时只需一次字典查找
+    _METHOD_BUILDERS = {
+        "eq": _build_terms,
+        "neq": _build_not_terms,
+        "include": _build_wildcard,
+        "exclude": _build_not_wildcard,
+        "gte": _build_range,
+        "gt": _build_range,
+        "lte": _build_range,
+        "lt": _build_range,
+        "exists": _build_exists,
+        "nexists": _build_not_exists,
+    }
+
     def parse(self, condition: ConditionItem) -> ElasticsearchQ | None:
         """
         解析条件为 Q 对象.
@@ -321,68 +439,13 @@ class DefaultConditionParser(ConditionParser):
         Returns:
             Q 对象
         """
-        key = condition.key
         method = condition.method
-        value = condition.value
-
-        if method == "eq":
-            # 等于（显式处理）
-            if not isinstance(value, list):
-                value = [value]
-            return ElasticsearchQ("terms", **{key: value})
-
-        elif method == "neq":
-            # 不等于
-            if not isinstance(value, list):
-                value = [value]
-            return ~ElasticsearchQ("terms", **{key: value})
-
-        elif method == "include":
-            # 模糊匹配
-            if isinstance(value, list):
-                queries = [ElasticsearchQ("wildcard", **{key: f"*{v}*"}) for v in value]
-                return (
-                    queries[0]
-                    if len(queries) == 1
-                    else ElasticsearchQ("bool", should=queries)
-                )
-            return ElasticsearchQ("wildcard", **{key: f"*{value}*"})
-
-        elif method == "exclude":
-            # 排除匹配
-            if isinstance(value, list):
-                queries = [ElasticsearchQ("wildcard", **{key: f"*{v}*"}) for v in value]
-                return ~(
-                    queries[0]
-                    if len(queries) == 1
-                    else ElasticsearchQ("bool", should=queries)
-                )
-            return ~ElasticsearchQ("wildcard", **{key: f"*{value}*"})
-
-        elif method in ("gte", "gt", "lte", "lt"):
-            # 范围查询
-            if isinstance(value, list) and value:
-                value = value[0]
-            return ElasticsearchQ("range", **{key: {method: value}})
-
-        elif method == "exists":
-            # exists 查询不使用 value 参数
-            if value:
-                logger.debug(f"'exists' method ignores value parameter: {value}")
-            return ElasticsearchQ("exists", field=key)
-
-        elif method == "nexists":
-            # nexists 查询不使用 value 参数
-            if value:
-                logger.debug(f"'nexists' method ignores value parameter: {value}")
-            return ~ElasticsearchQ("exists", field=key)
-
-        else:
+        builder = self._METHOD_BUILDERS.get(method)
+        if builder is None:
             # 默认 terms 查询（未知 method）
             logger.warning(f"Unknown method '{method}', treating as 'eq'")
-            if not isinstance(value, list):
-                value = [value]
-            return ElasticsearchQ("terms", **{key: value})
+            builder = self._build_terms
+        return builder(condition.key, method, condition.value)
 
     def parse_group(self, group: ConditionGroup) -> ElasticsearchQ | None:
         """
@@ -405,11 +468,15 @@ class DefaultConditionParser(ConditionParser):
 
         # 组合子条件
         if group.condition == "or":
-            bool_params = {"should": child_queries}
             # 添加 minimum_should_match 支持（仅当用户明确指定时）
             if group.minimum_should_match is not None:
-                bool_params["minimum_should_match"] = group.minimum_should_match
-            return ElasticsearchQ("bool", **bool_params)
+                return ElasticsearchQ(
+                    "bool",
+                    should=child_queries,
+                    minimum_should_match=group.minimum_should_match,
+                )
+            # 未指定 minimum_should_match 时，同 path 的 nested 子句可合并
+            return ElasticsearchQ("bool", should=merge_nested_should(child_queries))
         else:  # and
             return ElasticsearchQ("bool", must=child_queries)
 
@@ -1,7 +1,12 @@
 """字段映射模块."""
 
+import sys
+from collections import OrderedDict
 from dataclasses import dataclass
 
+# 每个 FieldMapper 缓存的排序转换结果数量上限
+_ORDERING_CACHE_SIZE = 256
+
 
 @dataclass
 class QueryField:
@@ -31,6 +36,24 @@ class FieldMapper:
             fields: 字段配置列表
         """
         self._fields: dict[str, QueryField] = {f.field: f for f in (fields or [])}
+        # 条件转换用的 字段名 -> ES 字段名 映射，字符串驻留后后续比较与哈希更快
+        self._es_fields: dict[str, str] = {
+            sys.intern(f.field): sys.intern(f.es_field) for f in self._fields.values()
+        }
+        # 聚合 / 排序用的 字段名 -> ES 字段名 映射，预先解析 es_field_for_agg
+        self._agg_es_fields: dict[str, str] = {
+            field: sys.intern(f.get_es_field(for_agg=True))
+            for field, f in self._fields.items()
+        }
+        # 排序字段转换缓存: 输入元组 -> 转换结果元组
+        self._ordering_cache: OrderedDict[tuple[str, ...], tuple[str, ...]] = (
+            OrderedDict()
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        """是否未配置任何字段映射（此时所有字段名保持原样）."""
+        return not self._fields
 
     def get_es_field(self, field: str, for_agg: bool = False) -> str:
         """
@@ -43,9 +66,7 @@ class FieldMapper:
         Returns:
             ES 字段名
         """
-        if field in self._fields:
-            return self._fields[field].get_es_field(for_agg)
-        return field
+        return (self._agg_es_fields if for_agg else self._es_fields).get(field, field)
 
     def transform_condition_fields(self, conditions: list[dict]) -> list[dict]:
         """
@@ -65,9 +86,16 @@ class FieldMapper:
                 # 缺少 key 字段，返回原条件
                 return cond
 
+            key = cond["key"]
             new_cond = cond.copy()
-            new_cond["origin_key"] = cond["key"]
-            new_cond["key"] = self.get_es_field(cond["key"])
+            new_cond["origin_key"] = key
+            es_field = self._es_fields.get(key)
+            if es_field is None:
+                es_field = sys.intern(key) if isinstance(key, str) else key
+            new_cond["key"] = es_field
+            method = cond.get("method")
+            if isinstance(method, str):
+                new_cond["method"] = sys.intern(method)
             return new_cond
 
         def _transform_group(group_dict: dict) -> dict:
@@ -112,10 +140,28 @@ class FieldMapper:
         Returns:
             转换后的排序字段列表
         """
+        key = tuple(ordering)
+        cache = self._ordering_cache
+        cached = cache.get(key)
+        if cached is not None:
+            # 多线程共享映射器时，键可能已被其他线程淘汰，此时忽略
+            try:
+                cache.move_to_end(key)
+            except KeyError:
+                pass
+            return list(cached)
+
         result = []
         for field in ordering:
             if field.startswith("-"):
                 result.append("-" + self.get_es_field(field[1:], for_agg=True))
             else:
                 result.append(self.get_es_field(field, for_agg=True))
+
+        cache[key] = tuple(result)
+        if len(cache) > _ORDERING_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                pass
         return result
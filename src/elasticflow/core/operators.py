@@ -33,3 +33,33 @@ class QueryStringOperator(str, Enum):
     BETWEEN = "between"
     REG = "reg"  # 正则
     NREG = "nreg"
+
+
+# 按值的处理方式对操作符分类，使用 frozenset 判断归属，
+# 比逐个与元组中的成员比较字符串更快
+
+# 不需要值的操作符
+NO_VALUE_OPERATORS = frozenset(
+    (QueryStringOperator.EXISTS, QueryStringOperator.NOT_EXISTS)
+)
+
+# 范围操作符，只使用第一个值
+RANGE_OPERATORS = frozenset(
+    (
+        QueryStringOperator.GT,
+        QueryStringOperator.LT,
+        QueryStringOperator.GTE,
+        QueryStringOperator.LTE,
+    )
+)
+
+# 模糊匹配操作符: 去除通配符后转义，再以通配符包裹
+INCLUDE_OPERATORS = frozenset(
+    (QueryStringOperator.INCLUDE, QueryStringOperator.NOT_INCLUDE)
+)
+
+# 精确匹配操作符: 加双引号，只需转义双引号
+EQUAL_OPERATORS = frozenset((QueryStringOperator.EQUAL, QueryStringOperator.NOT_EQUAL))
+
+# 正则表达式操作符: 值原样使用，不转义
+REGEX_OPERATORS = frozenset((QueryStringOperator.REG, QueryStringOperator.NREG))
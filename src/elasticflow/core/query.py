@@ -4,10 +4,17 @@ Q 对象模块
 提供类似 Django ORM Q 对象的灵活查询组合能力。
 """
 
+from collections.abc import Callable
 from typing import Any
 
-from elasticflow.core.operators import QueryStringOperator
-from elasticflow.core.utils import escape_query_string
+from elasticflow.core.operators import (
+    EQUAL_OPERATORS,
+    INCLUDE_OPERATORS,
+    NO_VALUE_OPERATORS,
+    REGEX_OPERATORS,
+    QueryStringOperator,
+)
+from elasticflow.core.utils import escape_query_value
 from elasticflow.exceptions import UnsupportedOperatorError
 
 
@@ -33,20 +40,22 @@ OPERATOR_LOOKUP = {
     "not_regex": QueryStringOperator.NREG,
 }
 
-# Query String 操作符模板
-OPERATOR_TEMPLATES = {
-    QueryStringOperator.EXISTS: "{field}: *",
-    QueryStringOperator.NOT_EXISTS: "NOT {field}: *",
-    QueryStringOperator.EQUAL: '{field}: "{value}"',
-    QueryStringOperator.NOT_EQUAL: 'NOT {field}: "{value}"',
-    QueryStringOperator.INCLUDE: "{field}: *{value}*",
-    QueryStringOperator.NOT_INCLUDE: "NOT {field}: *{value}*",
-    QueryStringOperator.GT: "{field}: >{value}",
-    QueryStringOperator.LT: "{field}: <{value}",
-    QueryStringOperator.GTE: "{field}: >={value}",
-    QueryStringOperator.LTE: "{field}: <={value}",
-    QueryStringOperator.REG: "{field}: /{value}/",
-    QueryStringOperator.NREG: "NOT {field}: /{value}/",
+# Query String 操作符渲染函数: (字段名, 转义后的值) -> 查询语句
+# 使用 f-string 直接拼接，避免每次调用 str.format 重新解析模板；
+# EXISTS / NOT_EXISTS 忽略值
+OPERATOR_RENDERERS: dict[QueryStringOperator, Callable[[str, str], str]] = {
+    QueryStringOperator.EXISTS: lambda field, value: f"{field}: *",
+    QueryStringOperator.NOT_EXISTS: lambda field, value: f"NOT {field}: *",
+    QueryStringOperator.EQUAL: lambda field, value: f'{field}: "{value}"',
+    QueryStringOperator.NOT_EQUAL: lambda field, value: f'NOT {field}: "{value}"',
+    QueryStringOperator.INCLUDE: lambda field, value: f"{field}: *{value}*",
+    QueryStringOperator.NOT_INCLUDE: lambda field, value: f"NOT {field}: *{value}*",
+    QueryStringOperator.GT: lambda field, value: f"{field}: >{value}",
+    QueryStringOperator.LT: lambda field, value: f"{field}: <{value}",
+    QueryStringOperator.GTE: lambda field, value: f"{field}: >={value}",
+    QueryStringOperator.LTE: lambda field, value: f"{field}: <={value}",
+    QueryStringOperator.REG: lambda field, value: f"{field}: /{value}/",
+    QueryStringOperator.NREG: lambda field, value: f"NOT {field}: /{value}/",
 }
 
 
@@ -287,13 +296,13 @@ class Q:
         operator = condition["operator"]
         raw_value = condition["value"]
 
-        template = OPERATOR_TEMPLATES.get(operator)
-        if not template:
+        render = OPERATOR_RENDERERS.get(operator)
+        if render is None:
             raise UnsupportedOperatorError(f"Unsupported operator: {operator}")
 
         # 处理 EXISTS/NOT_EXISTS 操作符（不需要值）
-        if operator in (QueryStringOperator.EXISTS, QueryStringOperator.NOT_EXISTS):
-            return template.format(field=field)
+        if operator in NO_VALUE_OPERATORS:
+            return render(field, "")
 
         # 其他操作符需要有效值
         if raw_value is None:
@@ -303,23 +312,24 @@ class Q:
         if value == "":
             return ""
 
-        if operator in (QueryStringOperator.INCLUDE, QueryStringOperator.NOT_INCLUDE):
+        if operator in INCLUDE_OPERATORS:
             # 去除前后的通配符
-            value = value.strip("*")
+            if value[0] == "*" or value[-1] == "*":
+                value = value.strip("*")
             if value == "":
                 return ""
-            escaped_value = escape_query_string(value)
-        elif operator in (QueryStringOperator.EQUAL, QueryStringOperator.NOT_EQUAL):
-            # 精确匹配，只转义双引号
-            escaped_value = value.replace('"', '\\"')
-        elif operator in (QueryStringOperator.REG, QueryStringOperator.NREG):
+            escaped_value = escape_query_value(value)
+        elif operator in EQUAL_OPERATORS:
+            # 精确匹配，只转义双引号（大多数值不含双引号，无需替换）
+            escaped_value = value.replace('"', '\\"') if '"' in value else value
+        elif operator in REGEX_OPERATORS:
             # 正则表达式，不转义
             escaped_value = value
         else:
             # 其他操作符，使用通用转义
-            escaped_value = escape_query_string(value)
+            escaped_value = escape_query_value(value)
 
-        return template.format(field=field, value=escaped_value)
+        return render(field, escaped_value)
 
     def is_empty(self) -> bool:
         """检查 Q 对象是否为空."""
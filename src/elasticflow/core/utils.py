@@ -5,8 +5,65 @@ elasticflow 工具函数模块
 """
 
 import re
+from functools import lru_cache
 from typing import overload
 
+# Query String 中需要转义的特殊字符：+ - = & | > < ! ( ) { } [ ] ^ " ~ * ? : \ / 空格
+_SPECIAL_CHARS = '+-=&|><!(){}[]^"~*?\\:/ '
+# 特殊字符 -> 转义形式，str.translate 在 C 层一次完成替换
+_ESCAPE_TABLE = str.maketrans({c: f"\\{c}" for c in _SPECIAL_CHARS})
+# 匹配任一特殊字符，不含特殊字符的字符串（常见情况）无需转义，原样返回
+_SPECIAL_CHAR_PATTERN = re.compile(f"[{re.escape(_SPECIAL_CHARS)}]")
+# 匹配已经转义的特殊字符，用于避免双重转义
+_ESCAPED_SPECIAL_CHARS = re.compile(r'\\([+\-=&|><!(){}[\]^"~*?\\:\/ ])')
+
+# 转义结果缓存：业务中相同的值（状态码、级别、租户 ID 等）会被反复转义；
+# 只缓存较短的字符串，避免大文本长期占用内存
+_ESCAPE_CACHE_SIZE = 4096
+_ESCAPE_CACHE_MAX_LEN = 256
+
+
+def escape_query_value(value: str) -> str:
+    """
+    转义单个字符串值中的特殊字符.
+
+    与 escape_query_string 结果相同，但只接受 str，省去类型与 many 判断，
+    供构建器在逐值转义的热路径上直接调用（配合 map 使用）。
+
+    Args:
+        value: 待转义的字符串
+
+    Returns:
+        转义后的字符串
+    """
+    # 不含特殊字符时无需转义，避免分配新字符串
+    if _SPECIAL_CHAR_PATTERN.search(value) is None:
+        return value
+
+    if len(value) < _ESCAPE_CACHE_MAX_LEN:
+        return _escape_special_cached(value)
+    return _escape_special(value)
+
+
+def _escape_one(s: str | None) -> str | None:
+    """转义单个字符串中的特殊字符，非字符串原样返回."""
+    if not isinstance(s, str):
+        return s
+    return escape_query_value(s)
+
+
+def _escape_special(s: str) -> str:
+    """转义包含特殊字符的字符串."""
+    # 避免双重转义：先移除已有的转义（不含反斜杠时无需处理）
+    if "\\" in s:
+        s = _ESCAPED_SPECIAL_CHARS.sub(r"\1", s)
+
+    # 对所有特殊字符进行转义
+    return s.translate(_ESCAPE_TABLE)
+
+
+_escape_special_cached = lru_cache(maxsize=_ESCAPE_CACHE_SIZE)(_escape_special)
+
 
 @overload
 def escape_query_string(query_string: str, many: bool = False) -> str: ...
@@ -47,23 +104,6 @@ def escape_query_string(
     if many is True and not isinstance(query_string, list):
         query_string = [query_string]
 
-    # 匹配需要转义的特殊字符：+ - = & | > < ! ( ) { } [ ] ^ " ~ * ? : \ / 空格
-    regex = r'([+\-=&|><!(){}[\]^"~*?\\:\/ ])'
-    special_chars = re.compile(regex)
-    # 匹配已经转义的字符，用于避免双重转义
-    escaped_special_chars = re.compile(rf"\\({regex})")
-
-    def escape_char(s: str | None) -> str | None:
-        """转义单个字符串中的特殊字符"""
-        if not isinstance(s, str):
-            return s
-
-        # 避免双重转义：先移除已有的转义
-        s = escaped_special_chars.sub(r"\1", s)
-
-        # 对所有特殊字符进行转义
-        return special_chars.sub(r"\\\1", str(s))
-
     if not many:
-        return escape_char(query_string)  # type: ignore
-    return [escape_char(value) for value in query_string]  # type: ignore
+        return _escape_one(query_string)  # type: ignore
+    return [_escape_one(value) for value in query_string]  # type: ignore
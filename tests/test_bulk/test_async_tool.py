@@ -0,0 +1,320 @@
+"""批量操作异步工具单元测试."""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from elastic_transport import ApiResponseMeta, HttpHeaders
+from elasticsearch import ApiError, AsyncElasticsearch
+from elasticflow.bulk import (
+    AsyncBulkOperationTool,
+    BulkAction,
+    BulkOperation,
+    BulkResult,
+)
+from elasticflow.bulk.exceptions import BulkProcessingError
+
+
+def _response(action, status=201):
+    """构造单条动作的响应."""
+    item = {"_index": action["_index"], "_id": action.get("_id"), "status": status}
+    if status >= 300:
+        item["error"] = {"type": "mapper_parsing_exception", "reason": "bad"}
+    return status < 300, {action["_op_type"]: item}
+
+
+async def _fake_async_streaming_bulk(client, actions, chunk_size, **kwargs):
+    """按 chunk_size 逐块读取动作并返回响应，_id 为 "bad" 的动作失败."""
+    if hasattr(actions, "__aiter__"):
+        actions = [action async for action in actions]
+    chunk = []
+    for action in actions:
+        chunk.append(action)
+        if len(chunk) >= chunk_size:
+            for action in chunk:
+                yield _response(action, 400 if action.get("_id") == "bad" else 201)
+            chunk = []
+    for action in chunk:
+        yield _response(action, 400 if action.get("_id") == "bad" else 201)
+
+
+class TestAsyncBulkOperationTool(unittest.TestCase):
+    """AsyncBulkOperationTool 类单元测试."""
+
+    def setUp(self):
+        """设置测试环境."""
+        self.es_client = MagicMock(spec=AsyncElasticsearch)
+        self.bulk_tool = AsyncBulkOperationTool(
+            self.es_client, batch_size=100, max_retries=2, retry_delay=0
+        )
+
+    def test_initialization(self):
+        """测试初始化."""
+        tool = AsyncBulkOperationTool(self.es_client)
+        self.assertEqual(tool.batch_size, 500)
+        self.assertEqual(tool.concurrency, 4)
+
+    def test_bulk_index_runs_batches_concurrently(self):
+        """测试批次在 concurrency 限制内并发执行."""
+        documents = [{"id": str(i)} for i in range(250)]
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_bulk(client, actions, chunk_size, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            for action in actions:
+                yield _response(action)
+
+        tool = AsyncBulkOperationTool(self.es_client, batch_size=50, concurrency=2)
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk", side_effect=fake_bulk
+        ):
+            result = asyncio.run(tool.bulk_index("test", documents, doc_id_field="id"))
+
+        self.assertEqual(result.total, 250)
+        self.assertEqual(result.success, 250)
+        self.assertEqual(result.batch_count, 5)
+        self.assertEqual(max_in_flight, 2)
+
+    def test_execute_actions_pulls_batches_lazily(self):
+        """测试批次按需从迭代器中取出，而不是一次性全部生成."""
+        consumed = 0
+        consumed_at_first_request = []
+
+        def generate_actions():
+            nonlocal consumed
+            for i in range(100):
+                consumed += 1
+                yield {"_op_type": "index", "_index": "test", "_id": str(i)}
+
+        async def fake_bulk(client, actions, chunk_size, **kwargs):
+            consumed_at_first_request.append(consumed)
+            await asyncio.sleep(0)
+            for action in actions:
+                yield _response(action)
+
+        tool = AsyncBulkOperationTool(self.es_client, batch_size=10, concurrency=2)
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk", side_effect=fake_bulk
+        ):
+            result = asyncio.run(
+                tool._execute_actions(generate_actions(), BulkResult(total=100))
+            )
+
+        self.assertLessEqual(consumed_at_first_request[0], 30)
+        self.assertEqual(result.success, 100)
+        self.assertEqual(result.batch_count, 10)
+
+    def test_bulk_execute_retries_conflicts(self):
+        """测试版本冲突的操作按位置重试."""
+        operations = [
+            BulkOperation(
+                action=BulkAction.UPDATE,
+                index_name="test",
+                doc_id=str(i),
+                source={"n": i},
+            )
+            for i in range(3)
+        ]
+        calls = []
+
+        async def fake_bulk(client, actions, chunk_size, **kwargs):
+            calls.append([action["_id"] for action in actions])
+            for action in actions:
+                conflict = len(calls) == 1 and action["_id"] == "1"
+                yield _response(action, 409 if conflict else 200)
+
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk", side_effect=fake_bulk
+        ):
+            result = asyncio.run(self.bulk_tool.bulk_execute(operations))
+
+        self.assertEqual(calls, [["0", "1", "2"], ["1"]])
+        self.assertEqual(result.success, 3)
+        self.assertEqual(result.failed, 0)
+
+    def test_bulk_execute_retries_request_level_503_after_retry_after(self):
+        """测试整个请求返回 503 时重试，并按 Retry-After 响应头等待."""
+        meta = ApiResponseMeta(
+            status=503,
+            http_version="1.1",
+            headers=HttpHeaders({"Retry-After": "4"}),
+            duration=0.0,
+            node=None,
+        )
+        unavailable = ApiError("unavailable", meta=meta, body={})
+        operations = [
+            BulkOperation(action=BulkAction.DELETE, index_name="test", doc_id="1")
+        ]
+        calls = 0
+
+        async def fake_bulk(client, actions, chunk_size, **kwargs):
+            nonlocal calls
+            calls += 1
+            for action in actions:
+                if calls == 1:
+                    ok, info = _response(action, 503)
+                    info[action["_op_type"]]["exception"] = unavailable
+                    yield ok, info
+                else:
+                    yield _response(action, 200)
+
+        with (
+            patch(
+                "elasticflow.bulk.async_tool.async_streaming_bulk",
+                side_effect=fake_bulk,
+            ),
+            patch(
+                "elasticflow.bulk.async_tool.asyncio.sleep", new=AsyncMock()
+            ) as mock_sleep,
+        ):
+            result = asyncio.run(self.bulk_tool.bulk_execute(operations))
+
+        mock_sleep.assert_awaited_once_with(4.0)
+        self.assertEqual(calls, 2)
+        self.assertEqual(result.success, 1)
+
+    def test_bulk_delete_marks_failed_batch(self):
+        """测试批次重试耗尽后整个批次被标记为失败."""
+
+        async def fake_bulk(client, actions, chunk_size, **kwargs):
+            raise ConnectionError("down")
+            yield  # pragma: no cover
+
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk", side_effect=fake_bulk
+        ):
+            result = asyncio.run(self.bulk_tool.bulk_delete("test", ["1", "2"]))
+
+        self.assertEqual(result.failed, 2)
+        self.assertEqual(result.deleted, 0)
+        self.assertEqual(result.errors[0].error_type, "BatchProcessingError")
+        self.assertEqual(result.errors[0].operation, BulkAction.DELETE)
+
+    def test_circuit_breaker_opens_on_request_level_5xx(self):
+        """测试集群对每个请求都返回 503 时熔断器打开，后续批次不再发送请求."""
+        calls = 0
+
+        async def fake_bulk(client, actions, chunk_size, **kwargs):
+            nonlocal calls
+            calls += 1
+            for action in actions:
+                ok, info = _response(action, 503)
+                info[action["_op_type"]]["exception"] = RuntimeError("unavailable")
+                yield ok, info
+
+        tool = AsyncBulkOperationTool(
+            self.es_client,
+            batch_size=1,
+            max_retries=0,
+            concurrency=1,
+            breaker_threshold=2,
+        )
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk", side_effect=fake_bulk
+        ):
+            result = asyncio.run(tool.bulk_delete("test", ["1", "2", "3"]))
+
+        self.assertEqual(calls, 2)
+        self.assertEqual(result.failed, 3)
+
+    def test_bulk_stream_accepts_async_iterable(self):
+        """测试流式处理接受异步迭代器并按批次回调进度."""
+        progress = []
+
+        async def generate_operations():
+            for i in range(150):
+                yield BulkOperation(
+                    action=BulkAction.INDEX,
+                    index_name="test",
+                    doc_id="bad" if i == 120 else str(i),
+                    source={"n": i},
+                )
+
+        def callback(current, total, batch_result):
+            progress.append((current, batch_result.failed))
+
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk",
+            side_effect=_fake_async_streaming_bulk,
+        ):
+            result = asyncio.run(
+                self.bulk_tool.bulk_stream(generate_operations(), callback)
+            )
+
+        self.assertEqual(result.total, 150)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(result.batch_count, 2)
+        self.assertEqual(progress, [(100, 0), (150, 1)])
+
+    def test_bulk_stream_survives_connection_error(self):
+        """测试流式处理中途遇到连接异常时重试该批次，后续批次继续处理."""
+        operations = (
+            BulkOperation(action=BulkAction.DELETE, index_name="test", doc_id=str(i))
+            for i in range(250)
+        )
+        calls = 0
+
+        async def flaky_bulk(client, actions, chunk_size, **kwargs):
+            nonlocal calls
+            calls += 1
+            # 第二个批次的第一次请求连接失败
+            if calls == 2:
+                raise ConnectionError("connection reset")
+            for action in actions:
+                yield _response(action, 200)
+
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk", side_effect=flaky_bulk
+        ):
+            result = asyncio.run(self.bulk_tool.bulk_stream(operations))
+
+        self.assertEqual(calls, 4)
+        self.assertEqual(result.success, 250)
+        self.assertEqual(result.batch_count, 3)
+
+    def test_bulk_stream_stops_when_breaker_opens(self):
+        """测试集群持续返回 503 时熔断器打开，流式处理终止."""
+        calls = 0
+
+        async def generate_operations():
+            for i in range(10000):
+                yield BulkOperation(
+                    action=BulkAction.DELETE, index_name="test", doc_id=str(i)
+                )
+
+        async def fake_bulk(client, actions, chunk_size, **kwargs):
+            nonlocal calls
+            calls += 1
+            for action in actions:
+                ok, info = _response(action, 503)
+                info[action["_op_type"]]["exception"] = RuntimeError("unavailable")
+                yield ok, info
+
+        tool = AsyncBulkOperationTool(
+            self.es_client, batch_size=100, max_retries=0, breaker_threshold=2
+        )
+        with patch(
+            "elasticflow.bulk.async_tool.async_streaming_bulk", side_effect=fake_bulk
+        ):
+            with self.assertRaises(BulkProcessingError):
+                asyncio.run(tool.bulk_stream(generate_operations()))
+
+        self.assertEqual(calls, 2)
+
+    def test_bulk_stream_raises_on_exception(self):
+        """测试操作项迭代器抛出异常时抛出 BulkProcessingError."""
+
+        def generate_operations():
+            yield BulkOperation(action=BulkAction.DELETE, index_name="test", doc_id="1")
+            raise ValueError("broken source")
+
+        with self.assertRaises(BulkProcessingError):
+            asyncio.run(self.bulk_tool.bulk_stream(generate_operations()))
+
+
+if __name__ == "__main__":
+    unittest.main()
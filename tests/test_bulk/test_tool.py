@@ -1,17 +1,56 @@
 """批量操作工具单元测试."""
 
+import json
 import unittest
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
-from elasticsearch import Elasticsearch
+from elastic_transport import ApiResponseMeta, HttpHeaders
+from elasticsearch import ApiError, Elasticsearch
 from elasticflow.bulk import (
     BulkAction,
     BulkOperation,
     BulkOperationTool,
     BulkResult,
+    OperationPool,
+    TokenBucket,
 )
+from elasticflow.bulk import tool as tool_module
 from elasticflow.bulk.exceptions import BulkProcessingError
 
 
+def _api_error(status, headers=None):
+    """构造带有响应状态码与响应头的 ApiError."""
+    meta = ApiResponseMeta(
+        status=status,
+        http_version="1.1",
+        headers=HttpHeaders(headers or {}),
+        duration=0.0,
+        node=None,
+    )
+    return ApiError(f"status {status}", meta=meta, body={})
+
+
+def _request_error_items(actions, exc):
+    """模拟 helpers 以 raise_on_exception=False 发送时，整个请求失败的响应项."""
+    return [
+        (
+            False,
+            {
+                action["_op_type"]: {
+                    "_index": action["_index"],
+                    "_id": action["_id"],
+                    "error": str(exc),
+                    "status": exc.status_code,
+                    "exception": exc,
+                }
+            },
+        )
+        for action in actions
+    ]
+
+
 class TestBulkOperationTool(unittest.TestCase):
     """BulkOperationTool 类单元测试."""
 
@@ -89,11 +128,40 @@ class TestBulkOperationTool(unittest.TestCase):
         self.assertEqual(action["_index"], "test-index")
         self.assertEqual(action["_id"], "1")
 
+    def test_prepare_bulk_action_upsert(self):
+        """测试准备 UPSERT 操作，底层使用 UPDATE 并启用 doc_as_upsert."""
+        operation = BulkOperation(
+            action=BulkAction.UPSERT,
+            index_name="test-index",
+            doc_id="1",
+            source={"name": "test"},
+        )
+
+        action = self.bulk_tool._prepare_bulk_action(operation)
+
+        self.assertEqual(
+            action,
+            {
+                "_op_type": "update",
+                "_index": "test-index",
+                "_id": "1",
+                "doc": {"name": "test"},
+                "doc_as_upsert": True,
+            },
+        )
+
+    def test_prepare_bulk_action_missing_source(self):
+        """测试 INDEX / CREATE 操作缺少 source 时抛出异常."""
+        operation = BulkOperation(action=BulkAction.CREATE, index_name="test-index")
+
+        with self.assertRaises(BulkProcessingError):
+            self.bulk_tool._prepare_bulk_action(operation)
+
     def test_bulk_index(self):
         """测试批量索引."""
         documents = [{"id": "1", "name": "Alice"}, {"id": "2", "name": "Bob"}]
 
-        with patch.object(self.bulk_tool, "_execute_bulk_operations") as mock_execute:
+        with patch.object(self.bulk_tool, "_execute_actions") as mock_execute:
             mock_execute.return_value = BulkResult(total=2, success=2, failed=0)
 
             result = self.bulk_tool.bulk_index("users", documents, doc_id_field="id")
@@ -101,6 +169,49 @@ class TestBulkOperationTool(unittest.TestCase):
             self.assertEqual(result.success, 2)
             self.assertEqual(result.failed, 0)
             mock_execute.assert_called_once()
+            # 文档直接转换为动作，不经过 BulkOperation
+            actions = list(mock_execute.call_args.args[0])
+            self.assertEqual(
+                actions[0],
+                {
+                    "_op_type": "index",
+                    "_index": "users",
+                    "_id": "1",
+                    "_source": {"id": "1", "name": "Alice"},
+                },
+            )
+
+    def test_document_actions(self):
+        """测试文档转换为动作，按是否提取ID与路由分别处理."""
+        documents = [{"id": "1", "org": "a"}, {"name": "no-id"}]
+
+        def actions(**fields):
+            return list(
+                self.bulk_tool._document_actions(
+                    "create",
+                    "users",
+                    documents,
+                    fields.get("doc_id_field"),
+                    fields.get("routing_field"),
+                )
+            )
+
+        self.assertEqual(
+            actions(),
+            [
+                {"_op_type": "create", "_index": "users", "_source": documents[0]},
+                {"_op_type": "create", "_index": "users", "_source": documents[1]},
+            ],
+        )
+        self.assertEqual(
+            [a.get("_id") for a in actions(doc_id_field="id")], ["1", None]
+        )
+        with_routing = actions(doc_id_field="id", routing_field="org")
+        self.assertEqual([a.get("_routing") for a in with_routing], ["a", None])
+        self.assertEqual([a.get("_id") for a in with_routing], ["1", None])
+        routing_only = actions(routing_field="org")
+        self.assertEqual([a.get("_routing") for a in routing_only], ["a", None])
+        self.assertTrue(all("_id" not in a for a in routing_only))
 
     def test_bulk_update(self):
         """测试批量更新."""
@@ -109,7 +220,7 @@ class TestBulkOperationTool(unittest.TestCase):
             {"id": "2", "name": "Bob Johnson"},
         ]
 
-        with patch.object(self.bulk_tool, "_execute_bulk_operations") as mock_execute:
+        with patch.object(self.bulk_tool, "_execute_actions") as mock_execute:
             mock_execute.return_value = BulkResult(total=2, success=2, failed=0)
 
             result = self.bulk_tool.bulk_update("users", updates)
@@ -129,7 +240,7 @@ class TestBulkOperationTool(unittest.TestCase):
         """测试批量删除."""
         doc_ids = ["1", "2", "3"]
 
-        with patch.object(self.bulk_tool, "_execute_bulk_operations") as mock_execute:
+        with patch.object(self.bulk_tool, "_execute_actions") as mock_execute:
             mock_execute.return_value = BulkResult(total=3, success=3, failed=0)
 
             result = self.bulk_tool.bulk_delete("users", doc_ids)
@@ -138,6 +249,427 @@ class TestBulkOperationTool(unittest.TestCase):
             self.assertEqual(result.deleted, 3)
             self.assertEqual(result.failed, 0)
 
+    def test_execute_bulk_with_retry_uses_parallel_bulk(self):
+        """测试批次被均分为 thread_count 个请求并发发送，失败项展开为扁平结构."""
+        actions = [
+            {"_op_type": "index", "_index": "test-index", "_id": str(i)}
+            for i in range(10)
+        ]
+        responses = [
+            (True, {"index": {"_index": "test-index", "_id": str(i), "status": 201}})
+            for i in range(9)
+        ]
+        responses.append(
+            (
+                False,
+                {
+                    "index": {
+                        "_index": "test-index",
+                        "_id": "9",
+                        "status": 400,
+                        "error": {"type": "mapper_parsing_exception"},
+                    }
+                },
+            )
+        )
+
+        with patch(
+            "elasticflow.bulk.tool.parallel_bulk", return_value=iter(responses)
+        ) as mock_parallel_bulk:
+            success, failed, errors, successes = (
+                self.bulk_tool._execute_bulk_with_retry(actions)
+            )
+
+        self.assertEqual((success, failed), (9, 1))
+        self.assertEqual(len(successes), 9)
+        self.assertEqual(errors[0]["op_type"], "index")
+        self.assertEqual(errors[0]["_id"], "9")
+        self.assertEqual(errors[0]["status"], 400)
+        kwargs = mock_parallel_bulk.call_args.kwargs
+        self.assertEqual(kwargs["thread_count"], 4)
+        self.assertEqual(kwargs["chunk_size"], 3)
+
+    def test_execute_bulk_with_retry_retries_conflicts_by_position(self):
+        """测试只按位置重试版本冲突的操作，首次成功的结果保留."""
+        actions = [
+            {"_op_type": "update", "_index": "test-index", "_id": str(i)}
+            for i in range(3)
+        ]
+        first_attempt = [
+            (True, {"update": {"_index": "test-index", "_id": "0", "status": 200}}),
+            (False, {"update": {"_index": "test-index", "_id": "1", "status": 409}}),
+            (False, {"update": {"_index": "test-index", "_id": "2", "status": 400}}),
+        ]
+        second_attempt = [
+            (True, {"update": {"_index": "test-index", "_id": "1", "status": 200}}),
+        ]
+
+        with (
+            patch(
+                "elasticflow.bulk.tool.parallel_bulk",
+                side_effect=[iter(first_attempt), iter(second_attempt)],
+            ) as mock_parallel_bulk,
+            patch("elasticflow.bulk.tool.time.sleep"),
+        ):
+            success, failed, errors, successes = (
+                self.bulk_tool._execute_bulk_with_retry(actions)
+            )
+
+        self.assertEqual((success, failed), (2, 1))
+        self.assertEqual([e["_id"] for e in errors], ["2"])
+        self.assertEqual(mock_parallel_bulk.call_args_list[1].args[1], [actions[1]])
+
+    def test_execute_bulk_with_retry_throttles_rejected_requests(self):
+        """测试被拒绝（429）的操作会重试，并使令牌桶降低发送速率."""
+        bucket = TokenBucket(capacity=10, refill_rate=8.0)
+        tool = BulkOperationTool(self.es_client, retry_delay=0, rate_limiter=bucket)
+        actions = [
+            {"_op_type": "index", "_index": "test-index", "_id": str(i)}
+            for i in range(2)
+        ]
+        first_attempt = [
+            (True, {"index": {"_index": "test-index", "_id": "0", "status": 201}}),
+            (False, {"index": {"_index": "test-index", "_id": "1", "status": 429}}),
+        ]
+        second_attempt = [
+            (True, {"index": {"_index": "test-index", "_id": "1", "status": 201}}),
+        ]
+
+        with (
+            patch(
+                "elasticflow.bulk.tool.parallel_bulk",
+                side_effect=[iter(first_attempt), iter(second_attempt)],
+            ) as mock_parallel_bulk,
+            # 固定时钟，令牌数不受测试运行耗时影响
+            patch("elasticflow.bulk.models.time.monotonic", return_value=bucket._last),
+        ):
+            success, failed, _, _ = tool._execute_bulk_with_retry(actions)
+
+        self.assertEqual((success, failed), (2, 0))
+        self.assertEqual(mock_parallel_bulk.call_args_list[1].args[1], [actions[1]])
+        self.assertEqual(bucket.refill_rate, 4.0)
+        self.assertEqual(bucket.tokens, 8)
+
+    def test_raw_bulk_index_builds_ndjson(self):
+        """测试预序列化写入按批次生成 NDJSON 请求体，并解析失败项."""
+        documents = [{"id": f'"{i}', "n": i} for i in range(150)]
+        documents.append({"n": "no-id"})
+        self.es_client.bulk.side_effect = [
+            {"errors": False, "items": []},
+            {
+                "errors": True,
+                "items": [
+                    {"index": {"_id": '"100', "status": 201}},
+                    {
+                        "index": {
+                            "_index": "test-index",
+                            "_id": '"101',
+                            "status": 400,
+                            "error": {"type": "mapper_parsing_exception"},
+                        }
+                    },
+                ],
+            },
+        ]
+
+        result = self.bulk_tool.raw_bulk_index("test-index", documents, "id")
+
+        self.assertEqual(self.es_client.bulk.call_count, 2)
+        first_call = self.es_client.bulk.call_args_list[0].kwargs
+        self.assertEqual(first_call["index"], "test-index")
+        lines = first_call["body"].decode().splitlines()
+        self.assertEqual(len(lines), 200)
+        self.assertEqual(json.loads(lines[0]), {"index": {"_id": '"0'}})
+        self.assertEqual(json.loads(lines[1]), documents[0])
+        last_lines = self.es_client.bulk.call_args_list[1].kwargs["body"].splitlines()
+        self.assertEqual(json.loads(last_lines[-2]), {"index": {}})
+
+        self.assertEqual(result.total, 151)
+        self.assertEqual(result.success, 150)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(result.batch_count, 2)
+        self.assertEqual(result.errors[0].doc_id, '"101')
+
+    def test_raw_bulk_index_serializes_like_client(self):
+        """测试预序列化写入与客户端序列化器生成相同的日期、UUID 与 Decimal."""
+        doc = {
+            "at": datetime(2024, 1, 1, 8, 30),
+            "day": date(2024, 1, 1),
+            "uid": uuid.UUID(int=1),
+            "price": Decimal("1.5"),
+        }
+        expected = {
+            "at": "2024-01-01T08:30:00",
+            "day": "2024-01-01",
+            "uid": "00000000-0000-0000-0000-000000000001",
+            "price": 1.5,
+        }
+        self.es_client.bulk.return_value = {"errors": False, "items": []}
+
+        for orjson_module in (tool_module.orjson, None):
+            with patch("elasticflow.bulk.tool.orjson", orjson_module):
+                self.bulk_tool.raw_bulk_index("test-index", [doc])
+            body = self.es_client.bulk.call_args.kwargs["body"]
+            self.assertEqual(json.loads(body.splitlines()[1]), expected)
+
+    def test_tune_index_for_bulk_restores_settings(self):
+        """测试批量写入期间关闭刷新与副本，退出（包括异常）时恢复原设置."""
+        self.es_client.indices = MagicMock()
+        self.es_client.indices.get_settings.return_value = {
+            "users": {"settings": {"index": {"number_of_replicas": "2"}}}
+        }
+
+        with self.assertRaises(RuntimeError):
+            with self.bulk_tool.tune_index_for_bulk("users"):
+                self.es_client.indices.put_settings.assert_called_once_with(
+                    index="users",
+                    body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+                )
+                raise RuntimeError("boom")
+
+        self.es_client.indices.put_settings.assert_called_with(
+            index="users",
+            body={"index": {"refresh_interval": None, "number_of_replicas": "2"}},
+        )
+        self.es_client.indices.refresh.assert_called_once_with(index="users")
+
+    def test_tune_index_for_bulk_restores_remaining_indices_on_failure(self):
+        """测试某个索引恢复失败时仍恢复其余索引并刷新，且抛出写入时的原始异常."""
+        self.es_client.indices = MagicMock()
+        self.es_client.indices.get_settings.return_value = {
+            "logs-1": {"settings": {"index": {"number_of_replicas": "1"}}},
+            "logs-2": {"settings": {"index": {"number_of_replicas": "1"}}},
+        }
+        self.es_client.indices.put_settings.side_effect = [
+            None,
+            ConnectionError("restore failed"),
+            None,
+        ]
+
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            with self.bulk_tool.tune_index_for_bulk("logs-*"):
+                raise RuntimeError("boom")
+
+        restored = [
+            call.kwargs["index"]
+            for call in self.es_client.indices.put_settings.call_args_list[1:]
+        ]
+        self.assertEqual(restored, ["logs-1", "logs-2"])
+        self.es_client.indices.refresh.assert_called_once_with(index="logs-*")
+
+    def test_tune_index_for_bulk_raises_restore_failure(self):
+        """测试写入成功但恢复失败时抛出恢复失败的异常."""
+        self.es_client.indices = MagicMock()
+        self.es_client.indices.get_settings.return_value = {
+            "users": {"settings": {"index": {}}}
+        }
+        self.es_client.indices.put_settings.side_effect = [
+            None,
+            ConnectionError("restore failed"),
+        ]
+
+        with self.assertRaisesRegex(ConnectionError, "restore failed"):
+            with self.bulk_tool.tune_index_for_bulk("users"):
+                pass
+
+        self.es_client.indices.refresh.assert_called_once_with(index="users")
+
+    def test_circuit_breaker_fails_fast_after_consecutive_errors(self):
+        """测试连续请求异常达到阈值后熔断，后续批次直接失败而不发送请求."""
+        tool = BulkOperationTool(
+            self.es_client, batch_size=10, max_retries=0, breaker_threshold=2
+        )
+        documents = [{"id": str(i)} for i in range(30)]
+
+        with patch(
+            "elasticflow.bulk.tool.parallel_bulk",
+            side_effect=ConnectionError("cluster down"),
+        ) as mock_parallel_bulk:
+            result = tool.bulk_index("test-index", documents, doc_id_field="id")
+
+        self.assertEqual(mock_parallel_bulk.call_count, 2)
+        self.assertEqual(result.failed, 30)
+        self.assertIn("熔断器已打开", result.errors[-1].error_reason)
+
+        # 熔断结束后恢复发送，成功后重置连续失败次数
+        tool._breaker_open_until = 0.0
+        responses = [
+            (True, {"index": {"_index": "test-index", "_id": "0", "status": 201}})
+        ]
+        with patch("elasticflow.bulk.tool.parallel_bulk", return_value=iter(responses)):
+            result = tool.bulk_index("test-index", documents[:1], doc_id_field="id")
+
+        self.assertEqual(result.success, 1)
+        self.assertEqual(tool._consecutive_failures, 0)
+
+    def test_rate_limiter_throttles_on_request_level_429(self):
+        """测试整个请求被拒绝（429）时令牌桶降速，包括 helpers 与直接请求两条路径."""
+        bucket = TokenBucket(refill_rate=8.0)
+        tool = BulkOperationTool(
+            self.es_client, max_retries=0, retry_delay=0, rate_limiter=bucket
+        )
+        actions = [{"_op_type": "index", "_index": "test-index", "_id": "1"}]
+
+        with patch(
+            "elasticflow.bulk.tool.parallel_bulk",
+            return_value=iter(_request_error_items(actions, _api_error(429))),
+        ):
+            tool._execute_bulk_with_retry(actions)
+        self.assertEqual(bucket.refill_rate, 4.0)
+
+        self.es_client.bulk.side_effect = _api_error(429)
+        result = tool.raw_bulk_index("test-index", [{"id": "1"}], "id")
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(bucket.refill_rate, 2.0)
+
+    def test_circuit_breaker_opens_on_request_level_5xx(self):
+        """测试集群对每个请求都返回 503 时熔断器打开，后续批次不再发送请求."""
+        tool = BulkOperationTool(
+            self.es_client, batch_size=10, max_retries=0, breaker_threshold=2
+        )
+        documents = [{"id": str(i)} for i in range(30)]
+
+        def unavailable(client, actions, **kwargs):
+            return iter(_request_error_items(list(actions), _api_error(503)))
+
+        with patch(
+            "elasticflow.bulk.tool.parallel_bulk", side_effect=unavailable
+        ) as mock_parallel_bulk:
+            result = tool.bulk_index("test-index", documents, doc_id_field="id")
+
+        self.assertEqual(mock_parallel_bulk.call_count, 2)
+        self.assertEqual(result.failed, 30)
+        self.assertIn("熔断器已打开", result.errors[-1].error_reason)
+
+    def test_circuit_breaker_ignores_document_errors(self):
+        """测试只有单条文档错误时不计入也不重置连续失败次数."""
+        tool = BulkOperationTool(self.es_client, max_retries=0)
+        tool._consecutive_failures = 3
+        actions = [{"_op_type": "index", "_index": "test-index", "_id": "1"}]
+        responses = [
+            (False, {"index": {"_index": "test-index", "_id": "1", "status": 400}})
+        ]
+
+        with patch("elasticflow.bulk.tool.parallel_bulk", return_value=iter(responses)):
+            tool._execute_bulk_with_retry(actions)
+
+        self.assertEqual(tool._consecutive_failures, 3)
+
+    def test_process_errors(self):
+        """测试解析错误响应，包括根本原因与请求异常."""
+        errors = [
+            {
+                "_index": "test-index",
+                "_id": "1",
+                "status": 400,
+                "op_type": "index",
+                "error": {
+                    "type": "mapper_parsing_exception",
+                    "reason": "failed to parse",
+                    "caused_by": {"type": "json_parse_exception", "reason": "bad"},
+                },
+            },
+            {
+                "_index": "test-index",
+                "_id": "2",
+                "status": 503,
+                "op_type": "unknown_op",
+                "error": "ConnectionError(timeout)",
+                "exception": ConnectionError("timeout"),
+            },
+        ]
+
+        items = self.bulk_tool._process_errors(errors)
+
+        self.assertEqual(items[0].error_type, "mapper_parsing_exception")
+        self.assertEqual(
+            items[0].caused_by, {"type": "json_parse_exception", "reason": "bad"}
+        )
+        self.assertEqual(items[0].caused_by_str, "json_parse_exception: bad")
+        self.assertIs(items[0].operation, BulkAction.INDEX)
+        self.assertEqual(items[1].error_type, "ConnectionError")
+        self.assertEqual(items[1].error_reason, "ConnectionError(timeout)")
+        self.assertIsNone(items[1].caused_by)
+        self.assertIsNone(items[1].caused_by_str)
+        self.assertIsNone(items[1].operation)
+
+    def test_backoff_delay_uses_full_jitter(self):
+        """测试重试等待时间在 [0, min(retry_delay * 2**attempt, max_backoff)] 内."""
+        tool = BulkOperationTool(self.es_client, retry_delay=1.0, max_backoff=5.0)
+
+        with patch("elasticflow.bulk.tool.random.uniform") as mock_uniform:
+            tool._backoff_delay(1)
+            mock_uniform.assert_called_with(0, 2.0)
+            tool._backoff_delay(10)
+            mock_uniform.assert_called_with(0, 5.0)
+
+    def test_backoff_delay_honours_retry_after(self):
+        """测试请求异常带有 Retry-After 头时，至少等待该时长."""
+        throttled = _api_error(429, {"Retry-After": "7"})
+        tool = BulkOperationTool(self.es_client, retry_delay=1.0, max_backoff=5.0)
+
+        with patch("elasticflow.bulk.tool.random.uniform", return_value=0.5):
+            self.assertEqual(tool._backoff_delay(0, throttled), 7.0)
+            self.assertEqual(tool._backoff_delay(0, ConnectionError("down")), 0.5)
+
+    def test_bulk_execute_honours_retry_after_on_request_level_429(self):
+        """测试整个请求被拒绝（429）时，重试前按 Retry-After 响应头等待."""
+        tool = BulkOperationTool(self.es_client, retry_delay=1.0, max_backoff=5.0)
+        operations = [
+            BulkOperation(
+                action=BulkAction.INDEX,
+                index_name="test-index",
+                doc_id=str(i),
+                source={"n": i},
+            )
+            for i in range(2)
+        ]
+
+        attempts = []
+
+        def respond(client, actions, **kwargs):
+            attempts.append(actions)
+            if len(attempts) == 1:
+                throttled = _api_error(429, {"Retry-After": "7"})
+                return iter(_request_error_items(actions, throttled))
+            return iter(
+                (True, {"index": {"_id": a["_id"], "status": 201}}) for a in actions
+            )
+
+        with (
+            patch("elasticflow.bulk.tool.parallel_bulk", side_effect=respond),
+            patch("elasticflow.bulk.tool.random.uniform", return_value=0.5),
+            patch("elasticflow.bulk.tool.time.sleep") as mock_sleep,
+        ):
+            result = tool.bulk_execute(operations)
+
+        mock_sleep.assert_called_once_with(7.0)
+        self.assertEqual(len(attempts[1]), 2)
+        self.assertEqual(result.success, 2)
+        self.assertEqual(result.failed, 0)
+
+    def test_iter_batches_splits_by_count(self):
+        """测试按 batch_size 分批，字节数交给 helpers 按 max_chunk_bytes 拆分."""
+        tool = BulkOperationTool(self.es_client, batch_size=2, max_chunk_bytes=10)
+        operations = [
+            BulkOperation(
+                action=BulkAction.INDEX,
+                index_name="test-index",
+                doc_id=str(i),
+                source={"text": "x" * 100},
+            )
+            for i in range(5)
+        ]
+
+        actions = map(tool._prepare_bulk_action, operations)
+        batches = list(tool._iter_batches(actions))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            [action["_id"] for batch in batches for action in batch],
+            [op.doc_id for op in operations],
+        )
+
     def test_bulk_upsert(self):
         """测试批量UPSERT."""
         documents = [{"id": "1", "name": "Alice"}, {"id": "2", "name": "Bob"}]
@@ -162,6 +694,21 @@ class TestBulkOperationTool(unittest.TestCase):
             self.assertEqual(result.updated, 1)
             mock_execute.assert_called_once()
 
+    def test_bulk_upsert_batch_failure(self):
+        """测试批次执行异常时整批标记为失败，操作类型记录为 UPSERT."""
+        documents = [{"id": "1", "name": "Alice"}, {"id": "2", "name": "Bob"}]
+
+        with patch.object(
+            self.bulk_tool,
+            "_execute_bulk_with_retry",
+            side_effect=RuntimeError("boom"),
+        ):
+            result = self.bulk_tool.bulk_upsert("users", documents)
+
+        self.assertEqual(result.failed, 2)
+        self.assertEqual([e.doc_id for e in result.errors], ["1", "2"])
+        self.assertTrue(all(e.operation is BulkAction.UPSERT for e in result.errors))
+
     def test_bulk_upsert_missing_id(self):
         """测试批量UPSERT缺少ID字段."""
         documents = [{"name": "Alice"}, {"id": "2", "name": "Bob"}]
@@ -182,30 +729,172 @@ class TestBulkOperationTool(unittest.TestCase):
             self.assertEqual(result.success, 1)
             self.assertEqual(len(result.warnings), 1)
 
+    @staticmethod
+    def _fake_bulk(client, actions, chunk_size, **kwargs):
+        """按 chunk_size 逐块读取动作并返回响应，_id 为 "bad" 的动作失败."""
+
+        def respond(chunk):
+            for action in chunk:
+                if action["_id"] == "bad":
+                    item = {
+                        "_index": action["_index"],
+                        "_id": action["_id"],
+                        "status": 400,
+                        "error": {"type": "mapper_parsing_exception"},
+                    }
+                    yield False, {"index": item}
+                else:
+                    yield True, {"index": {"_id": action["_id"], "status": 201}}
+
+        chunk = []
+        for action in actions:
+            chunk.append(action)
+            if len(chunk) >= chunk_size:
+                yield from respond(chunk)
+                chunk = []
+        yield from respond(chunk)
+
     def test_bulk_stream(self):
         """测试流式批量处理."""
         operations = [
             BulkOperation(
                 action=BulkAction.INDEX,
                 index_name="test-index",
-                doc_id=str(i),
+                doc_id="bad" if i == 150 else str(i),
                 source={"id": i},
             )
             for i in range(250)
         ]
+        progress = []
 
-        with patch.object(self.bulk_tool, "_execute_bulk_operations") as mock_execute:
-            mock_execute.return_value = BulkResult(total=100, success=100, failed=0)
-
-            def callback(current, total, result):
-                pass
+        def callback(current, total, result):
+            progress.append((current, total, result.success, result.failed))
 
+        with patch(
+            "elasticflow.bulk.tool.parallel_bulk", side_effect=self._fake_bulk
+        ) as mock_parallel_bulk:
             result = self.bulk_tool.bulk_stream(
                 iter(operations), progress_callback=callback
             )
 
-            self.assertEqual(result.success, 300)  # 3 batches
-            self.assertEqual(mock_execute.call_count, 3)
+        self.assertEqual(mock_parallel_bulk.call_count, 3)
+        self.assertEqual(result.total, 250)
+        self.assertEqual(result.success, 249)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(result.errors[0].doc_id, "bad")
+        self.assertEqual(result.batch_count, 3)
+        self.assertEqual(
+            progress, [(100, -1, 100, 0), (200, -1, 99, 1), (250, -1, 50, 0)]
+        )
+
+    def test_bulk_stream_releases_operations_to_pool(self):
+        """测试指定对象池时，操作收到响应后被归还并在后续批次复用."""
+        pool = OperationPool()
+        seen_ids = set()
+
+        def generate_operations():
+            for i in range(250):
+                operation = pool.acquire(
+                    BulkAction.INDEX, "test-index", doc_id=str(i), source={"id": i}
+                )
+                seen_ids.add(id(operation))
+                yield operation
+
+        with patch("elasticflow.bulk.tool.parallel_bulk", side_effect=self._fake_bulk):
+            result = self.bulk_tool.bulk_stream(
+                generate_operations(), operation_pool=pool
+            )
+
+        self.assertEqual(result.success, 250)
+        # 第一个批次的 100 个实例被后续批次复用
+        self.assertEqual(len(seen_ids), 100)
+        self.assertEqual(len(pool), 100)
+
+    def test_bulk_stream_survives_connection_error(self):
+        """测试流式处理中途遇到连接异常时重试该批次，后续批次继续处理."""
+        operations = (
+            BulkOperation(
+                action=BulkAction.INDEX,
+                index_name="test-index",
+                doc_id=str(i),
+                source={"id": i},
+            )
+            for i in range(250)
+        )
+        calls = 0
+
+        def flaky_bulk(client, actions, chunk_size, **kwargs):
+            nonlocal calls
+            calls += 1
+            # 第二个批次的第一次请求连接失败
+            if calls == 2:
+                raise ConnectionError("connection reset")
+            return self._fake_bulk(client, actions, chunk_size, **kwargs)
+
+        with (
+            patch("elasticflow.bulk.tool.parallel_bulk", side_effect=flaky_bulk),
+            patch("elasticflow.bulk.tool.time.sleep") as mock_sleep,
+        ):
+            result = self.bulk_tool.bulk_stream(operations)
+
+        self.assertEqual(calls, 4)
+        mock_sleep.assert_called_once()
+        self.assertEqual(result.total, 250)
+        self.assertEqual(result.success, 250)
+        self.assertEqual(result.batch_count, 3)
+
+    def test_bulk_stream_marks_exhausted_batch_failed(self):
+        """测试批次重试耗尽后只将该批次标记为失败."""
+        operations = (
+            BulkOperation(
+                action=BulkAction.DELETE, index_name="test-index", doc_id=str(i)
+            )
+            for i in range(250)
+        )
+
+        def failing_bulk(client, actions, chunk_size, **kwargs):
+            if actions[0]["_id"] == "100":
+                raise ConnectionError("connection reset")
+            return self._fake_bulk(client, actions, chunk_size, **kwargs)
+
+        with (
+            patch("elasticflow.bulk.tool.parallel_bulk", side_effect=failing_bulk),
+            patch("elasticflow.bulk.tool.time.sleep"),
+        ):
+            result = self.bulk_tool.bulk_stream(operations)
+
+        self.assertEqual(result.success, 150)
+        self.assertEqual(result.failed, 100)
+        self.assertEqual(result.errors[0].doc_id, "100")
+        self.assertEqual(result.errors[0].error_type, "BatchProcessingError")
+
+    def test_bulk_stream_stops_when_breaker_opens(self):
+        """测试集群持续返回 503 时熔断器打开，流式处理终止且不再读取后续操作项."""
+        consumed = 0
+
+        def generate_operations():
+            nonlocal consumed
+            for i in range(10000):
+                consumed += 1
+                yield BulkOperation(
+                    action=BulkAction.DELETE, index_name="test-index", doc_id=str(i)
+                )
+
+        unavailable = _api_error(503)
+        tool = BulkOperationTool(
+            self.es_client, batch_size=100, max_retries=0, breaker_threshold=2
+        )
+        with patch(
+            "elasticflow.bulk.tool.parallel_bulk",
+            side_effect=lambda client, actions, **kwargs: iter(
+                _request_error_items(actions, unavailable)
+            ),
+        ) as mock_parallel_bulk:
+            with self.assertRaises(BulkProcessingError):
+                tool.bulk_stream(generate_operations())
+
+        self.assertEqual(mock_parallel_bulk.call_count, 2)
+        self.assertLessEqual(consumed, 300)
 
     def test_set_config(self):
         """测试更新配置."""
@@ -276,6 +965,95 @@ class TestBulkResult(unittest.TestCase):
         summary = result.get_error_summary()
         self.assertEqual(summary, "No errors")
 
+    def test_errors_and_warnings_created_lazily(self):
+        """测试错误与警告列表在首次添加时才创建，合并结果时一并合并."""
+        result = BulkResult(total=2, success=2)
+        self.assertIsNone(result.errors)
+        self.assertIsNone(result.warnings)
+
+        batch_result = BulkResult(total=1, failed=1)
+        batch_result.add_error(
+            index_name="test-index",
+            doc_id="1",
+            error_type="Error1",
+            error_reason="Reason1",
+            status=400,
+        )
+        batch_result.add_warning("Test warning")
+        result.merge(batch_result)
+
+        self.assertEqual(result.total, 3)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.warnings, ["Test warning"])
+
+    def test_operation_pool_acquire_and_release(self):
+        """测试对象池复用实例并按参数重置全部字段."""
+        pool = OperationPool(max_size=1)
+        operation = pool.acquire(
+            BulkAction.UPDATE,
+            "test-index",
+            doc_id="1",
+            source={"name": "test"},
+            retry_on_conflict=3,
+            metadata={"tag": "a"},
+        )
+        pool.release(operation)
+        pool.release(BulkOperation(action=BulkAction.DELETE, index_name="other"))
+        self.assertEqual(len(pool), 1)
+
+        reused = pool.acquire(BulkAction.DELETE, "other-index", doc_id="2")
+        self.assertIs(reused, operation)
+        self.assertEqual(
+            reused,
+            BulkOperation(
+                action=BulkAction.DELETE, index_name="other-index", doc_id="2"
+            ),
+        )
+        self.assertEqual(len(pool), 0)
+
+    def test_token_bucket_waits_when_empty(self):
+        """测试令牌耗尽后按补充速率计算等待时间."""
+        bucket = TokenBucket(capacity=2, refill_rate=4.0)
+
+        with patch("elasticflow.bulk.models.time.monotonic", return_value=0.0):
+            bucket._last = 0.0
+            delays = [bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(delays, [0.0, 0.0, 0.25, 0.5])
+
+    def test_token_bucket_adapts_rate(self):
+        """测试遇到 429 时速率减半，连续成功后加性恢复且不超过初始速率."""
+        bucket = TokenBucket(refill_rate=8.0, min_rate=1.5, success_threshold=2)
+
+        for _ in range(3):
+            bucket.on_throttle()
+        self.assertEqual(bucket.refill_rate, 1.5)
+
+        bucket.on_success()
+        self.assertEqual(bucket.refill_rate, 1.5)
+        bucket.on_success()
+        self.assertEqual(bucket.refill_rate, 2.5)
+
+        for _ in range(20):
+            bucket.on_success()
+        self.assertEqual(bucket.refill_rate, 8.0)
+
+    def test_models_use_slots(self):
+        """测试批量操作数据类使用 __slots__，不分配实例字典."""
+        operation = BulkOperation(action=BulkAction.INDEX, index_name="test-index")
+        result = BulkResult()
+        result.add_error(
+            index_name="test-index",
+            doc_id="1",
+            error_type="Error1",
+            error_reason="Reason1",
+            status=400,
+        )
+
+        for obj in (operation, result, result.errors[0]):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
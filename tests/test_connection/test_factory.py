@@ -247,6 +247,21 @@ class TestSetConnectionConfig:
         # 缓存未清空，所以是同一个客户端
         assert client_before is client_after
 
+    @patch(ES_PATCH_PATH)
+    def test_orjson_serializer(self, mock_es, master_cluster) -> None:
+        """测试安装了 orjson 时默认使用其序列化器，可通过配置关闭."""
+        pytest.importorskip("orjson")
+        from elasticsearch.serializer import OrjsonSerializer
+
+        factory = ESClientFactory(clusters=[master_cluster])
+        factory.get_client()
+        assert isinstance(mock_es.call_args[1]["serializer"], OrjsonSerializer)
+
+        factory.set_connection_config(ConnectionConfig(use_orjson=False))
+        factory._clients.clear()
+        factory.get_client()
+        assert "serializer" not in mock_es.call_args[1]
+
 
 # ============================================================
 # 多认证方式测试
@@ -169,6 +169,13 @@ class TestConnectionConfig:
         assert config.sniff_on_start is False
         assert config.sniff_on_connection_fail is False
         assert config.sniffer_timeout == 60
+        assert config.use_orjson is True
+
+    def test_uses_slots(self) -> None:
+        """测试配置模型使用 __slots__，不分配实例字典."""
+        cluster = ClusterConfig(hosts=["http://localhost:9200"])
+        for obj in (cluster, ConnectionConfig()):
+            assert not hasattr(obj, "__dict__")
 
     def test_create_custom(self) -> None:
         """测试使用自定义值创建配置."""
@@ -1,7 +1,10 @@
 """DslQueryBuilder 单元测试."""
 
+import sys
+from collections import OrderedDict
+
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from elasticsearch.dsl import Q, Search
 
@@ -11,47 +14,59 @@ from elasticflow import (
     DslQueryBuilder,
     FieldMapper,
     QueryField,
+    SubAggregation,
 )
 
 
+class _EvictingCache(OrderedDict):
+    """模拟 get 与 move_to_end 之间缓存项被其他线程淘汰."""
+
+    def move_to_end(self, key, last=True):
+        self.pop(key, None)
+        super().move_to_end(key, last)
+
+
 class TestDslQueryBuilder:
     """DslQueryBuilder 测试类."""
 
     def test_basic_conditions(self):
         """测试基本条件过滤."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
+        search_mock.query.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         builder.conditions([{"key": "status", "method": "eq", "value": ["error"]}])
         result = builder.build()
 
-        assert search_mock.filter.called
+        assert search_mock.query.called
         assert result == search_mock
 
     def test_query_string(self):
         """测试 Query String 查询."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.query.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         builder.query_string("message: timeout")
         result = builder.build()
 
-        search_mock.query.assert_called_with("query_string", query="message: timeout")
+        search_mock.query.assert_called_with(
+            Q("query_string", query="message: timeout")
+        )
         assert result == search_mock
 
     def test_ordering(self):
         """测试排序."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         builder.ordering(["-create_time", "name"])
@@ -62,32 +77,45 @@ class TestDslQueryBuilder:
 
     def test_pagination(self):
         """测试分页."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         builder.pagination(page=2, page_size=20)
         result = builder.build()
 
-        search_mock.__getitem__.assert_called_with(slice(20, 40))
+        search_mock.extra.assert_called_with(from_=20, size=20)
         assert result == search_mock
 
     def test_pagination_with_zero_page_size(self):
         """测试 page_size=0 只返回聚合结果."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         builder.pagination(page=1, page_size=0)
         result = builder.build()
 
-        search_mock.__getitem__.assert_called_with(slice(0, 0))
+        search_mock.extra.assert_called_with(size=0)
         assert result == search_mock
 
+    def test_pagination_size_zero_skips_sort(self):
+        """测试 page_size=0 时不添加排序，切换回正常分页后恢复排序."""
+        builder = DslQueryBuilder(search_factory=Search)
+        builder.ordering(["-create_time"]).pagination(page=3, page_size=0)
+
+        result = builder.to_dict()
+        assert result == {"size": 0}
+
+        builder.pagination(page=1, page_size=10)
+        result = builder.to_dict()
+        assert result["sort"] == [{"create_time": {"order": "desc"}}]
+        assert result["size"] == 10
+
     def test_field_mapping(self):
         """测试字段映射."""
         fields = [
@@ -96,10 +124,11 @@ class TestDslQueryBuilder:
         ]
         field_mapper = FieldMapper(fields)
 
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
+        search_mock.query.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(
             search_factory=lambda: search_mock, field_mapper=field_mapper
@@ -114,11 +143,11 @@ class TestDslQueryBuilder:
 
     def test_query_string_transformer(self):
         """测试 Query String 转换."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.query.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         def transformer(qs: str) -> str:
             return qs.replace("状态", "status")
@@ -129,28 +158,60 @@ class TestDslQueryBuilder:
         builder.query_string("状态: error")
         builder.build()
 
-        search_mock.query.assert_called_with("query_string", query="status: error")
+        search_mock.query.assert_called_with(Q("query_string", query="status: error"))
 
     def test_add_extra_filter(self):
         """测试添加额外过滤条件."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
+        search_mock.query.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         q = Q("term", status="active")
         builder.add_filter(q)
+        builder.add_filter(Q("term", tenant="t1"))
         builder.build()
 
-        assert search_mock.filter.called
+        # 多个额外过滤合并为一次 query 调用
+        search_mock.query.assert_called_once_with(
+            Q("bool", filter=[q, Q("term", tenant="t1")])
+        )
+
+    def test_add_cached_filter(self):
+        """测试相同键的过滤条件只构造一次并在构建器间共享."""
+        factory = MagicMock(return_value=Q("term", tenant_id="t-cached"))
+
+        first = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+        second = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+        first.add_cached_filter(("test-tenant", "t-cached"), factory)
+        second.add_cached_filter(("test-tenant", "t-cached"), factory)
+
+        assert factory.call_count == 1
+        assert second.to_dict()["query"] == {
+            "bool": {"filter": [{"term": {"tenant_id": "t-cached"}}]}
+        }
+
+    def test_add_cached_filter_tolerates_concurrent_eviction(self):
+        """测试命中后其他线程淘汰了该缓存项时，过滤条件仍被添加."""
+        key = ("test-tenant", "t-evicted")
+        cache = _EvictingCache({key: Q("term", tenant_id="t-evicted")})
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+
+        with patch("elasticflow.builders.dsl._FILTER_CACHE", cache):
+            builder.add_cached_filter(key, MagicMock())
+
+        assert builder.to_dict()["query"] == {
+            "bool": {"filter": [{"term": {"tenant_id": "t-evicted"}}]}
+        }
 
     def test_add_aggregation(self):
         """测试添加聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.aggs = MagicMock()
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -161,11 +222,11 @@ class TestDslQueryBuilder:
 
     def test_chain_calls(self):
         """测试链式调用."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.query.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         result = (
@@ -178,12 +239,31 @@ class TestDslQueryBuilder:
 
         assert result == search_mock
 
+    def test_conditions_and_query_string_single_query_call(self):
+        """测试条件与 Query String 合并为一次 query 调用."""
+        search_mock = MagicMock(spec=Search())
+        search_mock.query.return_value = search_mock
+        search_mock.extra.return_value = search_mock
+
+        builder = DslQueryBuilder(search_factory=lambda: search_mock)
+        builder.conditions([{"key": "status", "method": "eq", "value": ["error"]}])
+        builder.query_string("message: timeout")
+        builder.build()
+
+        search_mock.query.assert_called_once_with(
+            Q(
+                "bool",
+                filter=[Q("term", status="error")],
+                must=[Q("query_string", query="message: timeout")],
+            )
+        )
+
     def test_to_dict(self):
         """测试导出为字典."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.to_dict.return_value = {"query": {"match_all": {}}}
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -192,6 +272,203 @@ class TestDslQueryBuilder:
         assert result == {"query": {"match_all": {}}}
         search_mock.to_dict.assert_called_once()
 
+    def test_to_dict_cached_per_pagination_window(self):
+        """测试 to_dict 结果按分页窗口缓存，重复调用返回同一个字典."""
+        search_mock = MagicMock(spec=Search())
+        search_mock.extra.return_value = search_mock
+        search_mock.to_dict.return_value = {"query": {"match_all": {}}}
+
+        builder = DslQueryBuilder(search_factory=lambda: search_mock)
+        first = builder.to_dict()
+        second = builder.to_dict()
+
+        assert second is first
+        search_mock.to_dict.assert_called_once()
+
+        builder.pagination(page=2)
+        builder.to_dict()
+        assert search_mock.to_dict.call_count == 2
+
+    def test_condition_parse_cache(self):
+        """测试共享解析器时相同条件只解析一次."""
+        parser = DefaultConditionParser()
+        parser.parse = MagicMock(wraps=parser.parse)
+        conditions = [{"key": "status", "method": "eq", "value": ["error"]}]
+
+        for _ in range(2):
+            builder = DslQueryBuilder(
+                search_factory=lambda: Search(index="test"),
+                condition_parser=parser,
+            )
+            builder.conditions(conditions).build()
+
+        assert parser.parse.call_count == 1
+
+    def test_condition_parse_cache_tolerates_concurrent_eviction(self):
+        """测试命中后其他线程淘汰了该缓存项时，条件不会被丢弃."""
+
+        conditions = [{"key": "tenant", "method": "eq", "value": ["t1"]}]
+        parser = DefaultConditionParser()
+        # 预热缓存
+        DslQueryBuilder(
+            search_factory=lambda: Search(index="test"), condition_parser=parser
+        ).conditions(conditions).build()
+
+        builder = DslQueryBuilder(
+            search_factory=lambda: Search(index="test"), condition_parser=parser
+        )
+        builder._parse_cache = _EvictingCache(builder._parse_cache)
+        dsl = builder.conditions(conditions).to_dict()
+
+        assert dsl["query"]["bool"]["filter"] == [{"term": {"tenant": "t1"}}]
+
+    def test_condition_parse_cache_distinguishes_value_types(self):
+        """测试相等但类型不同的值不会命中同一缓存项."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+
+        dsl_int = builder.conditions(
+            [{"key": "flag", "method": "eq", "value": [1]}]
+        ).to_dict()
+        dsl_bool = builder.conditions(
+            [{"key": "flag", "method": "eq", "value": [True]}]
+        ).to_dict()
+
+        # 1 == True，需比较值的类型
+        value_int = dsl_int["query"]["bool"]["filter"][0]["term"]["flag"]
+        value_bool = dsl_bool["query"]["bool"]["filter"][0]["term"]["flag"]
+        assert type(value_int) is int
+        assert type(value_bool) is bool
+
+    def test_condition_parse_cache_distinguishes_datetime_and_string(self):
+        """测试 datetime 值与其 ISO 字符串不会命中同一缓存项."""
+        from datetime import datetime
+
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+        moment = datetime(2024, 1, 1)
+
+        dsl_str = builder.conditions(
+            [{"key": "ts", "method": "gte", "value": [moment.isoformat()]}]
+        ).to_dict()
+        dsl_dt = builder.conditions(
+            [{"key": "ts", "method": "gte", "value": [moment]}]
+        ).to_dict()
+
+        assert dsl_str["query"]["bool"]["filter"][0]["range"]["ts"]["gte"] == (
+            "2024-01-01T00:00:00"
+        )
+        assert dsl_dt["query"]["bool"]["filter"][0]["range"]["ts"]["gte"] == moment
+
+    def test_conditions_combine_left_to_right(self):
+        """测试顶层条件按顺序从左到右组合 and/or."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+        builder.conditions(
+            [
+                {"key": "a", "method": "eq", "value": [1]},
+                {"key": "b", "method": "eq", "value": [2]},
+                {"key": "c", "method": "eq", "value": [3], "condition": "or"},
+                {"key": "d", "method": "eq", "value": [4], "condition": "or"},
+            ]
+        )
+
+        dsl = builder.to_dict()
+
+        # (a AND b) OR c OR d
+        assert len(dsl["query"]["bool"]["filter"]) == 1
+        should = dsl["query"]["bool"]["filter"][0]["bool"]["should"]
+        assert len(should) == 3
+        assert len(should[0]["bool"]["filter"]) == 2
+
+    def test_and_conditions_are_flat_filter_clauses(self):
+        """测试 AND 条件直接作为顶层 filter 子句，不再额外包一层 bool."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+        builder.conditions(
+            [
+                {"key": "a", "method": "eq", "value": [1]},
+                {"key": "b", "method": "gte", "value": [2]},
+            ]
+        )
+
+        dsl = builder.to_dict()
+
+        assert len(dsl["query"]["bool"]["filter"]) == 2
+
+    def test_or_group_followed_by_and_is_single_bool(self):
+        """测试 (a OR b OR c) AND d AND e 只生成一层 bool，不逐个嵌套."""
+        builder = DslQueryBuilder(search_factory=Search)
+        builder.conditions(
+            [
+                {"key": "a", "method": "eq", "value": [1]},
+                {"key": "b", "method": "eq", "value": [2], "condition": "or"},
+                {"key": "c", "method": "eq", "value": [3], "condition": "or"},
+                {"key": "d", "method": "eq", "value": [4]},
+                {"key": "e", "method": "eq", "value": [5]},
+            ]
+        )
+
+        assert builder.to_dict()["query"] == {
+            "bool": {
+                "filter": [
+                    {
+                        "bool": {
+                            "should": [
+                                {"term": {"a": 1}},
+                                {"term": {"b": 2}},
+                                {"term": {"c": 3}},
+                            ]
+                        }
+                    },
+                    {"term": {"d": 4}},
+                    {"term": {"e": 5}},
+                ]
+            }
+        }
+
+    def test_negated_conditions_hoisted_to_must_not(self):
+        """测试 AND 连接的否定条件直接放入顶层 must_not."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+        builder.conditions(
+            [
+                {"key": "a", "method": "eq", "value": [1]},
+                {"key": "b", "method": "neq", "value": [2]},
+            ]
+        )
+
+        dsl = builder.to_dict()
+
+        assert dsl["query"]["bool"]["filter"] == [{"term": {"a": 1}}]
+        assert dsl["query"]["bool"]["must_not"] == [{"term": {"b": 2}}]
+
+    def test_build_reuses_prepared_search_across_pagination(self):
+        """测试仅改变分页时复用已构建的 Search，修改查询参数后重新构建."""
+        factory = MagicMock(side_effect=lambda: Search(index="test"))
+        builder = DslQueryBuilder(search_factory=factory)
+        builder.conditions([{"key": "a", "method": "eq", "value": [1]}])
+
+        first = builder.pagination(page=1, page_size=10).to_dict()
+        second = builder.pagination(page=3, page_size=10).to_dict()
+
+        assert factory.call_count == 1
+        assert first["from"] == 0
+        assert second["from"] == 20
+        assert first["query"] == second["query"]
+
+        builder.query_string("status:error")
+        builder.build()
+        assert factory.call_count == 2
+
+    def test_build_result_mutation_does_not_leak_into_cache(self):
+        """测试原地修改 build() 返回的聚合与查询不会影响之后的构建."""
+        builder = DslQueryBuilder(search_factory=Search)
+        builder.conditions([{"key": "a", "method": "eq", "value": [1]}])
+        builder.add_aggregation("by_status", "terms", field="status")
+        expected = builder.to_dict()
+
+        search = builder.build()
+        search.aggs["by_status"].metric("avg_price", "avg", field="price")
+        search.query.filter.append(Q("term", b=2))
+
+        assert builder.build().to_dict() == expected
+
 
 class TestDefaultConditionParser:
     """DefaultConditionParser 测试类."""
@@ -203,6 +480,18 @@ class TestDefaultConditionParser:
         q = parser.parse(condition)
         assert q is not None
 
+    def test_parse_eq_single_value_uses_term(self):
+        """测试单个值时生成 term，多个或空列表时生成 terms."""
+        parser = DefaultConditionParser()
+
+        single = parser.parse(ConditionItem(key="status", method="eq", value=["a"]))
+        multi = parser.parse(ConditionItem(key="status", method="eq", value=["a", "b"]))
+        empty = parser.parse(ConditionItem(key="status", method="eq", value=[]))
+
+        assert single.to_dict() == {"term": {"status": "a"}}
+        assert multi.to_dict() == {"terms": {"status": ["a", "b"]}}
+        assert empty.to_dict() == {"terms": {"status": []}}
+
     def test_parse_neq(self):
         """测试不等于条件解析."""
         parser = DefaultConditionParser()
@@ -245,6 +534,14 @@ class TestDefaultConditionParser:
         q = parser.parse(condition)
         assert q is not None
 
+    def test_condition_item_is_frozen(self):
+        """测试条件项不可修改且没有 __dict__."""
+        item = ConditionItem(key="status", method="eq", value=["error"])
+
+        with pytest.raises(AttributeError):
+            item.key = "level"
+        assert not hasattr(item, "__dict__")
+
 
 class TestFieldMapper:
     """FieldMapper 测试类."""
@@ -275,6 +572,93 @@ class TestFieldMapper:
         assert result[0]["key"] == "doc_status"
         assert result[0]["origin_key"] == "status"
 
+    def test_transform_condition_fields_interns_strings(self):
+        """测试转换后的字段名与 method 为驻留字符串."""
+        mapper = FieldMapper([QueryField(field="status", es_field="doc_status")])
+
+        # 运行时拼接的字符串默认不驻留
+        method = "".join(["e", "q"])
+        unmapped = "".join(["le", "vel"])
+        result = mapper.transform_condition_fields(
+            [
+                {"key": "status", "method": method, "value": [1]},
+                {"key": unmapped, "method": method, "value": [2]},
+            ]
+        )
+
+        assert result[0]["method"] is sys.intern("eq")
+        assert result[1]["key"] is sys.intern("level")
+
+    def test_is_empty(self):
+        """测试是否配置了字段映射."""
+        assert FieldMapper().is_empty
+        assert not FieldMapper([QueryField(field="a", es_field="b")]).is_empty
+
+    def test_empty_mapper_skips_transform(self):
+        """测试没有字段映射时构建器跳过字段转换."""
+        mapper = FieldMapper()
+        mapper.transform_condition_fields = MagicMock()
+        mapper.transform_ordering_fields = MagicMock()
+
+        builder = DslQueryBuilder(
+            search_factory=lambda: Search(index="test"), field_mapper=mapper
+        )
+        builder.conditions([{"key": "a", "method": "eq", "value": [1]}])
+        builder.ordering(["-a"])
+
+        mapper.transform_condition_fields.assert_not_called()
+        mapper.transform_ordering_fields.assert_not_called()
+        assert builder.to_dict()["sort"] == [{"a": {"order": "desc"}}]
+
+    def test_resetting_same_params_keeps_prepared_search(self):
+        """测试重复设置相同的参数不会使已构建的 Search 失效."""
+        conditions = [{"key": "status", "method": "eq", "value": ["active"]}]
+        builder = DslQueryBuilder(search_factory=Search)
+        builder.conditions(conditions).ordering(["-a"]).query_string(" level:1 ")
+        builder.build()
+        prepared = builder._prepared
+
+        builder.conditions(list(conditions)).ordering(["-a"]).query_string("level:1")
+        assert builder._prepared is prepared
+
+        # 原地修改条件后重新设置，应当重新构建
+        conditions[0]["value"] = ["closed"]
+        builder.conditions(conditions)
+        assert builder._prepared is None
+        assert "closed" in str(builder.to_dict()["query"])
+
+    def test_build_many(self):
+        """测试多个构建器合并为一个 MultiSearch."""
+        first = DslQueryBuilder(search_factory=lambda: Search(index="alerts"))
+        first.conditions([{"key": "status", "method": "eq", "value": ["active"]}])
+        second = DslQueryBuilder(search_factory=Search).pagination(page_size=0)
+
+        result = DslQueryBuilder.build_many([first, second], index="logs").to_dict()
+
+        assert result == [
+            {"index": ["alerts"]},
+            first.to_dict(),
+            {},
+            {"size": 0},
+        ]
+
+    def test_builder_uses_slots(self):
+        """测试构建器使用 __slots__，不分配实例字典."""
+        builder = DslQueryBuilder(search_factory=Search)
+        assert not hasattr(builder, "__dict__")
+
+    def test_empty_builder_only_applies_pagination(self):
+        """测试没有任何查询参数时仅设置分页，不复制 Search."""
+        search_mock = MagicMock(spec=Search())
+        search_mock.extra.return_value = search_mock
+
+        builder = DslQueryBuilder(search_factory=lambda: search_mock)
+        builder.build()
+
+        search_mock.query.assert_not_called()
+        search_mock.sort.assert_not_called()
+        search_mock.extra.assert_called_once_with(from_=0, size=10)
+
     def test_transform_ordering_fields(self):
         """测试转换排序字段."""
         fields = [
@@ -290,16 +674,36 @@ class TestFieldMapper:
         assert result[0] == "-name.keyword"
         assert result[1] == "status"
 
+    def test_transform_ordering_fields_cached(self):
+        """测试相同排序输入复用缓存结果，且返回值互不影响."""
+        mapper = FieldMapper([QueryField(field="name", es_field="name.raw")])
+        mapper.get_es_field = MagicMock(wraps=mapper.get_es_field)
+
+        first = mapper.transform_ordering_fields(["-name"])
+        first.append("extra")
+        second = mapper.transform_ordering_fields(["-name"])
+
+        assert second == ["-name.raw"]
+        assert mapper.get_es_field.call_count == 1
+
+    def test_transform_ordering_fields_tolerates_concurrent_eviction(self):
+        """测试缓存项在命中后被其他线程淘汰时仍返回缓存结果."""
+        mapper = FieldMapper([QueryField(field="name", es_field="name.raw")])
+        mapper.transform_ordering_fields(["-name"])
+        mapper._ordering_cache = _EvictingCache(mapper._ordering_cache)
+
+        assert mapper.transform_ordering_fields(["-name"]) == ["-name.raw"]
+
 
 class TestAggregations:
     """聚合功能测试类."""
 
     def test_add_stats_aggregation(self):
         """测试统计聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.aggs = MagicMock()
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -313,10 +717,10 @@ class TestAggregations:
 
     def test_add_extended_stats_aggregation(self):
         """测试扩展统计聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.aggs = MagicMock()
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -328,10 +732,10 @@ class TestAggregations:
 
     def test_add_cardinality_aggregation(self):
         """测试去重计数聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.aggs = MagicMock()
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -345,10 +749,10 @@ class TestAggregations:
 
     def test_add_percentiles_aggregation(self):
         """测试百分位数聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.aggs = MagicMock()
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -364,10 +768,10 @@ class TestAggregations:
 
     def test_add_top_hits_aggregation(self):
         """测试 Top Hits 聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.aggs = MagicMock()
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -385,10 +789,10 @@ class TestAggregations:
 
     def test_add_aggregation_with_sub_aggregations(self):
         """测试带子聚合的聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         # 创建可递归的 mock
         aggs_mock = MagicMock()
@@ -421,12 +825,10 @@ class TestAggregations:
 
     def test_add_aggregation_with_subaggregation_class(self):
         """测试使用 SubAggregation 类带子聚合的聚合."""
-        from elasticflow import SubAggregation
-
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         aggs_mock = MagicMock()
         bucket_result_mock = MagicMock()
@@ -462,16 +864,107 @@ class TestAggregations:
         # 验证两个子聚合都被调用
         assert bucket_result_mock.bucket.call_count == 2
 
+    def test_nested_sub_aggregations_to_dict(self):
+        """测试多层子聚合的字段映射与参数透传."""
+        mapper = FieldMapper(
+            [
+                QueryField(field="status", es_field="doc_status"),
+                QueryField(field="price", es_field="doc_price"),
+            ]
+        )
+        builder = DslQueryBuilder(search_factory=Search, field_mapper=mapper)
+        builder.add_aggregation(
+            "by_status",
+            "terms",
+            field="status",
+            sub_aggregations=[
+                SubAggregation(
+                    name="by_price",
+                    type="histogram",
+                    field="price",
+                    kwargs={"interval": 10},
+                    sub_aggregations=[
+                        SubAggregation(
+                            name="latest", type="top_hits", kwargs={"size": 1}
+                        )
+                    ],
+                ),
+                {"name": "avg_price", "type": "avg", "field": "price"},
+            ],
+        )
+        aggs = builder.to_dict()["aggs"]["by_status"]
+
+        assert aggs["terms"] == {"field": "doc_status"}
+        assert aggs["aggs"]["by_price"]["histogram"] == {
+            "field": "doc_price",
+            "interval": 10,
+        }
+        assert aggs["aggs"]["by_price"]["aggs"]["latest"] == {"top_hits": {"size": 1}}
+        assert aggs["aggs"]["avg_price"] == {"avg": {"field": "doc_price"}}
+
+    def test_sub_aggregations_normalized_once(self):
+        """测试子聚合在添加时完成字段映射，build() 时不再重复映射."""
+        mapper = FieldMapper([QueryField(field="price", es_field="doc_price")])
+        builder = DslQueryBuilder(search_factory=Search, field_mapper=mapper)
+        builder.add_aggregation(
+            "by_status",
+            "terms",
+            field="status",
+            sub_aggregations=[{"name": "avg_price", "type": "avg", "field": "price"}],
+        )
+
+        with patch.object(mapper, "get_es_field") as get_es_field:
+            builder.build()
+            builder.pagination(page=2).build()
+
+        get_es_field.assert_not_called()
+        assert builder._agg_subs[0][0].field == "doc_price"
+
+    def test_sub_aggregation_uses_slots(self):
+        """测试 SubAggregation 使用 __slots__，不分配实例字典."""
+        sub = SubAggregation(name="a", type="avg")
+        assert not hasattr(sub, "__dict__")
+
+    def test_dedupe_aggregations(self):
+        """测试开启聚合合并后，定义相同的聚合只发送一次."""
+        builder = DslQueryBuilder(search_factory=Search, dedupe_aggregations=True)
+        builder.add_aggregation("a", "terms", field="status", size=10)
+        builder.add_aggregation("b", "terms", field="status", size=10)
+        builder.add_aggregation("c", "terms", field="status", size=5)
+
+        aggs = builder.to_dict()["aggs"]
+        assert set(aggs) == {"a", "c"}
+        assert builder.aggregation_aliases == {"b": "a"}
+
+        builder.clear()
+        assert builder.aggregation_aliases == {}
+
+    def test_dedupe_aggregations_compares_sub_aggregations(self):
+        """测试子聚合名称或定义不同的聚合不会被合并."""
+        builder = DslQueryBuilder(search_factory=Search, dedupe_aggregations=True)
+        for name, sub_name in (("a", "avg_x"), ("b", "avg_y"), ("c", "avg_x")):
+            builder.add_aggregation(
+                name,
+                "terms",
+                field="status",
+                sub_aggregations=[{"name": sub_name, "type": "avg", "field": "x"}],
+            )
+
+        assert set(builder.to_dict()["aggs"]) == {"a", "b"}
+        assert builder.aggregation_aliases == {"c": "a"}
+
+    def test_aggregations_not_deduped_by_default(self):
+        """测试默认不合并定义相同的聚合."""
+        builder = DslQueryBuilder(search_factory=Search)
+        builder.add_aggregation("a", "terms", field="status")
+        builder.add_aggregation("b", "terms", field="status")
+
+        assert set(builder.to_dict()["aggs"]) == {"a", "b"}
+        assert builder.aggregation_aliases == {}
+
     def test_add_aggregation_raw(self):
         """测试原始聚合 DSL."""
-        search_mock = MagicMock(spec=Search)
-        search_mock.filter.return_value = search_mock
-        search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
-        search_mock.to_dict.return_value = {"query": {"match_all": {}}}
-        search_mock.update_from_dict = MagicMock()
-
-        builder = DslQueryBuilder(search_factory=lambda: search_mock)
+        builder = DslQueryBuilder(search_factory=Search)
         builder.add_aggregation_raw(
             {
                 "events_over_time": {
@@ -482,20 +975,31 @@ class TestAggregations:
                 }
             }
         )
-        builder.build()
+        result = builder.build().to_dict()
+
+        assert result["aggs"]["events_over_time"] == {
+            "date_histogram": {"field": "timestamp", "calendar_interval": "1d"}
+        }
+
+    def test_raw_aggregation_skips_dsl_round_trip(self):
+        """测试原始聚合直接挂载到 aggs，不经过整体 DSL 序列化."""
+        search = Search()
+        builder = DslQueryBuilder(search_factory=lambda: search)
+        builder.add_aggregation_raw({"a": {"terms": {"field": "x"}}})
+        builder.add_aggregation_raw({"b": {"terms": {"field": "y"}}})
+
+        with patch.object(Search, "update_from_dict") as update_mock:
+            builder.build()
 
-        # 验证 update_from_dict 被调用
-        search_mock.update_from_dict.assert_called_once()
-        call_args = search_mock.update_from_dict.call_args
-        assert "aggs" in call_args[0][0]
-        assert "events_over_time" in call_args[0][0]["aggs"]
+        update_mock.assert_not_called()
+        assert set(search.aggs) == {"a", "b"}
 
     def test_multiple_aggregations(self):
         """测试多个聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
         search_mock.aggs = MagicMock()
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
@@ -509,29 +1013,29 @@ class TestAggregations:
 
     def test_clear_includes_raw_aggregations(self):
         """测试清空包含原始聚合."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         search_mock.filter.return_value = search_mock
         search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
+        search_mock.extra.return_value = search_mock
 
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
         builder.add_aggregation("test", "terms", field="status")
         builder.add_aggregation_raw({"raw_agg": {"terms": {"field": "test"}}})
 
         # 验证添加后有数据
-        assert len(builder._aggregations) == 1
+        assert len(builder._agg_names) == 1
         assert len(builder._raw_aggregations) == 1
 
         # 清空
         builder.clear()
 
         # 验证清空后无数据
-        assert len(builder._aggregations) == 0
+        assert len(builder._agg_names) == 0
         assert len(builder._raw_aggregations) == 0
 
     def test_aggregation_name_validation_empty(self):
         """测试聚合名称为空时的验证."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
 
         with pytest.raises(ValueError, match="聚合名称不能为空"):
@@ -539,45 +1043,54 @@ class TestAggregations:
 
     def test_aggregation_name_validation_invalid_chars(self):
         """测试聚合名称包含无效字符时的验证."""
-        search_mock = MagicMock(spec=Search)
+        search_mock = MagicMock(spec=Search())
         builder = DslQueryBuilder(search_factory=lambda: search_mock)
 
         with pytest.raises(ValueError, match="聚合名称不能包含双引号"):
             builder.add_aggregation('agg "test"', "terms", field="status")
 
+    @pytest.mark.parametrize(
+        "name,char_name",
+        [("agg.test", "点号"), ("agg test", "空格"), ('a.b "c"', "双引号")],
+    )
+    def test_aggregation_name_validation_reports_char(self, name, char_name):
+        """测试聚合名称校验报告具体的非法字符."""
+        builder = DslQueryBuilder(search_factory=Search)
+
+        with pytest.raises(ValueError, match=f"聚合名称不能包含{char_name}"):
+            builder.add_aggregation(name, "terms", field="status")
+
+    def test_aggregation_name_validation_accepts_valid_name(self):
+        """测试合法聚合名称通过校验."""
+        builder = DslQueryBuilder(search_factory=Search)
+        builder.add_aggregation("status_count-1_中文", "terms", field="status")
+
+        assert builder._agg_names[0] == "status_count-1_中文"
+
     def test_raw_aggregation_does_not_overwrite_query_params(self):
         """测试原始聚合不会覆盖其他查询参数."""
-        search_mock = MagicMock(spec=Search)
-        search_mock.filter.return_value = search_mock
-        search_mock.sort.return_value = search_mock
-        search_mock.__getitem__.return_value = search_mock
-        search_mock.to_dict.return_value = {
-            "query": {"match_all": {}},
-            "sort": [{"create_time": "desc"}],
-            "from": 0,
-            "size": 10,
-        }
-        search_mock.update_from_dict = MagicMock()
-
-        builder = DslQueryBuilder(search_factory=lambda: search_mock)
+        builder = DslQueryBuilder(search_factory=Search)
+        builder.conditions([{"key": "status", "method": "eq", "value": ["active"]}])
+        builder.ordering(["-create_time"])
+        builder.add_aggregation("status_count", "terms", field="status")
         builder.add_aggregation_raw(
             {
                 "events_over_time": {
-                    "date_histogram": {"field": "timestamp", "calendar_interval": "1d"}
+                    "date_histogram": {
+                        "field": "timestamp",
+                        "calendar_interval": "1d",
+                    },
+                    "aggs": {"total": {"sum": {"field": "value"}}},
                 }
             }
         )
-        builder.build()
-
-        # 验证 update_from_dict 被调用，且包含完整 DSL
-        call_args = search_mock.update_from_dict.call_args
-        full_dict = call_args[0][0]
+        full_dict = builder.build().to_dict()
 
         # 验证原始查询参数被保留
         assert "query" in full_dict
         assert "sort" in full_dict
         assert "from" in full_dict
         assert "size" in full_dict
-        # 验证聚合被添加
-        assert "aggs" in full_dict
+        # 验证聚合被添加，且不影响已有聚合
+        assert "status_count" in full_dict["aggs"]
         assert "events_over_time" in full_dict["aggs"]
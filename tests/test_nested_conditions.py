@@ -246,6 +246,95 @@ class TestNestedConditions:
         nested_query = dsl["query"]["bool"]["filter"][0]["nested"]["query"]
         assert any("score" in str(query) for query in nested_query["bool"]["must"])
 
+    def test_empty_subtrees_pruned(self):
+        """测试空的 group / nested 在构建前被裁剪."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+
+        conditions = [
+            {"type": "item", "key": "status", "method": "eq", "value": ["a"]},
+            {"type": "group", "condition": "or", "children": []},
+            {
+                "type": "nested",
+                "path": "comments",
+                "children": [{"type": "group", "children": []}],
+            },
+        ]
+
+        dsl = builder.conditions(conditions).to_dict()
+
+        assert dsl["query"] == {"bool": {"filter": [{"term": {"status": "a"}}]}}
+
+    def test_single_item_group_collapsed(self):
+        """测试只有一个子条件的 group 折叠为该条件，保留与前面条件的组合方式."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+
+        conditions = [
+            {"type": "item", "key": "a", "method": "eq", "value": [1]},
+            {
+                "type": "group",
+                "condition": "or",
+                "children": [
+                    {"type": "item", "key": "b", "method": "eq", "value": [2]}
+                ],
+            },
+        ]
+
+        dsl = builder.conditions(conditions).to_dict()
+
+        should = dsl["query"]["bool"]["filter"][0]["bool"]["should"]
+        assert should == [{"term": {"a": 1}}, {"term": {"b": 2}}]
+
+    def test_or_nested_same_path_merged(self):
+        """测试 OR 关系中 path 相同的 nested 条件合并为一个 nested 查询."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+
+        def nested(key, value, condition="and"):
+            return {
+                "type": "nested",
+                "path": "comments",
+                "condition": condition,
+                "children": [
+                    {"type": "item", "key": key, "method": "eq", "value": [value]},
+                    {"type": "item", "key": "deleted", "method": "eq", "value": [0]},
+                ],
+            }
+
+        dsl = builder.conditions(
+            [nested("score", 5), nested("approved", True, "or")]
+        ).to_dict()
+
+        should = dsl["query"]["bool"]["filter"][0]["bool"]["should"]
+        assert len(should) == 1
+        assert should[0]["nested"]["path"] == "comments"
+        assert len(should[0]["nested"]["query"]["bool"]["should"]) == 2
+
+    def test_and_nested_same_path_not_merged(self):
+        """测试 AND 关系中 path 相同的 nested 条件保持独立（可能由不同子文档满足）."""
+        builder = DslQueryBuilder(search_factory=lambda: Search(index="test"))
+
+        conditions = [
+            {
+                "type": "nested",
+                "path": "comments",
+                "children": [
+                    {"type": "item", "key": "score", "method": "gte", "value": [5]},
+                    {"type": "item", "key": "deleted", "method": "eq", "value": [0]},
+                ],
+            },
+            {
+                "type": "nested",
+                "path": "comments",
+                "children": [
+                    {"type": "item", "key": "approved", "method": "eq", "value": [1]},
+                    {"type": "item", "key": "deleted", "method": "eq", "value": [0]},
+                ],
+            },
+        ]
+
+        dsl = builder.conditions(conditions).to_dict()
+
+        assert len(dsl["query"]["bool"]["filter"]) == 2
+
 
 class TestConditionParser:
     """条件解析器测试."""
@@ -699,6 +788,17 @@ class TestValidation:
                 path="comments", condition="or", minimum_should_match="invalid"
             )
 
+    def test_condition_objects_are_frozen(self):
+        """测试条件组与 nested 条件构造后不可修改."""
+        group = ConditionGroup(condition="or")
+        nested = NestedCondition(path="comments")
+
+        assert group.children == []
+        with pytest.raises(AttributeError):
+            group.condition = "and"
+        with pytest.raises(AttributeError):
+            nested.path = "tags"
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
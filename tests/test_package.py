@@ -0,0 +1,90 @@
+"""包级别按需导入测试."""
+
+import ast
+import inspect
+import subprocess
+import sys
+
+import pytest
+
+import elasticflow
+
+
+class TestLazyImports:
+    """elasticflow 顶层按需导入测试."""
+
+    def test_all_names_resolve(self):
+        """测试 __all__ 中的名称都可以访问."""
+        for name in elasticflow.__all__:
+            assert getattr(elasticflow, name) is not None
+
+    def test_unknown_name_raises(self):
+        """测试访问不存在的名称抛出 AttributeError."""
+        with pytest.raises(AttributeError):
+            elasticflow.NotExists  # noqa: B018
+
+    def test_dir_includes_lazy_names(self):
+        """测试 dir() 包含尚未导入的名称."""
+        assert "DslQueryBuilder" in dir(elasticflow)
+        assert "bulk" in dir(elasticflow)
+
+    def test_import_does_not_load_submodules(self):
+        """测试 import elasticflow 不会加载 elasticsearch 客户端."""
+        code = (
+            "import sys, elasticflow; "
+            "print('elasticsearch' in sys.modules, 'elasticflow.bulk' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.split() == ["False", "False"]
+
+    def test_query_string_builder_does_not_load_dsl(self):
+        """测试只使用 QueryStringBuilder 时不会加载 elasticsearch.dsl."""
+        code = (
+            "import sys; from elasticflow import QueryStringBuilder; "
+            "from elasticflow.core import escape_query_string; "
+            "print('elasticsearch.dsl' in sys.modules, "
+            "'elasticflow.builders.dsl' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.split() == ["False", "False"]
+
+    def test_subpackage_names_resolve(self):
+        """测试子包 __all__ 中的名称都可以访问."""
+        from elasticflow import builders, core
+
+        for module in (builders, core):
+            for name in module.__all__:
+                assert getattr(module, name) is not None
+
+    def test_type_checking_imports_match_lazy_imports(self):
+        """测试 TYPE_CHECKING 中的导入与 _LAZY_IMPORTS 保持一致."""
+        from elasticflow import builders, core
+
+        for module in (elasticflow, builders, core):
+            tree = ast.parse(inspect.getsource(module))
+            block = next(
+                node
+                for node in tree.body
+                if isinstance(node, ast.If)
+                and getattr(node.test, "id", None) == "TYPE_CHECKING"
+            )
+            imported = {
+                alias.asname: node.module.rpartition(".")[2]
+                for node in block.body
+                for alias in node.names
+            }
+            expected = {
+                name: target.rpartition(".")[2]
+                for name, target in module._LAZY_IMPORTS.items()
+            }
+            assert imported == expected
@@ -84,6 +84,31 @@ class TestEscapeQueryString:
         result = escape_query_string("a+b", many=True)
         assert result == ["a\\+b"]
 
+    def test_plain_string_returned_unchanged(self):
+        """测试不含特殊字符的字符串原样返回，不分配新字符串."""
+        value = "".join(["plain", "_value_123"])
+        assert escape_query_string(value) is value
+
+    def test_escape_results_cached(self):
+        """测试较短的值转义结果被缓存，过长的值不缓存."""
+        from elasticflow.core import utils
+
+        utils._escape_special_cached.cache_clear()
+        assert escape_query_string("a:b") == "a\\:b"
+        assert escape_query_string("a:b") == "a\\:b"
+        assert utils._escape_special_cached.cache_info().hits == 1
+
+        long_value = "x:" * utils._ESCAPE_CACHE_MAX_LEN
+        assert escape_query_string(long_value) == "x\\:" * utils._ESCAPE_CACHE_MAX_LEN
+        assert utils._escape_special_cached.cache_info().currsize == 1
+
+    def test_escape_query_value_matches_escape_query_string(self):
+        """测试 escape_query_value 与 escape_query_string 的单值结果一致."""
+        from elasticflow.core.utils import escape_query_value
+
+        for value in ("plain", "a:b", "hello world", "a\\:b", 'say "hi"'):
+            assert escape_query_value(value) == escape_query_string(value)
+
     def test_escape_non_string(self):
         """测试非字符串值."""
         result = escape_query_string(None)
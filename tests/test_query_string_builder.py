@@ -1,5 +1,7 @@
 """QueryStringBuilder 单元测试."""
 
+from unittest.mock import patch
+
 import pytest
 
 from elasticflow import (
@@ -79,6 +81,19 @@ class TestQueryStringBuilder:
         result = builder.build()
         assert result == 'status: "error" OR level: >=3'
 
+    def test_builder_uses_slots(self):
+        """测试构建器使用 __slots__，不分配实例字典."""
+        assert not hasattr(QueryStringBuilder(), "__dict__")
+
+    def test_empty_filter_skipped_between_parts(self):
+        """测试结果为空的条件不会产生多余的连接符."""
+        builder = QueryStringBuilder(logic_operator=LogicOperator.OR)
+        builder.add_filter("status", QueryStringOperator.EQUAL, ["error"])
+        builder.add_filter("message", QueryStringOperator.INCLUDE, ["**"])
+        builder.add_raw("level: >=3")
+        result = builder.build()
+        assert result == 'status: "error" OR (level: >=3)'
+
     def test_group_relation_and(self):
         """测试多值 AND 关系."""
         builder = QueryStringBuilder()
@@ -152,17 +167,50 @@ class TestQueryStringBuilder:
         result = builder.build()
         assert result == ""
 
+    def test_repeated_build_reuses_compiled_filters(self):
+        """测试重复构建时只转换新增的条件."""
+        builder = QueryStringBuilder()
+        builder.add_filter("status", QueryStringOperator.EQUAL, ["error"])
+        assert builder.build() == 'status: "error"'
+
+        with patch.object(
+            QueryStringBuilder,
+            "_build_single_filter",
+            autospec=True,
+            side_effect=QueryStringBuilder._build_single_filter,
+        ) as build_single:
+            builder.add_filter("level", QueryStringOperator.GTE, [3])
+            assert builder.build() == 'status: "error" AND level: >=3'
+            assert builder.build() == 'status: "error" AND level: >=3'
+
+        assert build_single.call_count == 1
+
+    def test_empty_values_filter_skipped(self):
+        """测试值为空的条件不会被添加，无需值的操作符不受影响."""
+        builder = QueryStringBuilder()
+        builder.add_filter("status", QueryStringOperator.EQUAL, [])
+        builder.add_filter("message", QueryStringOperator.INCLUDE, [])
+        builder.add_filter("host", QueryStringOperator.EXISTS, [])
+        assert len(builder._filters) == 1
+        assert builder.build() == "host: *"
+
+    def test_repeated_build_returns_cached_result(self):
+        """测试条件未变更时重复构建直接返回缓存结果，变更后重新构建."""
+        builder = QueryStringBuilder()
+        builder.add_filter("status", QueryStringOperator.EQUAL, ["error"])
+        first = builder.build()
+        assert builder.build() is first
+
+        builder.add_raw("host: web-01")
+        assert builder.build() == 'status: "error" AND (host: web-01)'
+
+        builder.clear()
+        assert builder.build() == ""
+
     def test_unsupported_operator(self):
         """测试不支持的操作符."""
         builder = QueryStringBuilder()
-        builder._filters.append(
-            {
-                "field": "test",
-                "operator": "invalid_op",
-                "values": ["value"],
-                "group_relation": GroupRelation.OR,
-            }
-        )
+        builder._filters.append(("test", "invalid_op", ["value"], GroupRelation.OR))
         with pytest.raises(UnsupportedOperatorError):
             builder.build()
 